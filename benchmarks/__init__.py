@@ -0,0 +1,4 @@
+"""Benchmarks of the family tree rendering, on synthetic family trees.
+
+Run them with `python -m benchmarks.run`, see `--help` for the options.
+"""
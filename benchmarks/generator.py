@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import random
+
+
+class FamilyGenerator:
+    """Generates synthetic family trees of realistic shapes, reproducibly from a seed.
+
+    The generated data has the structure read by `FamilyTree.deserialize_data`: "people" mapping
+    IDs to full names and "relationships" mapping child IDs to relationship types to parent IDs.
+    """
+
+    SHAPES: tuple[str, ...] = ("mixed", "pedigree", "collapse", "sibships", "adoptive", "forest")
+    """Available shapes:
+
+    - "mixed": descendants of a founder couple, with small sibships, some marriages between cousins
+      and a few adoptions.
+    - "pedigree": ancestors of a single person, going back many generations.
+    - "collapse": a pedigree where ancestors are often shared between several lines.
+    - "sibships": descendants of a founder couple, with many children per couple.
+    - "adoptive": descendants of a founder couple, with many adopted children.
+    - "forest": many small disconnected families.
+    """
+
+    FIRST_NAMES: dict[str, tuple[str, ...]] = {
+        "M": ("James", "John", "Robert", "Michael", "William", "David", "Thomas", "Charles", "Daniel", "Matthew"),
+        "F": ("Mary", "Patricia", "Jennifer", "Linda", "Elizabeth", "Susan", "Jessica", "Sarah", "Karen", "Emily"),
+    }
+    LAST_NAMES: tuple[str, ...] = (
+        "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+        "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    )
+
+    def __init__(self, seed: int = 0):
+        """Initialize the generator.
+
+        :param seed: The seed of the random generator, the same seed always generates the same trees.
+        """
+        self.seed = seed
+
+        self._random = random.Random(seed)
+        self._people: dict[str, str] = {}
+        self._relationships: dict[str, dict[str, str]] = {}
+        self._sexes: dict[str, str] = {}
+
+    def generate(self, n_people: int, shape: str = "mixed") -> dict:
+        """Generate the data of a family tree.
+
+        :param n_people: The number of people in the family tree.
+        :param shape: The shape of the family tree, one of `SHAPES`.
+        :return: Dict containing people and relationships data.
+        :raises ValueError: If the shape is unknown, or the number of people is not positive.
+        """
+        if shape not in self.SHAPES:
+            raise ValueError(f"Unknown shape {shape!r}, expected one of {self.SHAPES}.")
+        if n_people < 1:
+            raise ValueError("The number of people must be positive.")
+
+        self._random = random.Random(f"{self.seed}-{shape}-{n_people}")
+        self._people = {}
+        self._relationships = {}
+        self._sexes = {}
+
+        if shape == "mixed":
+            self._generate_descendants(n_people, n_children=(1, 4), p_married_in=0.8, p_adopted=0.02)
+        elif shape == "pedigree":
+            self._generate_ancestors(n_people, p_shared=0.0)
+        elif shape == "collapse":
+            self._generate_ancestors(n_people, p_shared=0.3)
+        elif shape == "sibships":
+            self._generate_descendants(n_people, n_children=(5, 15), p_married_in=0.9, p_adopted=0.0)
+        elif shape == "adoptive":
+            self._generate_descendants(n_people, n_children=(1, 4), p_married_in=0.8, p_adopted=0.25)
+        else:
+            while len(self._people) < n_people:
+                family_size = self._random.randint(5, 40)
+                self._generate_descendants(
+                    min(n_people, len(self._people) + family_size),
+                    n_children=(1, 4),
+                    p_married_in=1.0,
+                    p_adopted=0.0,
+                )
+
+        return {"people": self._people, "relationships": self._relationships}
+
+    def _generate_descendants(
+            self,
+            n_people: int,
+            n_children: tuple[int, int],
+            p_married_in: float,
+            p_adopted: float,
+    ) -> None:
+        """Generate the descendants of a founder couple, one generation at a time.
+
+        Children of a generation marry each other, unless they are siblings, or marry people from
+        outside the family. People marrying in are only added with the first child of their couple,
+        so no one is left unrelated to the family.
+
+        :param n_people: The total number of people to reach.
+        :param n_children: The minimum and maximum number of children per couple.
+        :param p_married_in: Probability for someone to marry a person from outside the family.
+        :param p_adopted: Probability for a child to be adopted by the couple raising them.
+        """
+        if n_people - len(self._people) < 2:
+            self._add_person(self._random.choice("MF"))
+            return
+
+        # Couples as [father, mother], None standing for a spouse marrying in.
+        couples: list[list[str | None]] = [[self._add_person("M"), self._add_person("F")]]
+        while len(self._people) < n_people:
+            children: list[tuple[str, int]] = []
+            for i, couple in enumerate(couples):
+                for _ in range(self._random.randint(*n_children)):
+                    if len(self._people) >= n_people:
+                        break
+                    # Without room left for the spouse, the child only has their known parent.
+                    if n_people - len(self._people) > couple.count(None):
+                        couple[:] = (parent or self._add_person(sex) for parent, sex in zip(couple, "MF"))
+                    father, mother = couple
+                    child = self._add_person(self._random.choice("MF"), self._last_name(father) if father else None)
+                    adopted = self._random.random() < p_adopted
+                    self._relationships[child] = {
+                        ("A" if adopted else "") + relationship: parent
+                        for relationship, parent in zip("FM", couple)
+                        if parent is not None
+                    }
+                    if adopted:
+                        # Some adopted children also have their birth parents in the tree.
+                        birth_parents = self._random.choice(couples)
+                        if None not in birth_parents and birth_parents != couple and self._random.random() < 0.5:
+                            self._relationships[child].update(F=birth_parents[0], M=birth_parents[1])
+                    children.append((child, i))
+
+            self._random.shuffle(children)
+            women = [(child, i) for child, i in children if self._sexes[child] == "F"]
+            couples = []
+            for child, i in children:
+                if self._sexes[child] != "M":
+                    continue
+                if women and women[-1][1] != i and self._random.random() >= p_married_in:
+                    couples.append([child, women.pop()[0]])
+                else:
+                    couples.append([child, None])
+            # Some women stay single, as long as the family goes on.
+            for child, _ in women:
+                if couples and self._random.random() < 0.5:
+                    break
+                couples.append([None, child])
+
+    def _generate_ancestors(self, n_people: int, p_shared: float) -> None:
+        """Generate the ancestors of a single person, one generation at a time.
+
+        :param n_people: The total number of people to reach.
+        :param p_shared: Probability for a parent to be an ancestor already found through another
+            line, rather than a new person.
+        """
+        generation = [self._add_person(self._random.choice("MF"))]
+        while len(self._people) < n_people:
+            parents: dict[str, list[str]] = {"M": [], "F": []}
+            for i, child in enumerate(generation):
+                for relationship, sex in (("F", "M"), ("M", "F")):
+                    if len(self._people) >= n_people:
+                        break
+                    # Parents are sometimes unknown, except for the first person of a generation
+                    # who keeps the pedigree going.
+                    if i and self._random.random() < 0.25:
+                        continue
+                    if parents[sex] and self._random.random() < p_shared:
+                        parent = self._random.choice(parents[sex])
+                    else:
+                        parent = self._add_person(sex, self._last_name(child) if sex == "M" else None)
+                        parents[sex].append(parent)
+                    self._relationships.setdefault(child, {})[relationship] = parent
+            generation = parents["M"] + parents["F"]
+
+    def _add_person(self, sex: str, last_name: str | None = None) -> str:
+        """Add a new person to the generated data.
+
+        :param sex: "M" or "F".
+        :param last_name: The last name of the person, picked at random if not given.
+        :return: The ID of the new person.
+        """
+        id_ = f"I{len(self._people)}"
+        first_name = self._random.choice(self.FIRST_NAMES[sex])
+        self._people[id_] = f"{first_name} {last_name or self._random.choice(self.LAST_NAMES)}"
+        self._sexes[id_] = sex
+        return id_
+
+    def _last_name(self, id_: str) -> str:
+        """Get the last name of a generated person.
+
+        :param id_: The ID of the person.
+        :return: Their last name.
+        """
+        return self._people[id_].rsplit(" ", 1)[1]
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from contextlib import ExitStack, contextmanager
+import functools
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.generator import FamilyGenerator
+from genealogy.array_surface import ArraySurface
+from genealogy.family_tree import FamilyTree
+from genealogy.family_tree_renderer import FamilyTreeRenderer
+from genealogy.image import write_to_image
+from genealogy.surface import Surface
+
+
+STAGES: tuple[str, ...] = (
+    "deserialize_data",
+    "_sort_topologically",
+    "_compute_generations",
+    "_relax",
+    "_draw_names_surface",
+    "_draw_arrows_surface",
+    "compress_vertically",
+    "write_to_image",
+)
+"""Measured stages of the rendering pipeline, in the order they run."""
+
+
+class StageRecorder:
+    """Records the wall time, and optionally the peak memory, of each stage of a run.
+
+    Stages can be nested, e.g. `_compute_generations` runs within `deserialize_data`. The time of
+    a stage excludes the stages nested in it, while its peak memory includes them.
+    """
+
+    def __init__(self, trace_memory: bool):
+        """Initialize the recorder.
+
+        :param trace_memory: Whether to record the peak memory of each stage, which slows them down.
+        """
+        self.trace_memory = trace_memory
+        self.times: dict[str, float] = {}
+        self.peaks: dict[str, int] = {}
+
+        # Running stages, as [nested stages time, memory at start, peak memory so far].
+        self._running: list[list[float]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Measure the code run within the context as a stage.
+
+        :param name: The name of the stage.
+        """
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._running:
+                self._running[-1][2] = max(self._running[-1][2], peak)
+            tracemalloc.reset_peak()
+        else:
+            current = 0
+        running = [0.0, current, current]
+        self._running.append(running)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self._running.pop()
+            self.times[name] = self.times.get(name, 0.0) + duration - running[0]
+            if self._running:
+                self._running[-1][0] += duration
+            if self.trace_memory:
+                peak = max(running[2], tracemalloc.get_traced_memory()[1])
+                self.peaks[name] = max(self.peaks.get(name, 0), int(peak - running[1]))
+                if self._running:
+                    self._running[-1][2] = max(self._running[-1][2], peak)
+
+    @contextmanager
+    def instrument(self, owner: type, name: str) -> Iterator[None]:
+        """Measure every call to a method as a stage, within the context.
+
+        :param owner: The class defining the method.
+        :param name: The name of the method, also used as the name of the stage.
+        """
+        attribute = owner.__dict__[name]
+        function = attribute.__func__ if isinstance(attribute, (classmethod, staticmethod)) else attribute
+
+        @functools.wraps(function)
+        def measured(*args, **kwargs):
+            with self.stage(name):
+                return function(*args, **kwargs)
+
+        setattr(owner, name, type(attribute)(measured) if function is not attribute else measured)
+        try:
+            yield
+        finally:
+            setattr(owner, name, attribute)
+
+
+def run_pipeline(data: dict, recorder: StageRecorder, backend: str = "list", image: bool = True) -> None:
+    """Run the rendering pipeline on family tree data, measuring each stage.
+
+    The pipeline runs as it does from the command line, with its methods wrapped to measure them.
+
+    :param data: Dict containing people and relationships data.
+    :param recorder: The recorder measuring the stages.
+    :param backend: The surface backend, one of `FamilyTreeRenderer.BACKENDS`.
+    :param image: Whether to also write the rendered tree to an image.
+    """
+    with ExitStack() as stack:
+        for owner, name in (
+                (FamilyTree, "deserialize_data"),
+                (FamilyTree, "_sort_topologically"),
+                (FamilyTree, "_compute_generations"),
+                (FamilyTree, "_relax"),
+                (FamilyTreeRenderer, "_draw_names_surface"),
+                (FamilyTreeRenderer, "_draw_arrows_surface"),
+                (Surface, "compress_vertically"),
+                (ArraySurface, "compress_vertically"),
+        ):
+            stack.enter_context(recorder.instrument(owner, name))
+
+        family_tree = FamilyTree.deserialize_data(data)
+        text = FamilyTreeRenderer(family_tree, backend).render()
+
+    if image:
+        fd, image_path = tempfile.mkstemp(suffix=".png")
+        os.close(fd)
+        try:
+            with recorder.stage("write_to_image"):
+                write_to_image(text, image_path)
+        finally:
+            os.remove(image_path)
+
+
+def run_benchmark(
+        n_people: int,
+        shape: str = "mixed",
+        seed: int = 0,
+        backend: str = "list",
+        image: bool = True,
+        trace_memory: bool = True,
+        n_repeats: int = 1,
+) -> dict:
+    """Benchmark the rendering pipeline on a generated family tree.
+
+    Times are measured without tracing memory, which slows Python code down unevenly, then a last
+    run traces the peak memory of each stage.
+
+    :param n_people: The number of people in the generated family tree.
+    :param shape: The shape of the generated family tree, one of `FamilyGenerator.SHAPES`.
+    :param seed: The seed of the generator.
+    :param backend: The surface backend, one of `FamilyTreeRenderer.BACKENDS`.
+    :param image: Whether to measure writing the rendered tree to an image.
+    :param trace_memory: Whether to measure the peak memory of each stage.
+    :param n_repeats: Number of timed runs, the fastest time of each stage is kept.
+    :return: The parameters and the measured time, in seconds, and peak memory, in bytes, per stage.
+    """
+    data = FamilyGenerator(seed).generate(n_people, shape)
+
+    times: dict[str, float] = {}
+    for _ in range(n_repeats):
+        recorder = StageRecorder(trace_memory=False)
+        run_pipeline(data, recorder, backend, image)
+        for stage, duration in recorder.times.items():
+            times[stage] = min(duration, times.get(stage, duration))
+
+    peaks: dict[str, int] = {}
+    if trace_memory:
+        recorder = StageRecorder(trace_memory=True)
+        tracemalloc.start()
+        try:
+            run_pipeline(data, recorder, backend, image)
+        finally:
+            tracemalloc.stop()
+        peaks = recorder.peaks
+
+    return {
+        "n_people": n_people,
+        "shape": shape,
+        "seed": seed,
+        "backend": backend,
+        "times": times,
+        "peaks": peaks,
+    }
+
+
+def format_results(results: Iterable[dict]) -> str:
+    """Format benchmark results as a table, with a row per run and a column per stage.
+
+    :param results: The results of `run_benchmark`.
+    :return: The table, times in milliseconds and peak memory in megabytes.
+    """
+    header = ["shape", "people", "backend"] + list(STAGES)
+    rows = [header]
+    for result in results:
+        row = [result["shape"], str(result["n_people"]), result["backend"]]
+        for stage in STAGES:
+            cell = f"{result['times'][stage] * 1e3:.1f}ms" if stage in result["times"] else "-"
+            if stage in result["peaks"]:
+                cell += f" {result['peaks'][stage] / 2 ** 20:.1f}MB"
+            row.append(cell)
+        rows.append(row)
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return "\n".join("  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows)
+
+
+def main() -> None:
+    """Command-line interface of the benchmarks."""
+    import argparse
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Benchmark the family tree rendering.")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000, 10000, 100000],
+        help="Numbers of people of the generated family trees.",
+    )
+    parser.add_argument(
+        "--shapes",
+        nargs="+",
+        choices=FamilyGenerator.SHAPES,
+        default=list(FamilyGenerator.SHAPES),
+        help="Shapes of the generated family trees.",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the family tree generator.")
+    parser.add_argument(
+        "--backend",
+        choices=FamilyTreeRenderer.BACKENDS,
+        default="array",
+        help="Surface backend used to draw the trees.",
+    )
+    parser.add_argument("--repeats", type=int, default=1, help="Number of timed runs, keeping the fastest.")
+    parser.add_argument(
+        "--image-max-people",
+        type=int,
+        default=1000,
+        help="Largest family tree to also write to an image, as images of larger ones take gigabytes of memory.",
+    )
+    parser.add_argument("--no-memory", action="store_true", help="Don't measure the peak memory of the stages.")
+    parser.add_argument("--json", help="Path to also save the results to, as JSON.")
+    args = parser.parse_args()
+
+    results = []
+    for shape in args.shapes:
+        for n_people in args.sizes:
+            results.append(run_benchmark(
+                n_people,
+                shape,
+                args.seed,
+                args.backend,
+                image=n_people <= args.image_max_people,
+                trace_memory=not args.no_memory,
+                n_repeats=args.repeats,
+            ))
+            print(format_results(results[-1:]).split("\n", 1)[1], flush=True)
+
+    print()
+    print(format_results(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import deque
+
+from genealogy.family_graph import FamilyGraph
+
+
+class AncestorIndex:
+    """Answers ancestry queries between the people of a family graph, from labels computed once.
+
+    People are numbered in post-order of a spanning forest, in which every person with children is
+    attached to one of them. The ancestors of a person then fall in a few intervals of numbers: the
+    subtree of the person in the forest, merged with the intervals of their parents.
+
+    Pedigree collapse scatters the ancestors of a person over many intervals, so each label keeps at
+    most `max_intervals` of them, merging the closest ones across their gaps. Merged intervals are
+    marked approximate: a number outside the intervals of a person is never their ancestor, a number
+    within an exact interval always is, and a number within an approximate interval is checked by
+    searching up through the parents whose labels also contain it.
+
+    A person counts as their own ancestor in the intervals, so the checks below exclude them.
+    """
+
+    def __init__(self, graph: FamilyGraph, max_intervals: int = 16):
+        """Build the index.
+
+        :param graph: The family graph, indexed in topological order, children before their parents.
+        :param max_intervals: Maximum number of intervals labelling each person.
+        """
+        self.graph = graph
+        self.max_intervals = max_intervals
+        n_people = len(graph)
+        children_ptr, children_idx = graph.children_ptr.tolist(), graph.children_idx.tolist()
+        parents_ptr, parents_idx = graph.parents_ptr.tolist(), graph.parents_idx.tolist()
+        self._parents: list[list[int]] = [parents_idx[parents_ptr[i]:parents_ptr[i + 1]] for i in range(n_people)]
+
+        # Spanning forest, every person attached to their first child, rooted at the childless people.
+        forest_children: list[list[int]] = [[] for _ in range(n_people)]
+        roots: list[int] = []
+        for i in range(n_people):
+            if children_ptr[i] < children_ptr[i + 1]:
+                forest_children[children_idx[children_ptr[i]]].append(i)
+            else:
+                roots.append(i)
+
+        self._post: list[int] = [0] * n_people
+        """Post-order number of each person."""
+        lows = [0] * n_people
+        counter = 0
+        for root in roots:
+            lows[root] = counter
+            stack = [(root, iter(forest_children[root]))]
+            while stack:
+                i, forest_children_iter = stack[-1]
+                child = next(forest_children_iter, None)
+                if child is not None:
+                    lows[child] = counter
+                    stack.append((child, iter(forest_children[child])))
+                else:
+                    stack.pop()
+                    self._post[i] = counter
+                    counter += 1
+
+        # Parents come after their children in topological order, so they are labelled first.
+        self._starts: list[list[int]] = [[] for _ in range(n_people)]
+        self._ends: list[list[int]] = [[] for _ in range(n_people)]
+        self._exact: list[list[bool]] = [[] for _ in range(n_people)]
+        for i in reversed(range(n_people)):
+            intervals = [(lows[i], self._post[i], True)]
+            for parent in self._parents[i]:
+                intervals.extend(zip(self._starts[parent], self._ends[parent], self._exact[parent]))
+            self._starts[i], self._ends[i], self._exact[i] = self._merge(intervals, max_intervals)
+
+    def n_intervals(self) -> int:
+        """Get the total number of intervals of the labels, a measure of the size of the index.
+
+        :return: The number of intervals.
+        """
+        return sum(len(starts) for starts in self._starts)
+
+    def is_ancestor(self, ancestor: int, person: int) -> bool:
+        """Check whether a person is an ancestor of another one.
+
+        :param ancestor: The graph index of the potential ancestor.
+        :param person: The graph index of the person.
+        :return: Whether the first person is an ancestor of the second one, never of themselves.
+        """
+        # Ancestors come after their descendants in topological order.
+        return ancestor > person and self._reaches(person, ancestor)
+
+    def common_ancestors(self, first: int, second: int) -> list[int]:
+        """Find the nearest common ancestors of two people.
+
+        A common ancestor is nearest if none of their children is a common ancestor. If one person
+        is an ancestor of the other, they are the only nearest common ancestor.
+
+        :param first: The graph index of the first person.
+        :param second: The graph index of the second person.
+        :return: The graph indices of the nearest common ancestors, in increasing order.
+        """
+        if not self._may_share_ancestors(first, second):
+            return []
+        first_ancestors = self._distances_to_ancestors(first)
+
+        # Search up from the second person, stopping at the common ancestors. The nearest ones are
+        # always reached, as the people between them and the second person aren't common ancestors.
+        candidates: list[int] = []
+        visited = {second}
+        stack = [second]
+        while stack:
+            i = stack.pop()
+            if i in first_ancestors:
+                candidates.append(i)
+                continue
+            for parent in self._parents[i]:
+                if parent not in visited:
+                    visited.add(parent)
+                    stack.append(parent)
+
+        # A candidate isn't nearest if it is an ancestor of another one. Searching up from them, people
+        # after the last candidate in topological order can't lead to another one.
+        last = max(candidates, default=-1)
+        not_nearest: set[int] = set()
+        stack = list(candidates)
+        while stack:
+            for parent in self._parents[stack.pop()]:
+                if parent <= last and parent not in not_nearest:
+                    not_nearest.add(parent)
+                    stack.append(parent)
+        return sorted(i for i in candidates if i not in not_nearest)
+
+    def relationship_degree(self, first: int, second: int) -> int | None:
+        """Compute the degree of relationship of two people.
+
+        The degree is the number of parent-child links on the shortest path joining the two people
+        through a common ancestor, e.g. 1 for a parent and child, 2 for siblings, 4 for first cousins.
+
+        :param first: The graph index of the first person.
+        :param second: The graph index of the second person.
+        :return: The degree of relationship, or None if the two people have no common ancestor.
+        """
+        if not self._may_share_ancestors(first, second):
+            return None
+        first_distances = self._distances_to_ancestors(first)
+
+        # Search up from the second person, generation by generation, until no ancestor further away
+        # can join the first person through a shorter path.
+        degree: int | None = None
+        distance = 0
+        level = [second]
+        visited = {second}
+        while level and (degree is None or distance < degree):
+            for i in level:
+                if i in first_distances and (degree is None or distance + first_distances[i] < degree):
+                    degree = distance + first_distances[i]
+            level = [parent for i in level for parent in self._parents[i] if parent not in visited]
+            level = list(dict.fromkeys(level))
+            visited.update(level)
+            distance += 1
+        return degree
+
+    def _distances_to_ancestors(self, person: int) -> dict[int, int]:
+        """Compute the number of generations between a person and each of their ancestors.
+
+        :param person: The graph index of the person.
+        :return: The distances to the ancestors, and to the person themselves.
+        """
+        distances = {person: 0}
+        queue = deque([person])
+        while queue:
+            i = queue.popleft()
+            for parent in self._parents[i]:
+                if parent not in distances:
+                    distances[parent] = distances[i] + 1
+                    queue.append(parent)
+        return distances
+
+    def _reaches(self, person: int, ancestor: int) -> bool:
+        """Check whether a person is an ancestor of another one, or the person themselves.
+
+        :param person: The graph index of the person.
+        :param ancestor: The graph index of the potential ancestor.
+        :return: Whether the potential ancestor is an ancestor of the person, or the person.
+        """
+        if person == ancestor:
+            return True
+        post = self._post[ancestor]
+        match = self._lookup(person, post)
+        if match is not None:
+            return match
+
+        # Approximate interval: search up through the parents whose labels also contain the number.
+        visited = {person}
+        stack = [person]
+        while stack:
+            for parent in self._parents[stack.pop()]:
+                if parent == ancestor:
+                    return True
+                if parent in visited or parent > ancestor:
+                    continue
+                visited.add(parent)
+                match = self._lookup(parent, post)
+                if match is None:
+                    stack.append(parent)
+                elif match:
+                    return True
+        return False
+
+    def _lookup(self, person: int, post: int) -> bool | None:
+        """Look up a post-order number in the label of a person.
+
+        :param person: The graph index of the person.
+        :param post: The post-order number.
+        :return: True if the number is within an exact interval, False if it is outside all the
+            intervals, and None if it is within an approximate interval.
+        """
+        k = bisect_right(self._starts[person], post) - 1
+        if k < 0 or post > self._ends[person][k]:
+            return False
+        return True if self._exact[person][k] else None
+
+    def _may_share_ancestors(self, first: int, second: int) -> bool:
+        """Check whether the labels of two people intersect.
+
+        :param first: The graph index of the first person.
+        :param second: The graph index of the second person.
+        :return: False if the two people surely have no common ancestor, themselves included.
+        """
+        first_starts, first_ends = self._starts[first], self._ends[first]
+        second_starts, second_ends = self._starts[second], self._ends[second]
+        i = j = 0
+        while i < len(first_starts) and j < len(second_starts):
+            if max(first_starts[i], second_starts[j]) <= min(first_ends[i], second_ends[j]):
+                return True
+            if first_ends[i] < second_ends[j]:
+                i += 1
+            else:
+                j += 1
+        return False
+
+    @staticmethod
+    def _merge(
+            intervals: list[tuple[int, int, bool]],
+            max_intervals: int,
+    ) -> tuple[list[int], list[int], list[bool]]:
+        """Merge overlapping or adjacent intervals, then the closest ones down to a maximum number.
+
+        :param intervals: The inclusive intervals, and whether they are exact.
+        :param max_intervals: The maximum number of merged intervals.
+        :return: The starts, ends and exactness of the merged intervals, in increasing order.
+        """
+        intervals.sort()
+        starts: list[int] = []
+        ends: list[int] = []
+        exact: list[bool] = []
+        for start, end, is_exact in intervals:
+            if ends and start <= ends[-1] + 1:
+                # Merged with an approximate interval, an exact one is approximate too.
+                exact[-1] = exact[-1] and is_exact
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+                exact.append(is_exact)
+        if len(starts) <= max_intervals:
+            return starts, ends, exact
+
+        # Close the smallest gaps, keeping the first of the intervals on each side.
+        gaps = sorted(range(1, len(starts)), key=lambda k: starts[k] - ends[k - 1])
+        closed = set(gaps[:len(starts) - max_intervals])
+        merged_starts: list[int] = []
+        merged_ends: list[int] = []
+        merged_exact: list[bool] = []
+        for k, (start, end, is_exact) in enumerate(zip(starts, ends, exact)):
+            if k in closed:
+                merged_ends[-1] = end
+                merged_exact[-1] = False
+            else:
+                merged_starts.append(start)
+                merged_ends.append(end)
+                merged_exact.append(is_exact)
+        return merged_starts, merged_ends, merged_exact
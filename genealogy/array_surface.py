@@ -0,0 +1,416 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Sequence
+from typing import overload
+
+import numpy as np
+
+from genealogy import profiler
+from genealogy.surface import (
+    ArrowsDrawing,
+    DEBUG,
+    DrawError,
+    find_clear_path,
+    SurfaceLine,
+    SurfacePosition,
+)
+from genealogy.utils import ARROWS
+
+
+_EMPTY: int = 0
+_CONNECTION: int = ord(ARROWS["connection"])
+_MIDDLE: int = ord(ARROWS["middle"])
+_TO_REMOVE: int = ord(ARROWS["to_remove"])
+
+
+class ArraySurface:
+    """A 2D surface stored as a dense array of character codepoints, with 0 for empty spaces.
+
+    A drop-in alternative to `Surface` for large renders: it takes a fraction of the memory, and
+    overlays, transformations and string exports are array operations rather than per-character
+    loops. The array grows geometrically as lines and characters are drawn, and the length of each
+    line is tracked separately, cells past the length of their line always being empty.
+    """
+
+    def __init__(self, lines: Iterable[Sequence[str | None]] = ()):
+        """Initialize the surface, optionally from lines of characters or None for empty spaces.
+
+        :param lines: The initial lines of the surface.
+        """
+        self._cells: np.ndarray = np.zeros((0, 0), dtype=np.uint32)
+        self._lengths: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._n_lines: int = 0
+        for i, line in enumerate(lines):
+            self._extend_to_line(i)
+            if line:
+                self.draw(SurfacePosition([i, 0]), line)
+
+    @classmethod
+    def _from_cells(cls, cells: np.ndarray, lengths: np.ndarray) -> ArraySurface:
+        """Create a surface directly from its cells and line lengths.
+
+        :param cells: The codepoints of the cells, line by line.
+        :param lengths: The length of each line.
+        :return: The new surface.
+        """
+        surface = cls()
+        surface._cells = cells
+        surface._lengths = lengths
+        surface._n_lines = len(lengths)
+        return surface
+
+    @property
+    def cells(self) -> np.ndarray:
+        """Get the codepoints of the cells, line by line, padded to the longest line."""
+        return self._cells[:self._n_lines, :self._width]
+
+    @property
+    def _width(self) -> int:
+        """Get the length of the longest line."""
+        return int(self._lengths[:self._n_lines].max(initial=0))
+
+    def compress_vertically(self) -> None:
+        """Compress the surface vertically without affecting the connections.
+
+        Finds the same clear paths as `Surface.compress_vertically`, and removes them from all the
+        columns at once.
+        """
+        self.pad_as_needed()
+        removed = self._find_clear_paths()
+        if not DEBUG:
+            self._compress_from_clear_paths(removed)
+
+        self.strip()
+
+    def compression_map(self) -> CompressionMap:
+        """Map the lines `compress_vertically` would produce to the cells they are made of.
+
+        The surface is left uncompressed, so that it can be dropped and drawn again in parts.
+
+        :return: The map of the compressed surface.
+        """
+        self.pad_as_needed()
+        cells = self.cells
+        return CompressionMap(cells, self._find_clear_paths() | (cells == _TO_REMOVE))
+
+    def _find_clear_paths(self) -> np.ndarray:
+        """Find the clear paths of the padded surface, see `find_clear_path`.
+
+        In debug mode, the paths are drawn with a character per starting line.
+
+        :return: Mask of the cells on the clear paths.
+        """
+        debug_chars = "/*+.0#"
+        cells = self.cells
+        width = cells.shape[1]
+        # Small codes for the search: 0 for empty, 1 for vertical channels, 2 for anything else.
+        codes = np.where(cells == _EMPTY, 0, np.where(cells == _MIDDLE, 1, 2)).astype(np.uint8).tolist()
+        removed = np.zeros(cells.shape, dtype=bool)
+        visited: set[tuple[int, int]] = set()
+        for i in range(self._n_lines):
+            if not width or codes[i][0] != 0:
+                continue
+
+            path = find_clear_path(codes, i, visited, empty=0, middle=1)
+            for path_line, index in path:
+                if DEBUG:
+                    cells[path_line, index] = ord(debug_chars[i % len(debug_chars)])
+                removed[path_line, index] = True
+        profiler.count("clear_path_cells_visited", len(visited))
+        return removed
+
+    def _compress_from_clear_paths(self, removed: np.ndarray) -> None:
+        """Compress the surface in place by removing the clear paths from every column at once.
+
+        Characters marked for removal are removed as well.
+
+        :param removed: Mask of the cells to remove.
+        """
+        cells = self.cells
+        kept = ~removed & (cells != _TO_REMOVE)
+        # Move the kept cells of each column to the top, preserving their order.
+        order = np.argsort(~kept, axis=0, kind="stable")
+        compressed = np.take_along_axis(np.where(kept, cells, _EMPTY), order, axis=0)
+        height = int(kept.sum(axis=0).max(initial=0))
+        self._cells = np.ascontiguousarray(compressed[:height])
+        self._lengths = np.full(height, cells.shape[1], dtype=np.int64)
+        self._n_lines = height
+
+    def transpose(self) -> None:
+        """Transpose the surface, swapping rows and columns."""
+        cells = self.cells
+        self._cells = np.ascontiguousarray(cells.T)
+        self._lengths = np.full(cells.shape[1], cells.shape[0], dtype=np.int64)
+        self._n_lines = cells.shape[1]
+
+    def replace_chars(self, new_char: str) -> None:
+        """Replace all characters in the surface with a new character.
+
+        :param new_char: The character to replace existing characters with.
+        """
+        cells = self.cells
+        cells[cells != _EMPTY] = ord(new_char)
+
+    def pad_as_needed(self) -> None:
+        """Pad all lines in the surface with empty spaces to ensure they are the same length."""
+        self._lengths[:self._n_lines] = max(self._lengths[:self._n_lines])
+
+    def strip(self) -> None:
+        """Remove empty lines from the beginning and end of the surface, and trailing empty spaces on each line."""
+        cells = self.cells
+        is_filled = cells != _EMPTY
+        lengths = np.where(is_filled.any(axis=1), cells.shape[1] - np.argmax(is_filled[:, ::-1], axis=1), 0)
+        is_kept = lengths > 0
+        self._cells = np.ascontiguousarray(cells[is_kept])
+        self._lengths = lengths[is_kept].astype(np.int64)
+        self._n_lines = len(self._lengths)
+
+    def clear(self) -> None:
+        """Remove all lines from the surface."""
+        self._cells = np.zeros((0, 0), dtype=np.uint32)
+        self._lengths = np.zeros(0, dtype=np.int64)
+        self._n_lines = 0
+
+    def draw(
+            self,
+            pos: SurfacePosition,
+            iterable: Sequence[str | None],
+            *,
+            up_to: bool = False,
+    ) -> bool:
+        """Draw a sequence of characters at the specified position.
+
+        :param pos: The position to start drawing at.
+        :param iterable: The characters to draw.
+        :param up_to: If True, the index is the last index to draw to.
+        :return: True if drawing has overwritten existing characters.
+        """
+        if pos.line < 0:
+            raise DrawError("line must be positive. ")
+
+        index = pos.index
+        if up_to:
+            index -= len(iterable)
+        if index < 0:
+            raise DrawError("index must be positive. ")
+
+        self._extend_to_line(pos.line)
+        new = self._encode(iterable)
+        end = index + len(new)
+        self._reserve(self._n_lines, end)
+
+        current = self._cells[pos.line, index:end]
+        is_filled = current != _EMPTY
+        # Special case, simple horizontal connections should never overwrite, so they appear to be
+        # behind other connection types.
+        is_kept = is_filled & (new == _CONNECTION)
+        has_overwritten = bool((is_filled & ~is_kept).any())
+        current[~is_kept] = new[~is_kept]
+        self._lengths[pos.line] = max(self._lengths[pos.line], end)
+        return has_overwritten
+
+    def draw_vertically(self, pos: SurfacePosition, iterable: Sequence[str | None]) -> bool:
+        """Draw a sequence of characters downwards, starting at the specified position.
+
+        :param pos: The position to start drawing at.
+        :param iterable: The characters to draw, one per line.
+        :return: True if drawing has overwritten existing characters.
+        """
+        if pos.line < 0:
+            raise DrawError("line must be positive. ")
+        if pos.index < 0:
+            raise DrawError("index must be positive. ")
+
+        new = self._encode(iterable)
+        end = pos.line + len(new)
+        self._extend_to_line(end - 1)
+        self._reserve(self._n_lines, pos.index + 1)
+
+        current = self._cells[pos.line:end, pos.index]
+        is_filled = current != _EMPTY
+        is_kept = is_filled & (new == _CONNECTION)
+        has_overwritten = bool((is_filled & ~is_kept).any())
+        current[~is_kept] = new[~is_kept]
+        lengths = self._lengths[pos.line:end]
+        np.maximum(lengths, pos.index + 1, out=lengths)
+        return has_overwritten
+
+    def add_line(self) -> None:
+        """Add an empty line to the surface."""
+        self._extend_to_line(self._n_lines)
+
+    def _extend_to_line(self, line: int) -> None:
+        """Extend the surface to ensure it has at least a certain number of lines.
+
+        :param line: The line index to extend the surface to.
+        """
+        if self._n_lines <= line:
+            self._reserve(line + 1, 0)
+            self._n_lines = line + 1
+
+    def _reserve(self, n_lines: int, width: int) -> None:
+        """Grow the underlying arrays geometrically to hold at least a number of lines and columns.
+
+        :param n_lines: The number of lines needed.
+        :param width: The number of columns needed.
+        """
+        capacity_lines, capacity_width = self._cells.shape
+        if n_lines <= capacity_lines and width <= capacity_width:
+            return
+
+        new_capacity_lines = max(n_lines, 2 * capacity_lines) if n_lines > capacity_lines else capacity_lines
+        new_capacity_width = max(width, 2 * capacity_width) if width > capacity_width else capacity_width
+        cells = np.zeros((new_capacity_lines, new_capacity_width), dtype=np.uint32)
+        cells[:capacity_lines, :capacity_width] = self._cells
+        lengths = np.zeros(new_capacity_lines, dtype=np.int64)
+        lengths[:capacity_lines] = self._lengths
+        self._cells = cells
+        self._lengths = lengths
+
+    @staticmethod
+    def _encode(iterable: Sequence[str | None]) -> np.ndarray:
+        """Encode a sequence of characters, or None for empty spaces, as codepoints.
+
+        :param iterable: The characters to encode.
+        :return: The codepoints.
+        """
+        if isinstance(iterable, str):
+            return np.frombuffer(iterable.encode("utf-32-le"), dtype=np.uint32).copy()
+        return np.array([ord(char) if char is not None else _EMPTY for char in iterable], dtype=np.uint32)
+
+    def __len__(self) -> int:
+        return self._n_lines
+
+    def __iter__(self) -> Iterator[SurfaceLine]:
+        for i in range(self._n_lines):
+            yield self[i]
+
+    def __add__(self, other: ArraySurface) -> ArraySurface:
+        """Overlay another surface behind this one, filling-in empty spaces.
+
+        :param other: The surface to overlay.
+        :return: A new surface containing the combined characters.
+        """
+        n_lines = max(self._n_lines, other._n_lines)
+        width = max(self._width, other._width)
+        cells = np.zeros((n_lines, width), dtype=np.uint32)
+        cells[:other._n_lines, :other._width] = other.cells
+        own_cells = self.cells
+        own_area = cells[:self._n_lines, :own_cells.shape[1]]
+        own_area[...] = np.where(own_cells != _EMPTY, own_cells, own_area)
+        lengths = np.zeros(n_lines, dtype=np.int64)
+        lengths[:self._n_lines] = self._lengths[:self._n_lines]
+        lengths[:other._n_lines] = np.maximum(lengths[:other._n_lines], other._lengths[:other._n_lines])
+        return ArraySurface._from_cells(cells, lengths)
+
+    @overload
+    def __getitem__(self, item: int) -> SurfaceLine:
+        ...
+
+    @overload
+    def __getitem__(self, item: tuple[int, int] | SurfacePosition) -> str | None:
+        ...
+
+    def __getitem__(self, item: int | tuple[int, int] | SurfacePosition) -> SurfaceLine | str | None:
+        """Get a copy of a line, or a character of the surface.
+
+        :param item: The line index, or the position of the character.
+        :return: The line, or the character, None for empty spaces or positions out of bounds.
+        """
+        if isinstance(item, (tuple, SurfacePosition)):
+            line, index = item
+            if not 0 <= line < self._n_lines or not 0 <= index < self._lengths[line]:
+                return None
+            code = int(self._cells[line, index])
+            return chr(code) if code != _EMPTY else None
+
+        if not -self._n_lines <= item < self._n_lines:
+            raise IndexError("ArraySurface index out of range")
+        line = item % self._n_lines
+        return SurfaceLine([
+            chr(code) if code != _EMPTY else None
+            for code in self._cells[line, :self._lengths[line]].tolist()
+        ])
+
+    def iter_str(
+            self,
+            line_start: int = 0,
+            line_end: int | None = None,
+            col_start: int = 0,
+            col_end: int | None = None,
+    ) -> Iterator[str]:
+        """Iterate over the lines of the surface as strings, replacing empty spaces with spaces.
+
+        Bounds are positions on the surface, clamped to it: negative ones count as 0, rather than
+        from the end as with slices.
+
+        :param line_start: The first line to iterate over.
+        :param line_end: The line after the last line to iterate over, the end of the surface if None.
+        :param col_start: The first column of each line.
+        :param col_end: The column after the last column of each line, the end of the line if None.
+        """
+        line_end = self._n_lines if line_end is None else min(max(line_end, 0), self._n_lines)
+        col_start = max(col_start, 0)
+        for i in range(max(line_start, 0), line_end):
+            length = int(self._lengths[i])
+            line = self._cells[i, col_start:length if col_end is None else min(max(col_end, 0), length)]
+            yield np.where(line == _EMPTY, ord(" "), line).astype(np.uint32).tobytes().decode("utf-32-le")
+
+    @property
+    def as_str(self) -> str:
+        """Get the surface as a string, replacing empty spaces with spaces."""
+        return "\n".join(self.iter_str())
+
+
+class ArrayArrowsSurface(ArrowsDrawing, ArraySurface):
+    """Specialized array surface for drawing connection arrows between family members."""
+
+
+class CompressionMap:
+    """Where each line of a vertically compressed surface comes from, to draw it again in parts.
+
+    Compression shifts each column up by the cells removed above, and drops the lines left empty.
+    A line of the compressed surface is thus made of cells from different lines of the surface, one
+    per column, which the map finds from the removed cells of each column.
+    """
+
+    def __init__(self, cells: np.ndarray, removed: np.ndarray):
+        """Initialize the map.
+
+        :param cells: The codepoints of the cells of the padded surface, line by line.
+        :param removed: Mask of the cells removed by the compression.
+        """
+        self.width: int = cells.shape[1]
+        # Per column, the removed lines minus their rank, the number of these at most k being the
+        # number of removed lines before the k-th kept line.
+        self._shifts: list[np.ndarray] = []
+        for index in range(self.width):
+            removed_lines = np.flatnonzero(removed[:, index])
+            self._shifts.append((removed_lines - np.arange(len(removed_lines))).astype(np.int32))
+
+        kept = ~removed
+        order = np.argsort(~kept, axis=0, kind="stable")
+        compressed = np.take_along_axis(np.where(kept, cells, _EMPTY), order, axis=0)
+        is_filled = compressed[:int(kept.sum(axis=0).max(initial=0))] != _EMPTY
+        self.lines: np.ndarray = np.flatnonzero(is_filled.any(axis=1))
+        """Line of the compressed surface of each line kept by `ArraySurface.strip`."""
+        self.lengths: np.ndarray = self.width - np.argmax(is_filled[self.lines, ::-1], axis=1)
+        """Length of each line kept by `ArraySurface.strip`, without trailing empty spaces."""
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def source_lines(self, lines: np.ndarray, col_start: int, col_end: int) -> np.ndarray:
+        """Find the lines of the surface that cells of the compressed and stripped surface come from.
+
+        :param lines: The lines of the compressed and stripped surface.
+        :param col_start: The first column.
+        :param col_end: The column after the last column, at most the width of the surface.
+        :return: The line of the surface of each cell, line by line.
+        """
+        compressed_lines = self.lines[lines]
+        sources = np.empty((len(lines), col_end - col_start), dtype=np.int64)
+        for index in range(col_start, col_end):
+            shifts = np.searchsorted(self._shifts[index], compressed_lines, side="right")
+            sources[:, index - col_start] = compressed_lines + shifts
+        return sources
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+import glob
+import os
+import time
+import traceback
+
+from genealogy.pipeline import main
+from genealogy.workers import map_in_processes
+
+
+class BatchResult:
+    """Outcome of rendering a batch of data files."""
+
+    def __init__(self, n_files: int, failures: dict[str, str], duration: float):
+        """Initialize the batch result.
+
+        :param n_files: Number of data files in the batch.
+        :param failures: Error messages of the data files that failed to render, by path.
+        :param duration: Wall time taken by the batch, in seconds.
+        """
+        self.n_files = n_files
+        self.failures = failures
+        self.duration = duration
+
+    def summary(self) -> str:
+        """Summarize the throughput and failures of the batch.
+
+        :return: A human-readable summary.
+        """
+        n_rendered = self.n_files - len(self.failures)
+        throughput = self.n_files / self.duration if self.duration > 0 else 0.0
+        lines = [
+            f"Rendered {n_rendered}/{self.n_files} files in {self.duration:.2f}s ({throughput:.1f} files/s), "
+            f"{len(self.failures)} failed."
+        ]
+        lines.extend(f"FAILED {path}: {error}" for path, error in self.failures.items())
+        return "\n".join(lines)
+
+
+def find_data_files(pattern: str) -> list[str]:
+    """Find the data files matching a glob pattern.
+
+    :param pattern: Glob pattern, where "**" matches any number of directories.
+    :return: The paths of the matching files, sorted.
+    """
+    return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+
+def run_batch(
+        data_paths: Sequence[str],
+        out_dir: str,
+        jobs: int | None = None,
+        layout: str = "relax",
+        backend: str = "list",
+        image_format: str | None = None,
+) -> BatchResult:
+    """Render many data files, spread over a pool of processes.
+
+    Each worker process pays the interpreter and library startup once, then renders chunks of data
+    files. The outputs mirror the layout of the data files relative to their common directory, and
+    are named after the whole data file name, e.g. "family.yml.txt", so no two data files write to
+    the same output. A failing data file is recorded in the result without stopping the others.
+
+    :param data_paths: Paths to the .yml, .json or .ged data files to render.
+    :param out_dir: Directory to write the rendered text files, and images, to.
+    :param jobs: Number of worker processes, None or 0 for the number of CPUs. With 1, the files
+        are rendered in the current process.
+    :param layout: The layout strategy, one of `FamilyTree.LAYOUTS`.
+    :param backend: The surface backend, one of `FamilyTreeRenderer.BACKENDS`.
+    :param image_format: Optional image file extension, e.g. "png", to also render images.
+    :return: The outcome of the batch.
+    """
+    start = time.perf_counter()
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in data_paths]) if data_paths else ""
+    tasks = []
+    for data_path in data_paths:
+        # The extension of the data file is kept, so "x.yml" and "x.json" don't share an output.
+        output_stem = os.path.join(out_dir, os.path.relpath(os.path.abspath(data_path), root))
+        image_output_path = f"{output_stem}.{image_format.lstrip('.')}" if image_format else None
+        tasks.append((data_path, f"{output_stem}.txt", image_output_path, layout, backend))
+
+    errors = map_in_processes(_render_task, tasks, jobs)
+
+    failures = {task[0]: error for task, error in zip(tasks, errors) if error is not None}
+    return BatchResult(len(tasks), failures, time.perf_counter() - start)
+
+
+def _render_task(task: tuple[str, str, str | None, str, str]) -> str | None:
+    """Render one data file of a batch, in a worker process.
+
+    :param task: The data path, text output path, image output path, layout and backend.
+    :return: None on success, or the error message.
+    """
+    data_path, output_path, image_output_path, layout, backend = task
+    try:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        main(data_path, output_path, image_output_path, layout, backend=backend)
+    except Exception as e:
+        return "".join(traceback.format_exception_only(e)).strip()
+    return None
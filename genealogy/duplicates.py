@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from difflib import SequenceMatcher
+from functools import lru_cache
+from itertools import combinations
+import unicodedata
+
+from genealogy import profiler
+from genealogy.person import Person
+from genealogy.utils import Relationship
+
+
+SOUNDEX_CODES: dict[str, str] = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+"""Soundex digit of each consonant, letters not listed being dropped."""
+
+
+def find_duplicates(
+        people: Iterable[Person],
+        threshold: float = 0.8,
+        max_block_size: int = 64,
+) -> list[tuple[Person, Person, float]]:
+    """Find people who are likely the same person under different IDs, e.g. after merging two files.
+
+    Comparing every pair of people doesn't scale, so people are first grouped into blocks by keys
+    built from their names and the names of their relatives, and only the people within a block are
+    compared. A person has several keys, so that a difference in one of the fields doesn't prevent
+    the comparison. Blocks larger than `max_block_size` hold too common keys to compare all their
+    people, and are split by secondary keys, see `_block_pairs`.
+
+    :param people: The people to search.
+    :param threshold: The minimum similarity of the suggested pairs, see `similarity`.
+    :param max_block_size: The maximum number of people of a block whose people are all compared.
+    :return: The pairs of likely duplicates with their similarity, the most similar first.
+    """
+    with profiler.stage("duplicate_blocking"):
+        people = list(people)
+        blocks: dict[str, list[int]] = {}
+        for i, person in enumerate(people):
+            for key in blocking_keys(person):
+                blocks.setdefault(key, []).append(i)
+
+        # Pairs of indices, the lowest first, encoded as single integers.
+        n_people = len(people)
+        candidates: set[int] = set()
+        for block in blocks.values():
+            if len(block) > 1:
+                candidates.update(i * n_people + j for i, j in _block_pairs(block, people, max_block_size))
+        profiler.count("duplicate_blocks", len(blocks))
+        profiler.count("duplicate_candidates", len(candidates))
+
+    with profiler.stage("duplicate_scoring"):
+        suggestions = []
+        for pair in candidates:
+            first, second = people[pair // n_people], people[pair % n_people]
+            # Parents and children often share names, but can't be the same person.
+            if first in second.children or second in first.children:
+                continue
+            score = similarity(first, second, threshold)
+            if score >= threshold:
+                suggestions.append((first, second, score))
+    suggestions.sort(key=lambda suggestion: (-suggestion[2], suggestion[0].id, suggestion[1].id))
+    return suggestions
+
+
+def blocking_keys(person: Person) -> set[str]:
+    """Build the keys grouping a person with their potential duplicates.
+
+    The keys combine the first name with a surname, the maiden name being used as a surname too,
+    or with the first names of a parent, or of the children. Other keys leave the first name out,
+    and combine the surnames with the first names of both parents, or of the children. Names are
+    compared by their Soundex code, to allow for spelling variants and typos, except in the keys
+    made of the names alone, which would otherwise group too many people. People without a surname
+    get the same keys with an empty surname, so that everyone has at least one key.
+
+    Keys are strings rather than tuples, which the garbage collector would track.
+
+    :param person: The person.
+    :return: The blocking keys of the person.
+    """
+    names = [name for name in (person.last_name, person.maiden_name) if name] or [""]
+    first_name = normalize(person.first_name)
+    keys = {f"name {first_name} {normalize(name)}" for name in names}
+    first_name = soundex(person.first_name)
+    surnames = {soundex(name) for name in names}
+
+    father, mother = person.parents.get(Relationship.F), person.parents.get(Relationship.M)
+    parents = [soundex(parent.first_name) for parent in (father, mother) if parent is not None]
+    keys.update(f"parent {first_name} {surname} {parent}" for surname in surnames for parent in parents)
+    if len(parents) == 2:
+        keys.update(f"siblings {surname} {parents[0]} {parents[1]}" for surname in surnames)
+    if person.children:
+        children = " ".join(sorted({soundex(child.first_name) for child in person.children}))
+        keys.add(f"children {first_name} {children}")
+        keys.update(f"couple {surname} {children}" for surname in surnames)
+    return keys
+
+
+def _block_pairs(block: list[int], people: list[Person], max_block_size: int) -> Iterator[tuple[int, int]]:
+    """Pair the people of a block, splitting the block by secondary keys if it is too large.
+
+    The secondary keys are the exact full name, then the first names of the parents, then those of
+    the children, each splitting the parts that are still too large. A common name thus still
+    pairs the people sharing the exact same name and relatives, the most likely duplicates. The
+    people of a part that no key splits are only paired with the next `max_block_size - 1` people,
+    so that the number of pairs stays linear in the size of the block.
+
+    :param block: The indices of the people of the block, in increasing order.
+    :param people: The people.
+    :param max_block_size: The maximum number of people of a part whose people are all paired.
+    :return: The pairs of indices, the lowest first.
+    """
+    if len(block) <= max_block_size:
+        yield from combinations(block, 2)
+        return
+
+    keys = {i: _secondary_keys(people[i]) for i in block}
+    parts = [block]
+    for level in range(len(keys[block[0]])):
+        large_parts = []
+        for part in parts:
+            groups: dict[str, list[int]] = {}
+            for i in part:
+                groups.setdefault(keys[i][level], []).append(i)
+            for group in groups.values():
+                if len(group) <= max_block_size:
+                    yield from combinations(group, 2)
+                else:
+                    large_parts.append(group)
+        parts = large_parts
+
+    # Any split part stays in increasing order, and so do the pairs.
+    for part in parts:
+        for offset, i in enumerate(part):
+            for j in part[offset + 1:offset + max_block_size]:
+                yield i, j
+
+
+def _secondary_keys(person: Person) -> tuple[str, str, str]:
+    """Build the keys splitting the blocks too large to compare all their people.
+
+    :param person: The person.
+    :return: The exact full name of the person, and the first names of their parents, and of their
+        children.
+    """
+    full_name = " ".join(normalize(name) for name in (
+        person.first_name, person.middle_name, person.last_name, person.maiden_name
+    ))
+    parents = " ".join(
+        normalize(parent.first_name) if parent is not None else ""
+        for parent in (person.parents.get(Relationship.F), person.parents.get(Relationship.M))
+    )
+    children = " ".join(sorted(normalize(child.first_name) for child in person.children))
+    return full_name, parents, children
+
+
+def similarity(first: Person, second: Person, threshold: float = 0.0) -> float:
+    """Score how likely two people are the same person, from their names and those of their relatives.
+
+    First names weigh most, then surnames, the best match of the last and maiden names of each
+    person, the first names of the parents, and those of the children, then middle names. Fields
+    missing from either person are left out.
+
+    :param first: The first person.
+    :param second: The second person.
+    :param threshold: The similarity below which the exact score isn't needed. Scoring stops as
+        soon as the remaining fields can't bring the similarity up to it.
+    :return: The similarity, from 0 for nothing in common to 1 for no difference, or a lower bound
+        if below the threshold.
+    """
+    # Weight of each field, and the names of each person to compare, the best match counting.
+    fields = [(3.0, (first.first_name,), (second.first_name,))]
+    first_surnames = [name for name in (first.last_name, first.maiden_name) if name]
+    second_surnames = [name for name in (second.last_name, second.maiden_name) if name]
+    if first_surnames and second_surnames:
+        fields.append((1.5, first_surnames, second_surnames))
+    if first.middle_name and second.middle_name:
+        fields.append((0.5, (first.middle_name,), (second.middle_name,)))
+    for relationship in (Relationship.F, Relationship.M):
+        first_parent, second_parent = first.parents.get(relationship), second.parents.get(relationship)
+        if first_parent is not None and second_parent is not None:
+            fields.append((1.5, (first_parent.first_name,), (second_parent.first_name,)))
+    has_children = bool(first.children and second.children)
+
+    total = sum(weight for weight, _, _ in fields) + 1.5 * has_children
+    remaining, score = total, 0.0
+    for weight, first_names, second_names in fields:
+        remaining -= weight
+        score += weight * max(name_similarity(a, b) for a in first_names for b in second_names)
+        if score + remaining < threshold * total:
+            return score / total
+    if has_children:
+        # Each child is matched with the most similar child of the other person, the same names first.
+        first_children = {normalize(child.first_name) for child in first.children}
+        second_children = {normalize(child.first_name) for child in second.children}
+        matched = 2.0 * len(first_children & second_children)
+        first_others, second_others = first_children - second_children, second_children - first_children
+        if first_others and second_others:
+            matches = [[name_similarity(a, b) for b in second_others] for a in first_others]
+            matched += sum(map(max, matches)) + sum(map(max, zip(*matches)))
+        score += 1.5 * matched / (len(first_children) + len(second_children))
+    return score / total
+
+
+def name_similarity(first: str, second: str) -> float:
+    """Score the similarity of two names, tolerating case, accents, initials and typos.
+
+    :param first: The first name.
+    :param second: The second name.
+    :return: The similarity, from 0 for unrelated or missing names, to 1 for the same normalized name.
+    """
+    first, second = normalize(first), normalize(second)
+    if not first or not second:
+        return 0.0
+    if first == second:
+        return 1.0
+    if len(first) == 1 or len(second) == 1:
+        return 0.8 if first[0] == second[0] else 0.0
+    return _ratio(first, second) if first < second else _ratio(second, first)
+
+
+@lru_cache(maxsize=1 << 18)
+def _ratio(first: str, second: str) -> float:
+    """Compute the similarity of two different normalized names, in order so that it's cached once.
+
+    Unrelated names still share about half of their letters, so the similarity is only positive
+    above that.
+    """
+    return max(0.0, 2.0 * SequenceMatcher(None, first, second).ratio() - 1.0)
+
+
+@lru_cache(maxsize=65536)
+def normalize(name: str) -> str:
+    """Normalize a name for comparison, ignoring case, accents and punctuation.
+
+    :param name: The name.
+    :return: The lowercase letters of the name, without accents.
+    """
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    return "".join(char for char in decomposed if char.isalpha() and not unicodedata.combining(char))
+
+
+@lru_cache(maxsize=65536)
+def soundex(name: str) -> str:
+    """Encode a name by its sound, so that spelling variants get the same code.
+
+    :param name: The name.
+    :return: The American Soundex code of the name, e.g. "R163" for "Robert" and "Rupert", or an
+        empty string for a name without letters.
+    """
+    letters = normalize(name)
+    if not letters:
+        return ""
+    code = letters[0].upper()
+    previous = SOUNDEX_CODES.get(letters[0], "")
+    for letter in letters[1:]:
+        digit = SOUNDEX_CODES.get(letter, "")
+        if digit and digit != previous:
+            code += digit
+        # H and W don't separate letters with the same code, vowels do.
+        if letter not in "hw":
+            previous = digit
+    return (code + "000")[:4]
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from genealogy.family_tree import FamilyTree
+from genealogy.family_tree_renderer import FamilyTreeRenderer
+from genealogy.person import Person
+from genealogy.workers import map_in_processes
+
+
+def split_families(people: Iterable[Person]) -> list[list[Person]]:
+    """Split people into connected families, linked to each other through parents and children.
+
+    :param people: The people to split, whose relatives must all be included.
+    :return: The families, in order of their first member when sorting everyone by name.
+    """
+    families: list[list[Person]] = []
+    visited: set[Person] = set()
+    for person in sorted(people):
+        if person in visited:
+            continue
+        visited.add(person)
+        family = [person]
+        stack = [person]
+        while stack:
+            member = stack.pop()
+            for relative in (*member.parents.values(), *member.children):
+                if relative not in visited:
+                    visited.add(relative)
+                    family.append(relative)
+                    stack.append(relative)
+        families.append(family)
+    return families
+
+
+def render_families(
+        people: Iterable[Person],
+        layout: str = "relax",
+        backend: str = "list",
+        jobs: int | None = None,
+) -> str:
+    """Lay out and render each connected family on its own, over a pool of processes.
+
+    Unrelated families never interact, so each one is laid out as a separate `FamilyTree`. The
+    rendered families are stacked, separated by an empty line, in the order of `split_families`, so
+    the output doesn't depend on the number of processes.
+
+    :param people: The people to render, whose relatives must all be included.
+    :param layout: The layout strategy, one of `FamilyTree.LAYOUTS`.
+    :param backend: The surface backend, one of `FamilyTreeRenderer.BACKENDS`.
+    :param jobs: Number of worker processes, None or 0 for the number of CPUs. With 1, the
+        families are rendered in the current process.
+    :return: The rendered families, as a string.
+    :raises ValueError: If the layout or backend is unknown.
+    """
+    if layout not in FamilyTree.LAYOUTS:
+        raise ValueError(f"Unknown layout {layout!r}, expected one of {FamilyTree.LAYOUTS}.")
+    if backend not in FamilyTreeRenderer.BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {FamilyTreeRenderer.BACKENDS}.")
+
+    # Families are sent to the workers as plain data, which pickles faster than linked people.
+    tasks = [(FamilyTree.serialize_people(family), layout, backend) for family in split_families(people)]
+    rendered_families = map_in_processes(_render_family, tasks, jobs)
+    return "\n".join(rendered_families)
+
+
+def _render_family(task: tuple[dict, str, str]) -> str:
+    """Lay out and render one connected family, in a worker process.
+
+    :param task: The data of the family, the layout and the backend.
+    :return: The rendered family.
+    """
+    data, layout, backend = task
+    return FamilyTreeRenderer(FamilyTree.deserialize_data(data, layout), backend).render()
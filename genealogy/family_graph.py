@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+from genealogy.person import Person
+
+
+class FamilyGraph:
+    """Compact integer-indexed view of the relationships between people, for traversals.
+
+    The `parents` and `children` of each `Person` remain the source of truth: the graph is derived
+    from them, and must be told of each edit to stay in sync, as `FamilyTree` does. It adds to the
+    memory of the people rather than replacing it, in exchange for traversals by integer index over
+    NumPy arrays, as generations, layouts, ancestry and kinship need.
+
+    People are addressed by their dense index in the sequence the graph is built from. Parents and
+    children are held in compressed sparse row (CSR) arrays: the parents of person `i` are
+    `parents_idx[parents_ptr[i]:parents_ptr[i + 1]]`, and likewise for children. A parent linked to
+    a child by several relationships appears only once. Edits update the arrays in place around the
+    people involved, see `add_link`, `remove_link` and `move`, rather than building them again.
+    """
+
+    def __init__(self, people: Sequence[Person]):
+        """Build the graph from a sequence of people.
+
+        :param people: The people to index, all their parents must be included.
+        """
+        self.people: list[Person] = list(people)
+        self.index_by_id: dict[str, int] = {person.id: i for i, person in enumerate(self.people)}
+
+        edges: dict[tuple[int, int], None] = {}
+        for i, person in enumerate(self.people):
+            for parent in person.parents.values():
+                edges[i, self.index_by_id[parent.id]] = None
+
+        n_people = len(self.people)
+        edge_children = np.fromiter((child for child, _ in edges), dtype=np.int32, count=len(edges))
+        edge_parents = np.fromiter((parent for _, parent in edges), dtype=np.int32, count=len(edges))
+
+        self.parents_ptr: np.ndarray = self._offsets(np.bincount(edge_children, minlength=n_people))
+        self.parents_idx: np.ndarray = edge_parents
+
+        order = np.argsort(edge_parents, kind="stable")
+        self.children_ptr: np.ndarray = self._offsets(np.bincount(edge_parents, minlength=n_people))
+        self.children_idx: np.ndarray = edge_children[order]
+
+    def __len__(self) -> int:
+        return len(self.people)
+
+    def add_person(self, person: Person) -> int:
+        """Add a person without relationships, indexed after everyone else.
+
+        :param person: The person to add.
+        :return: The index of the person.
+        """
+        index = len(self.people)
+        self.people.append(person)
+        self.index_by_id[person.id] = index
+        self.parents_ptr = np.append(self.parents_ptr, self.parents_ptr[-1])
+        self.children_ptr = np.append(self.children_ptr, self.children_ptr[-1])
+        return index
+
+    def add_link(self, child: int, parent: int) -> None:
+        """Link a child to a parent, in place, unless they are already linked by another relationship.
+
+        The parent is added last to the parents of the child, and the child among the children of
+        the parent in increasing order of index, as when building the graph.
+
+        :param child: The index of the child.
+        :param parent: The index of the parent.
+        """
+        parents_start, parents_end = self.parents_ptr[child], self.parents_ptr[child + 1]
+        if parent in self.parents_idx[parents_start:parents_end]:
+            return
+        self.parents_idx = np.insert(self.parents_idx, parents_end, parent)
+        self.parents_ptr[child + 1:] += 1
+
+        children_start, children_end = self.children_ptr[parent], self.children_ptr[parent + 1]
+        position = children_start + np.searchsorted(self.children_idx[children_start:children_end], child)
+        self.children_idx = np.insert(self.children_idx, position, child)
+        self.children_ptr[parent + 1:] += 1
+
+    def remove_link(self, child: int, parent: int) -> None:
+        """Unlink a child from a parent, in place, unless they are still linked by another relationship.
+
+        :param child: The index of the child.
+        :param parent: The index of the parent.
+        """
+        person, parent_person = self.people[child], self.people[parent]
+        if any(other is parent_person for other in person.parents.values()):
+            return
+        parents_start, parents_end = self.parents_ptr[child], self.parents_ptr[child + 1]
+        position = parents_start + np.flatnonzero(self.parents_idx[parents_start:parents_end] == parent)[0]
+        self.parents_idx = np.delete(self.parents_idx, position)
+        self.parents_ptr[child + 1:] -= 1
+
+        children_start, children_end = self.children_ptr[parent], self.children_ptr[parent + 1]
+        position = children_start + np.searchsorted(self.children_idx[children_start:children_end], child)
+        self.children_idx = np.delete(self.children_idx, position)
+        self.children_ptr[parent + 1:] -= 1
+
+    def move(self, people: Sequence[Person]) -> None:
+        """Move some people to the indices they occupy, in the given order, e.g. to keep a topological order.
+
+        Only the rows of the people indexed between the first and last of those indices are copied,
+        and the links of the moved people renumbered.
+
+        :param people: The people to move, in their new order.
+        """
+        old_indices = [self.index_by_id[person.id] for person in people]
+        new_indices = sorted(old_indices)
+        new_index = dict(zip(old_indices, new_indices))
+        # Renumber the moved people in the rows of their relatives, all found before any is renumbered.
+        parents = {
+            j for i in old_indices for j in self.parents_idx[self.parents_ptr[i]:self.parents_ptr[i + 1]].tolist()
+        }
+        children = {
+            j for i in old_indices for j in self.children_idx[self.children_ptr[i]:self.children_ptr[i + 1]].tolist()
+        }
+        for j in parents:
+            row = self.children_idx[self.children_ptr[j]:self.children_ptr[j + 1]]
+            row[:] = sorted(new_index.get(k, k) for k in row.tolist())
+        for j in children:
+            row = self.parents_idx[self.parents_ptr[j]:self.parents_ptr[j + 1]]
+            row[:] = [new_index.get(k, k) for k in row.tolist()]
+
+        self.parents_ptr, self.parents_idx = self._move_rows(self.parents_ptr, self.parents_idx, new_index)
+        self.children_ptr, self.children_idx = self._move_rows(self.children_ptr, self.children_idx, new_index)
+        for person, index in zip(people, new_indices):
+            self.people[index] = person
+            self.index_by_id[person.id] = index
+
+    @property
+    def edge_children(self) -> np.ndarray:
+        """Get the child index of each parent-child link, aligned with `parents_idx`."""
+        return np.repeat(np.arange(len(self), dtype=np.int32), np.diff(self.parents_ptr))
+
+    def component(self, start: int) -> list[int]:
+        """Find the connected family of a person.
+
+        :param start: The index of the person.
+        :return: The indices of the members of the family, in increasing order.
+        """
+        children_ptr, children_idx = self.children_ptr, self.children_idx
+        parents_ptr, parents_idx = self.parents_ptr, self.parents_idx
+
+        members = {start}
+        stack = [start]
+        while stack:
+            i = stack.pop()
+            neighbours = (
+                children_idx[children_ptr[i]:children_ptr[i + 1]].tolist()
+                + parents_idx[parents_ptr[i]:parents_ptr[i + 1]].tolist()
+            )
+            for j in neighbours:
+                if j not in members:
+                    members.add(j)
+                    stack.append(j)
+        return sorted(members)
+
+    def label_components(self) -> np.ndarray:
+        """Label the connected families, numbered in order of their first member.
+
+        :return: The family label of each person.
+        """
+        children_ptr, children_idx = self.children_ptr.tolist(), self.children_idx.tolist()
+        parents_ptr, parents_idx = self.parents_ptr.tolist(), self.parents_idx.tolist()
+
+        labels = [-1] * len(self)
+        n_components = 0
+        for start in range(len(self)):
+            if labels[start] != -1:
+                continue
+            labels[start] = n_components
+            stack = [start]
+            while stack:
+                i = stack.pop()
+                neighbours = (
+                    children_idx[children_ptr[i]:children_ptr[i + 1]]
+                    + parents_idx[parents_ptr[i]:parents_ptr[i + 1]]
+                )
+                for j in neighbours:
+                    if labels[j] == -1:
+                        labels[j] = n_components
+                        stack.append(j)
+            n_components += 1
+        return np.array(labels, dtype=np.int32)
+
+    @staticmethod
+    def _move_rows(ptr: np.ndarray, idx: np.ndarray, new_index: Mapping[int, int]) -> tuple[np.ndarray, np.ndarray]:
+        """Move the rows of CSR arrays to new indices, the rows between the moved ones being copied too.
+
+        :param ptr: The offsets of the rows.
+        :param idx: The values of the rows.
+        :param new_index: The new index of each moved row, a permutation of the moved indices.
+        :return: The new offsets and values.
+        """
+        lower, upper = min(new_index), max(new_index) + 1
+        rows = np.arange(lower, upper)
+        for old, new in new_index.items():
+            rows[new - lower] = old
+        lengths = np.diff(ptr)[rows]
+        new_ptr = ptr.copy()
+        np.cumsum(lengths, out=new_ptr[lower + 1:upper + 1])
+        new_ptr[lower + 1:upper + 1] += ptr[lower]
+        new_idx = idx.copy()
+        starts = np.repeat(ptr[rows] - new_ptr[lower:upper], lengths)
+        positions = np.arange(ptr[lower], ptr[upper])
+        new_idx[positions] = idx[positions + starts]
+        return new_ptr, new_idx
+
+    @staticmethod
+    def _offsets(counts: np.ndarray) -> np.ndarray:
+        """Turn per-person counts into CSR offsets.
+
+        :param counts: The number of neighbours of each person.
+        :return: The offsets, one longer than the counts.
+        """
+        offsets = np.zeros(len(counts) + 1, dtype=np.int32)
+        np.cumsum(counts, out=offsets[1:])
+        return offsets
@@ -1,55 +1,317 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+import bisect
+from collections.abc import Callable, Collection, Iterable, Sequence
 import json
+import math
+import os
+import numpy as np
 import random
 import yaml
 
+from genealogy import profiler
+from genealogy.ancestry import AncestorIndex
+from genealogy.duplicates import find_duplicates
+from genealogy.family_graph import FamilyGraph
+from genealogy.gedcom import GedcomReader
+from genealogy.kinship import Kinship
+from genealogy.layout import LAYOUT_ENGINES, LayoutEngine
 from genealogy.person import Person
+from genealogy.scope import Scope
 from genealogy.utils import Relationship
 
 
+_YamlLoader: type[yaml.SafeLoader] = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+"""The fastest available safe YAML loader, backed by libyaml when PyYAML was built with it."""
+
+
 class FamilyTree:
     """Manages a collection of Person objects and their relationships.
 
     Has methods to compute the generations of people and optimize the layout of the family tree, as
-    well as methods to serialize and deserialize the data to and from JSON.
+    well as methods to serialize and deserialize the data to and from JSON. People and relationships
+    can also be edited one at a time, only updating the part of the tree affected by each edit.
     """
 
+    LAYOUTS: tuple[str, ...] = tuple(LAYOUT_ENGINES)
+    """Available strategies to order the people of the family tree, see `LAYOUT_ENGINES`."""
+
+    @classmethod
+    def from_file(cls, data_path: str, layout: str = "relax", scope: Scope | None = None) -> FamilyTree:
+        """Create a FamilyTree from a YAML, JSON or GEDCOM file, parsing it straight from the file handle.
+
+        :param data_path: Path to a .yml, .json or .ged file containing people and relationships.
+        :param layout: The layout strategy, one of `LAYOUTS`.
+        :param scope: Optional scope restricting the tree to the relatives of a root person.
+        :return: A new `FamilyTree` instance created from the file data.
+        :raises ValueError: If the file is neither in JSON, YAML nor GEDCOM format.
+        """
+        return cls(cls.read_people(data_path), layout, scope)
+
+    @classmethod
+    def read_people(cls, data_path: str) -> list[Person]:
+        """Read the people of a YAML, JSON or GEDCOM file, without laying them out as a FamilyTree.
+
+        :param data_path: Path to a .yml, .json or .ged file containing people and relationships.
+        :return: The people, with their relationships set up.
+        :raises ValueError: If the file is neither in JSON, YAML nor GEDCOM format.
+        """
+        extension = os.path.splitext(data_path)[1].lower()
+        if extension == ".ged":
+            return cls._read_gedcom(data_path)
+        if extension not in (".yml", ".json"):
+            raise ValueError("Data file must be in JSON, YAML or GEDCOM format.")
+
+        with open(data_path, "rb") as f, profiler.stage("parse"):
+            if extension == ".yml":
+                data = yaml.load(f, Loader=_YamlLoader)
+            else:
+                data = json.load(f)
+        return cls._deserialize_people(data)
+
+    @classmethod
+    def from_gedcom(cls, gedcom_path: str, layout: str = "relax", scope: Scope | None = None) -> FamilyTree:
+        """Create a FamilyTree from a GEDCOM file, streaming it line by line.
+
+        Families link their husband and wife as father and mother of each of their children, or as
+        adoptive father and mother for children with an "adopted" pedigree.
+
+        :param gedcom_path: Path to the GEDCOM file.
+        :param layout: The layout strategy, one of `LAYOUTS`.
+        :param scope: Optional scope restricting the tree to the relatives of a root person.
+        :return: A new `FamilyTree` instance created from the GEDCOM data.
+        """
+        return cls(cls._read_gedcom(gedcom_path), layout, scope)
+
     @classmethod
-    def from_json(cls, json_data: str) -> FamilyTree:
+    def from_json(cls, json_data: str, layout: str = "relax", scope: Scope | None = None) -> FamilyTree:
         """Create a FamilyTree from a JSON string containing people and relationships.
 
         The JSON should have "people" mapping IDs to full names and "relationships" mapping
         child IDs to relationship types to parent IDs.
 
         :param json_data: The JSON string containing the family data.
+        :param layout: The layout strategy, one of `LAYOUTS`.
+        :param scope: Optional scope restricting the tree to the relatives of a root person.
         :return: A new `FamilyTree` instance created from the JSON data.
         """
-        return cls._deserialize_data(json.loads(json_data))
+        return cls.deserialize_data(json.loads(json_data), layout, scope)
 
     @classmethod
-    def from_yaml(cls, yaml_data: str) -> FamilyTree:
+    def from_yaml(cls, yaml_data: str, layout: str = "relax", scope: Scope | None = None) -> FamilyTree:
         """Create a FamilyTree from a YAML string containing people and relationships.
 
         The YAML should have "people" mapping IDs to full names and "relationships" mapping
         child IDs to relationship types to parent IDs.
 
         :param yaml_data: The YAML string containing the family data.
+        :param layout: The layout strategy, one of `LAYOUTS`.
+        :param scope: Optional scope restricting the tree to the relatives of a root person.
         :return: A new `FamilyTree` instance created from the YAML data.
         """
-        return cls._deserialize_data(yaml.safe_load(yaml_data))
+        return cls.deserialize_data(yaml.load(yaml_data, Loader=_YamlLoader), layout, scope)
+
+    @classmethod
+    def deserialize_data(cls, data: dict, layout: str = "relax", scope: Scope | None = None) -> FamilyTree:
+        """Create a FamilyTree from deserialized data, e.g. as read from JSON or YAML.
 
-    def __init__(self, people: Iterable[Person]):
+        :param data: Dict containing people and relationships data.
+        :param layout: The layout strategy, one of `LAYOUTS`.
+        :param scope: Optional scope restricting the tree to the relatives of a root person.
+        :return: A new FamilyTree instance.
+        """
+        return cls(cls._deserialize_people(data), layout, scope)
+
+    def __init__(self, people: Iterable[Person], layout: str | LayoutEngine = "relax", scope: Scope | None = None):
         """Initialize the FamilyTree with a list of Person objects.
 
         :param people: An iterable of `Person` objects.
+        :param layout: The layout strategy, one of `LAYOUTS` or a `LayoutEngine`. "relax" iteratively
+            optimizes the ordering, "solve" computes a spectral ordering of the family graph in a
+            fraction of the time, "layered" orders each generation to reduce the crossings of the
+            connections.
+        :param scope: Optional scope restricting the tree to the relatives of a root person. Only
+            the people in scope are laid out.
+        :raises ValueError: If the layout is unknown, or the root person of the scope is missing.
         """
+        engine = LAYOUT_ENGINES.get(layout) if isinstance(layout, str) else layout
+        if engine is None:
+            raise ValueError(f"Unknown layout {layout!r}, expected one of {self.LAYOUTS}.")
+
         random.seed(0)
 
-        self.people: list[Person] = sorted(people)
-        self._compute_generations()
-        self._relax()
+        self.revision: int = 0
+        """Number of edits made to the tree, so renderers can tell when to draw it again."""
+        self._ancestor_index: AncestorIndex | None = None
+        self._kinships: dict[bool, Kinship] = {}
+
+        if scope is not None:
+            with profiler.stage("scope"):
+                people = scope.select(people)
+        with profiler.stage("sort"):
+            self.people: list[Person] = sorted(people)
+            self._sort_topologically()
+        profiler.count("people", len(self.people))
+        with profiler.stage("graph"):
+            self.graph: FamilyGraph = FamilyGraph(self.people)
+            """Relationships of the people, indexed in topological order, children before their parents.
+
+            Derived from the links of the people, and kept in sync with them by the edit methods.
+            """
+        with profiler.stage("generations"):
+            self._compute_generations()
+        with profiler.stage("layout"):
+            engine.lay_out(self)
+
+    def add_person(self, person: Person) -> None:
+        """Add a person to the family tree, placed after everyone else.
+
+        :param person: The person to add, without relationships yet, see `add_relationship`.
+        :raises ValueError: If the ID of the person is already used, or the person has relationships.
+        """
+        if person.id in self.graph.index_by_id:
+            raise ValueError(f"Duplicate person ID {person.id!r}.")
+        if person.parents or person.children:
+            raise ValueError(f"{person} must be added without relationships, see add_relationship.")
+
+        person.generation = 0
+        if self.people:
+            last_position = self.people[-1].relax_position
+            person.relax_position = min(last_position - 1.0, math.nextafter(last_position, -math.inf))
+        else:
+            person.relax_position = 0.0
+        self.people.append(person)
+        self.graph.add_person(person)
+        self._ancestor_index = None
+        self._kinships.clear()
+        self.revision += 1
+
+    def add_relationship(self, child_id: str, relationship: Relationship, parent_id: str) -> None:
+        """Add a relationship between two people of the family tree.
+
+        The generations are only computed again for the family the two people now belong to, and
+        only the two people are moved in the layout, toward their relatives.
+
+        :param child_id: The ID of the child.
+        :param relationship: The relationship of the parent to the child.
+        :param parent_id: The ID of the parent.
+        :raises ValueError: If a person is unknown, the child already has a parent for this
+            relationship, or the parent is a descendant of the child.
+        """
+        child, parent = self._get_person(child_id), self._get_person(parent_id)
+        if relationship in child.parents:
+            raise ValueError(f"{child} already has a {relationship.value}, {child.parents[relationship]}.")
+
+        self._reorder_topologically(child, parent)
+        child.parents[relationship] = parent
+        parent.children.append(child)
+        self.graph.add_link(self._get_index(child_id), self._get_index(parent_id))
+        self._update([child, parent])
+
+    def remove_relationship(self, child_id: str, relationship: Relationship) -> None:
+        """Remove a relationship between two people of the family tree.
+
+        The generations are only computed again for the families the two people now belong to, and
+        only the two people are moved in the layout, toward their relatives.
+
+        :param child_id: The ID of the child.
+        :param relationship: The relationship of the parent to remove.
+        :raises ValueError: If the child is unknown, or has no parent for this relationship.
+        """
+        child = self._get_person(child_id)
+        parent = child.parents.pop(relationship, None)
+        if parent is None:
+            raise ValueError(f"{child} has no {relationship.value}.")
+
+        parent.children.remove(child)
+        self.graph.remove_link(self._get_index(child_id), self._get_index(parent.id))
+        self._update([child, parent])
+
+    @property
+    def ancestor_index(self) -> AncestorIndex:
+        """Get the index answering ancestry queries, built on first use and after each edit."""
+        if self._ancestor_index is None:
+            with profiler.stage("ancestor_index"):
+                self._ancestor_index = AncestorIndex(self.graph)
+        return self._ancestor_index
+
+    def is_ancestor(self, ancestor_id: str, person_id: str) -> bool:
+        """Check whether a person is an ancestor of another one, through any parents.
+
+        :param ancestor_id: The ID of the potential ancestor.
+        :param person_id: The ID of the person.
+        :return: Whether the first person is an ancestor of the second one, never of themselves.
+        :raises ValueError: If a person is unknown.
+        """
+        return self.ancestor_index.is_ancestor(self._get_index(ancestor_id), self._get_index(person_id))
+
+    def common_ancestors(self, first_id: str, second_id: str) -> list[Person]:
+        """Find the nearest common ancestors of two people, through any parents.
+
+        :param first_id: The ID of the first person.
+        :param second_id: The ID of the second person.
+        :return: The common ancestors none of whose children is a common ancestor, e.g. the parents
+            of siblings. If one person is an ancestor of the other, they are the only one.
+        :raises ValueError: If a person is unknown.
+        """
+        indices = self.ancestor_index.common_ancestors(self._get_index(first_id), self._get_index(second_id))
+        return [self.graph.people[i] for i in indices]
+
+    def relationship_degree(self, first_id: str, second_id: str) -> int | None:
+        """Compute the degree of relationship of two people, through any parents.
+
+        :param first_id: The ID of the first person.
+        :param second_id: The ID of the second person.
+        :return: The number of parent-child links on the shortest path joining the two people through
+            a common ancestor, e.g. 2 for siblings, or None if they have no common ancestor.
+        :raises ValueError: If a person is unknown.
+        """
+        return self.ancestor_index.relationship_degree(self._get_index(first_id), self._get_index(second_id))
+
+    def kinship_matrix(self, ids: Sequence[str] | None = None, adoptive: bool = False) -> np.ndarray:
+        """Compute the coefficients of kinship between people.
+
+        The kinship of two people is the probability that alleles drawn at random from each of them
+        are identical by descent, e.g. 1/4 for a parent and child or for siblings, 1/16 for first
+        cousins. While computing, only the people whose children are still to come are held, so
+        the size of the returned matrix is the main cost: for large trees, pass the IDs of the
+        people of interest.
+
+        :param ids: The IDs of the people, defaults to everyone in the order of `people`.
+        :param adoptive: Whether adopted people descend from their adoptive parents, in place of
+            their biological parents. Otherwise, adoptive relationships are ignored.
+        :return: The symmetric matrix of the kinship coefficients, in the order of the IDs.
+        :raises ValueError: If a person is unknown.
+        """
+        if ids is None:
+            ids = [person.id for person in self.people]
+        indices = [self._get_index(person_id) for person_id in ids]
+        kinship = self._get_kinship(adoptive)
+        with profiler.stage("kinship"):
+            return kinship.matrix(indices)
+
+    def inbreeding_coefficients(self, adoptive: bool = False) -> dict[str, float]:
+        """Compute the coefficient of inbreeding of each person, the kinship of their parents.
+
+        :param adoptive: Whether adopted people descend from their adoptive parents, in place of
+            their biological parents. Otherwise, adoptive relationships are ignored.
+        :return: The inbreeding coefficients, by person ID, 0 for people without both parents.
+        """
+        kinship = self._get_kinship(adoptive)
+        with profiler.stage("inbreeding"):
+            return dict(zip((person.id for person in self.graph.people), kinship.inbreeding.tolist()))
+
+    def find_duplicates(self, threshold: float = 0.8, max_block_size: int = 64) -> list[tuple[Person, Person, float]]:
+        """Suggest pairs of people to merge, who are likely the same person under different IDs.
+
+        Only people sharing a blocking key, built from their names and those of their parents or
+        children, are compared, see `genealogy.duplicates.find_duplicates`.
+
+        :param threshold: The minimum similarity, from 0 to 1, of the suggested pairs.
+        :param max_block_size: The maximum number of people sharing a key for them to be compared.
+        :return: The pairs of likely duplicates with their similarity, the most similar first.
+        """
+        return find_duplicates(self.people, threshold, max_block_size)
 
     def to_json(self) -> str:
         """Serialize the FamilyTree to a JSON string.
@@ -65,84 +327,287 @@ class FamilyTree:
         """
         return yaml.dump(self._serialize_data(), indent=2)
 
-    def __repr__(self) -> str:
-        people_str = ",\n    ".join([repr(person) for person in self.people])
-        return f"FamilyTree([\n    {people_str}\n])"
-
-    @classmethod
-    def _deserialize_data(cls, data: dict) -> FamilyTree:
-        """Helper method to create a FamilyTree from deserialized data.
-
-        :param data: Dict containing people and relationships data.
-        :return: A new FamilyTree instance.
-        """
-        people_dict: dict[str, Person] = {}
-
-        # Create Person objects from people data
-        for id_, name in data["people"].items():
-            person = Person(id_, name)
-            people_dict[id_] = person
-
-        # Set up relationships and add any additional people mentioned in relationships
-        for child_id, parents in data["relationships"].items():
-            child = people_dict.setdefault(child_id, Person(child_id, child_id))
-            for relationship, parent_id in parents.items():
-                parent = people_dict.setdefault(parent_id, Person(parent_id, parent_id))
-                child.parents[Relationship[relationship]] = parent
-                parent.children.append(child)
-
-        return cls(people_dict.values())
-
-    def _serialize_data(self) -> dict:
-        """Helper method to prepare data for serialization.
+    @staticmethod
+    def serialize_people(people: Iterable[Person]) -> dict:
+        """Prepare the data of people for serialization, the inverse of `deserialize_data`.
 
+        :param people: The people, whose parents must all be included.
         :return: Dict containing people and relationships data.
         """
+        people = list(people)
         return {
             "people": {
-                person.id: person.name for person in self.people
+                person.id: person.name for person in people
             },
             "relationships": {
                 person.id: {
                     rel.name: parent.id
                     for rel, parent in person.parents.items()
                 }
-                for person in self.people
+                for person in people
                 if person.parents
             }
         }
 
-    def _compute_generations(self) -> None:
-        """Compute the generation number for each person in the family tree.
+    def __repr__(self) -> str:
+        people_str = ",\n    ".join([repr(person) for person in self.people])
+        return f"FamilyTree([\n    {people_str}\n])"
 
-        Start with 0 for the current generation offsprings. Modify the generation attribute of each
-        Person based on their relationships.
+    @staticmethod
+    def _read_gedcom(gedcom_path: str) -> list[Person]:
+        """Helper method to read the people of a GEDCOM file, streaming it line by line.
+
+        :param gedcom_path: Path to the GEDCOM file.
+        :return: The people, with their relationships set up.
+        """
+        with open(gedcom_path, encoding="utf-8-sig", errors="replace") as f, profiler.stage("parse"):
+            return GedcomReader().read(f)
+
+    @staticmethod
+    def _deserialize_people(data: dict) -> list[Person]:
+        """Helper method to create the people of a FamilyTree from deserialized data.
+
+        :param data: Dict containing people and relationships data.
+        :return: The people, with their relationships set up.
+        :raises ValueError: If the data doesn't map "people" IDs to names, and "relationships" child
+            IDs to relationship types to parent IDs.
         """
-        self._sort_topologically()
+        with profiler.stage("deserialize"):
+            people = data.get("people") if isinstance(data, dict) else None
+            relationships = data.get("relationships") if isinstance(data, dict) else None
+            if not isinstance(people, dict) or not isinstance(relationships, dict):
+                raise ValueError("The data must map \"people\" and \"relationships\".")
+
+            # Create Person objects from people data
+            people_dict: dict[str, Person] = {}
+            for id_, name in people.items():
+                if not isinstance(id_, str) or not isinstance(name, str):
+                    raise ValueError(f"Invalid person {id_!r}: {name!r}, IDs and names must be strings.")
+                people_dict[id_] = Person(id_, name)
+
+            # Set up relationships and add any additional people mentioned in relationships, only
+            # creating a Person when it is missing.
+            for child_id, parents in relationships.items():
+                if not isinstance(child_id, str) or not isinstance(parents, dict):
+                    raise ValueError(f"Invalid relationships of {child_id!r}: {parents!r}, expected a mapping.")
+                child = people_dict.get(child_id)
+                if child is None:
+                    child = people_dict[child_id] = Person(child_id, child_id)
+                for relationship, parent_id in parents.items():
+                    if (
+                            not isinstance(relationship, str) or relationship not in Relationship.__members__
+                            or not isinstance(parent_id, str)
+                    ):
+                        raise ValueError(f"Invalid relationship of {child_id!r}: {relationship!r}: {parent_id!r}.")
+                    parent = people_dict.get(parent_id)
+                    if parent is None:
+                        parent = people_dict[parent_id] = Person(parent_id, parent_id)
+                    child.parents[Relationship[relationship]] = parent
+                    parent.children.append(child)
+
+        return list(people_dict.values())
 
-        for i, person in enumerate(self.people):
-            for child in person.children:
-                person.generation = max(person.generation, child.generation + 1)
+    def _serialize_data(self) -> dict:
+        """Helper method to prepare data for serialization.
 
-        for i, person in zip(range(len(self.people) - 1, -1, -1), reversed(self.people)):
-            min_generation: int | None = None
-            for parent in person.parents.values():
-                if min_generation is None or parent.generation < min_generation:
-                    min_generation = parent.generation
-            if min_generation is not None:
-                person.generation = min_generation - 1
+        :return: Dict containing people and relationships data.
+        """
+        return self.serialize_people(self.people)
+
+    def _compute_generations(self, indices: Collection[int] | None = None) -> None:
+        """Compute the generation number for each person in the family tree.
+
+        Start with 0 for the current generation offsprings. Modify the generation attribute of each
+        Person based on their relationships. The people must be sorted topologically, as indexed in
+        the graph.
+
+        :param indices: Optional graph indices of the people to compute the generations of, starting
+            from 0 again. They must include whole connected families, whose generations don't
+            depend on anyone else. Only their rows of the graph are read.
+        """
+        graph = self.graph
+        order: Sequence[int]
+        if indices is None:
+            order = range(len(graph))
+            generations = {i: person.generation for i, person in enumerate(graph.people)}
+            children_ptr, children_idx = graph.children_ptr.tolist(), graph.children_idx.tolist()
+            parents_ptr, parents_idx = graph.parents_ptr.tolist(), graph.parents_idx.tolist()
+        else:
+            order = sorted(indices)
+            generations = dict.fromkeys(order, 0)
+            children_ptr, children_idx = graph.children_ptr, graph.children_idx
+            parents_ptr, parents_idx = graph.parents_ptr, graph.parents_idx
+
+        for i in order:
+            for j in children_idx[children_ptr[i]:children_ptr[i + 1]]:
+                generations[i] = max(generations[i], generations[j] + 1)
+
+        for i in reversed(order):
+            parents = parents_idx[parents_ptr[i]:parents_ptr[i + 1]]
+            if len(parents):
+                generations[i] = min(generations[j] for j in parents) - 1
+
+        for i in order:
+            graph.people[i].generation = int(generations[i])
 
     def _sort_topologically(self) -> None:
         """Sort the people in the family tree topologically."""
-        visited: list[Person] = []
-        processing: list[Person] = []
+        visited: set[Person] = set()
         sorted_nodes: list[Person] = []
         for node in self.people:
-            if node not in visited:
-                node.traverse_parents_depth_first(visited, processing, post_order_callback=sorted_nodes.append)
+            node.traverse_parents_depth_first(visited, post_order_callback=sorted_nodes.append)
 
         self.people[:] = reversed(sorted_nodes)
 
+    def _get_person(self, person_id: str) -> Person:
+        """Get a person of the family tree by ID.
+
+        :param person_id: The ID of the person.
+        :return: The person.
+        :raises ValueError: If no person has this ID.
+        """
+        return self.graph.people[self._get_index(person_id)]
+
+    def _get_index(self, person_id: str) -> int:
+        """Get the graph index of a person of the family tree by ID.
+
+        :param person_id: The ID of the person.
+        :return: The index of the person in the graph.
+        :raises ValueError: If no person has this ID.
+        """
+        index = self.graph.index_by_id.get(person_id)
+        if index is None:
+            raise ValueError(f"Unknown person {person_id!r}.")
+        return index
+
+    def _get_kinship(self, adoptive: bool) -> Kinship:
+        """Get the computation of the kinship and inbreeding coefficients, renewed after each edit.
+
+        :param adoptive: Whether adopted people descend from their adoptive parents.
+        :return: The computation of the coefficients.
+        """
+        kinship = self._kinships.get(adoptive)
+        if kinship is None:
+            kinship = self._kinships[adoptive] = Kinship(self.graph, adoptive)
+        return kinship
+
+    def _reorder_topologically(self, child: Person, parent: Person) -> None:
+        """Reorder the graph topologically for a new relationship, before adding it.
+
+        Only the descendants of the child and the ancestors of the parent indexed between the two
+        are moved, the descendants before the ancestors, into the indices they already occupy.
+
+        :param child: The child of the new relationship.
+        :param parent: The parent of the new relationship.
+        :raises ValueError: If the parent is the child or one of their descendants.
+        """
+        index_by_id = self.graph.index_by_id
+        lower, upper = index_by_id[parent.id], index_by_id[child.id]
+        if lower > upper:
+            return
+
+        ancestors: list[Person] = []
+        stack = [parent]
+        visited = {parent}
+        while stack:
+            person = stack.pop()
+            if person is child:
+                raise ValueError(f"Cycle detected: {parent} is a descendant of {child}.")
+            ancestors.append(person)
+            for grandparent in person.parents.values():
+                if grandparent not in visited and index_by_id[grandparent.id] <= upper:
+                    visited.add(grandparent)
+                    stack.append(grandparent)
+
+        descendants: list[Person] = []
+        stack = [child]
+        visited = {child}
+        while stack:
+            person = stack.pop()
+            descendants.append(person)
+            for grandchild in person.children:
+                if grandchild not in visited and index_by_id[grandchild.id] >= lower:
+                    visited.add(grandchild)
+                    stack.append(grandchild)
+
+        def index_of(person: Person) -> int:
+            return index_by_id[person.id]
+
+        self.graph.move(sorted(descendants, key=index_of) + sorted(ancestors, key=index_of))
+
+    def _update(self, people: Collection[Person]) -> None:
+        """Update the tree after the relationships of some people were edited, the graph included.
+
+        :param people: The people whose relationships were edited.
+        """
+        affected: set[int] = set()
+        for person in people:
+            index = self.graph.index_by_id[person.id]
+            if index not in affected:
+                affected.update(self.graph.component(index))
+        self._compute_generations(affected)
+        self._relax_locally(people)
+        self._ancestor_index = None
+        self._kinships.clear()
+        self.revision += 1
+
+    def _relax_locally(self, people: Collection[Person], n_iterations: int = 16) -> None:
+        """Move some people toward their relatives, keeping everyone else in the same order.
+
+        Each person is moved to the average position of their parents and children, people being
+        positioned by their rank in the current ordering. The people are then taken out of the
+        ordering and inserted back at their new rank, found by bisection, so that the others are
+        neither ranked nor sorted again.
+
+        :param people: The people to move.
+        :param n_iterations: Number of optimization iterations.
+        """
+        ranks: dict[Person, int] = {}
+        for person in people:
+            ranks[person] = self._rank(person)
+            for relative in [*person.parents.values(), *person.children]:
+                if relative not in ranks:
+                    ranks[relative] = self._rank(relative)
+        positions: dict[Person, float] = {person: -float(rank) for person, rank in ranks.items()}
+        for _ in range(n_iterations):
+            for person in people:
+                relatives = [*person.parents.values(), *person.children]
+                if relatives:
+                    positions[person] = sum([positions[relative] for relative in relatives]) / len(relatives)
+
+        # The moved people go after the others of lower rank, and after those of the same rank they
+        # followed, as when sorting by position.
+        moved = sorted(set(people), key=lambda person: (-positions[person], ranks[person]))
+        old_ranks = sorted(ranks[person] for person in moved)
+        for rank in reversed(old_ranks):
+            del self.people[rank]
+        for n_inserted, person in enumerate(moved):
+            # Number of people, moved or not, ranked before the new rank in the ordering before the edit.
+            new_rank = -positions[person]
+            n_before = math.floor(new_rank) + 1 if new_rank < ranks[person] else math.ceil(new_rank)
+            n_before = max(0, min(n_before, len(self.people) + len(old_ranks)))
+            index = n_before - bisect.bisect_left(old_ranks, n_before) + n_inserted
+            self.people.insert(index, person)
+            above = self.people[index - 1].relax_position if index > 0 else None
+            below = self.people[index + 1].relax_position if index + 1 < len(self.people) else None
+            if above is not None and below is not None:
+                person.relax_position = (above + below) / 2
+            elif above is not None:
+                person.relax_position = above - 1.0
+            elif below is not None:
+                person.relax_position = below + 1.0
+            else:
+                person.relax_position = 0.0
+
+    def _rank(self, person: Person) -> int:
+        """Find the rank of a person in the ordering, by bisection on their position.
+
+        :param person: The person.
+        :return: The index of the person in `people`.
+        """
+        rank = bisect.bisect_left(self.people, -person.relax_position, key=lambda p: -p.relax_position)
+        return self.people.index(person, rank)
+
     def _relax(
             self,
             n_iterations: int = 128,
@@ -159,19 +624,128 @@ class FamilyTree:
         :param parents_force: Attractive force between child and parents.
         :param others_force: Attractive force between unrelated people. Would typically be negative.
         """
-        for i, person in enumerate(self.people):
-            person.relax_position = -float(i)
-
+        graph = self.graph
+        positions: list[float] = [-float(i) for i in range(len(graph))]
+        children_ptr, children_idx = graph.children_ptr.tolist(), graph.children_idx.tolist()
+        parents_ptr, parents_idx = graph.parents_ptr.tolist(), graph.parents_idx.tolist()
+
+        n_people = len(self.people)
+        total = sum(positions)
+        profiler.count("relax_iterations", n_iterations)
         for _ in range(n_iterations):
-            for person in self.people:
-                acceleration: float = 0.0
-                for other_person in self.people:
-                    if other_person in person.children:
-                        acceleration += (other_person.relax_position - person.relax_position) * children_force
-                    elif other_person in person.parents.values():
-                        acceleration += (other_person.relax_position - person.relax_position) * parents_force
-                    else:
-                        acceleration += (other_person.relax_position - person.relax_position) * others_force
-                person.relax_position += acceleration * force
+            for i in range(n_people):
+                position = positions[i]
+                children_start, children_end = children_ptr[i], children_ptr[i + 1]
+                parents_start, parents_end = parents_ptr[i], parents_ptr[i + 1]
+                children_sum = sum([positions[j] for j in children_idx[children_start:children_end]])
+                parents_sum = sum([positions[j] for j in parents_idx[parents_start:parents_end]])
+                n_children = children_end - children_start
+                n_parents = parents_end - parents_start
+
+                # Everyone else is unrelated, so their pull is taken from the population total
+                # rather than summed pairwise.
+                others_sum = total - children_sum - parents_sum
+                n_others = n_people - n_children - n_parents
+                acceleration = (
+                    (children_sum - n_children * position) * children_force
+                    + (parents_sum - n_parents * position) * parents_force
+                    + (others_sum - n_others * position) * others_force
+                )
+                new_position = position + acceleration * force
+                positions[i] = new_position
+                total += new_position - position
+
+        for person, position in zip(graph.people, positions):
+            person.relax_position = position
+        self.people.sort(key=lambda p: -p.relax_position)
 
+    def _solve(self, n_iterations: int = 64, tolerance: float = 1e-9) -> None:
+        """Order people by a spectral ordering of the family graph, computed by solving rather than sweeping.
+
+        People are ordered by the lowest non-constant vibration mode of the family graph Laplacian,
+        its Fiedler vector: the positions minimizing the sum of the squared distances between
+        relatives for a given spread, where each person sits close to the average position of their
+        relatives. It is a different ordering from that of `_relax`, whose repulsion between
+        unrelated people also shapes the result, but it takes a fraction of the time on large trees.
+        The mode is found by inverse iteration, each step solving the Laplacian system by conjugate
+        gradient. Each connected family is solved on its own, and families are stacked in the
+        order they first appear.
+
+        :param n_iterations: Maximum number of inverse iterations.
+        :param tolerance: Convergence threshold on the change of the positions between iterations.
+        """
+        n_people = len(self.people)
+        if not n_people:
+            return
+
+        graph = self.graph
+        degrees = (np.diff(graph.children_ptr) + np.diff(graph.parents_ptr)).astype(float)
+        sources = graph.edge_children
+        targets = graph.parents_idx
+
+        def laplacian(x: np.ndarray) -> np.ndarray:
+            neighbours_sum = (
+                np.bincount(sources, weights=x[targets], minlength=n_people)
+                + np.bincount(targets, weights=x[sources], minlength=n_people)
+            )
+            return degrees * x - neighbours_sum
+
+        components = graph.label_components()
+        component_sizes = np.bincount(components).astype(float)
+
+        def normalize(x: np.ndarray) -> np.ndarray:
+            x = x - (np.bincount(components, weights=x) / component_sizes)[components]
+            norms = np.sqrt(np.bincount(components, weights=x * x))
+            norms[norms == 0.0] = 1.0
+            return x / norms[components]
+
+        initial_positions = normalize(-np.arange(n_people, dtype=float))
+        positions = initial_positions
+        for _ in range(n_iterations):
+            profiler.count("solve_iterations")
+            new_positions = normalize(self._conjugate_gradient(laplacian, positions, tolerance))
+            # Keep each family oriented like the initial topological ordering.
+            orientations = np.sign(np.bincount(components, weights=new_positions * initial_positions))
+            orientations[orientations == 0.0] = 1.0
+            new_positions *= orientations[components]
+            is_converged = np.max(np.abs(new_positions - positions)) < tolerance
+            positions = new_positions
+            if is_converged:
+                break
+
+        order = np.lexsort((-positions, components))
+        for rank, i in enumerate(order.tolist()):
+            graph.people[i].relax_position = float(-rank)
         self.people.sort(key=lambda p: -p.relax_position)
+
+    @staticmethod
+    def _conjugate_gradient(
+            operator: Callable[[np.ndarray], np.ndarray],
+            rhs: np.ndarray,
+            tolerance: float,
+            shift: float = 1e-6,
+    ) -> np.ndarray:
+        """Solve `(operator + shift) x = rhs` for a symmetric positive semi-definite operator.
+
+        :param operator: Function applying the operator to a vector.
+        :param rhs: The right-hand side of the system.
+        :param tolerance: Convergence threshold on the residual norm, relative to the right-hand side.
+        :param shift: Small diagonal shift keeping the system positive definite.
+        :return: The solution of the system.
+        """
+        x = np.zeros_like(rhs)
+        residual = rhs.copy()
+        direction = residual.copy()
+        residual_norm = residual @ residual
+        threshold = tolerance * tolerance * residual_norm
+        for _ in range(len(rhs)):
+            if residual_norm <= threshold:
+                break
+            applied = operator(direction) + shift * direction
+            step = residual_norm / (direction @ applied)
+            x += step * direction
+            residual -= step * applied
+            new_residual_norm = residual @ residual
+            direction = residual + (new_residual_norm / residual_norm) * direction
+            residual_norm = new_residual_norm
+        return x
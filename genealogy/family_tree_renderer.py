@@ -1,7 +1,22 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
+import heapq
+
+import numpy as np
+
+from genealogy import profiler
+from genealogy.array_surface import ArrayArrowsSurface, ArraySurface, CompressionMap
 from genealogy.family_tree import FamilyTree
-from genealogy.surface import ArrowsSurface, ConnectionsType, CoupleConnection, Surface, SurfacePosition
+from genealogy.scope import Scope
+from genealogy.surface import (
+    ArrowsSurface,
+    ConnectionsType,
+    CoupleConnection,
+    Surface,
+    SurfaceLine,
+    SurfacePosition,
+)
 
 
 class FamilyTreeRenderer:
@@ -11,52 +26,224 @@ class FamilyTreeRenderer:
     Surface objects to render the different elements of the graphical representation as ASCII art.
     """
 
+    BACKENDS: tuple[str, ...] = ("list", "array")
+    """Available surface backends: "list" holds characters in Python lists, "array" in NumPy arrays."""
+
+    @classmethod
+    def from_file(cls, data_path: str, layout: str = "relax", scope: Scope | None = None) -> FamilyTreeRenderer:
+        """Create a FamilyTreeRenderer from a YAML, JSON or GEDCOM file.
+
+        :param data_path: Path to a .yml, .json or .ged file representing a family tree.
+        :param layout: The layout strategy, one of `FamilyTree.LAYOUTS`.
+        :param scope: Optional scope restricting the tree to the relatives of a root person.
+        :return: A new `FamilyTreeRenderer` object.
+        """
+        return cls(FamilyTree.from_file(data_path, layout, scope))
+
     @classmethod
-    def from_json(cls, family_tree_json: str) -> FamilyTreeRenderer:
+    def from_json(cls, family_tree_json: str, layout: str = "relax", scope: Scope | None = None) -> FamilyTreeRenderer:
         """Create a FamilyTreeRenderer from a JSON string.
 
         :param family_tree_json: JSON string representing a family tree.
+        :param layout: The layout strategy, one of `FamilyTree.LAYOUTS`.
+        :param scope: Optional scope restricting the tree to the relatives of a root person.
         :return: A new `FamilyTreeRenderer` object.
         """
-        return cls(FamilyTree.from_json(family_tree_json))
+        return cls(FamilyTree.from_json(family_tree_json, layout, scope))
 
     @classmethod
-    def from_yaml(cls, family_tree_yaml: str) -> FamilyTreeRenderer:
+    def from_yaml(cls, family_tree_yaml: str, layout: str = "relax", scope: Scope | None = None) -> FamilyTreeRenderer:
         """Create a FamilyTreeRenderer from a YAML string.
 
         :param family_tree_yaml: YAML string representing a family tree.
+        :param layout: The layout strategy, one of `FamilyTree.LAYOUTS`.
+        :param scope: Optional scope restricting the tree to the relatives of a root person.
         :return: A new `FamilyTreeRenderer` object.
         """
-        return cls(FamilyTree.from_yaml(family_tree_yaml))
+        return cls(FamilyTree.from_yaml(family_tree_yaml, layout, scope))
 
-    def __init__(self, family_tree: FamilyTree):
+    def __init__(self, family_tree: FamilyTree, backend: str = "list"):
         """Initialize the FamilyTreeRenderer.
 
         :param family_tree: The `FamilyTree` object to render.
+        :param backend: The surface backend, one of `BACKENDS`. Both render the same output, "array"
+            uses less memory and time on large trees.
+        :raises ValueError: If the backend is unknown.
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {self.BACKENDS}.")
+
         self.family_tree = family_tree
 
         self._coords: dict[str, SurfacePosition] = {}
-        self._names_surface: Surface = Surface()
-        self._arrows_surface: ArrowsSurface = ArrowsSurface()
-        self._surface: Surface = Surface()
+        self._names_surface: Surface | ArraySurface
+        self._arrows_surface: ArrowsSurface | ArrayArrowsSurface
+        if backend == "array":
+            self._names_surface = ArraySurface()
+            self._arrows_surface = ArrayArrowsSurface()
+        else:
+            self._names_surface = Surface()
+            self._arrows_surface = ArrowsSurface()
+        self._surface: Surface | ArraySurface = self._names_surface + self._arrows_surface
+
+        # Map of the compressed surface and index of what to draw on each line, for `render_window`.
+        self._compression_map: CompressionMap | None = None
+        self._person_lines: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._connections: list[tuple[int, CoupleConnection]] = []
+        self._connection_lines: np.ndarray = np.zeros((0, 2), dtype=np.int64)
+        self._mapped_revision: int | None = None
+        """Revision of the family tree the map was made from, None if not made yet."""
 
     def render(self) -> str:
         """Render the family tree using ASCII art.
 
         :return: The rendered family tree as a string.
         """
+        return "\n".join(self.render_iter())
+
+    def render_iter(self) -> Iterator[str]:
+        """Render the family tree using ASCII art, yielding one line at a time.
+
+        This isn't progressive: the whole surface is drawn and compressed before the first line is
+        yielded, and takes as much memory as with `render`. Vertical compression shifts each column
+        up by the clear paths crossing it, and in sparse columns these pile up from anywhere in the
+        tree, so even the first line can depend on the last people drawn. Only the output string
+        isn't built, the lines being converted one by one.
+
+        :return: An iterator over the lines of the rendered family tree.
+        """
+        self._draw()
+        yield from self._surface.iter_str()
+
+    def render_window(self, line_start: int, line_end: int, col_start: int, col_end: int) -> str:
+        """Render a rectangular window of the family tree using ASCII art.
+
+        Vertical compression shifts each column up by clear paths found through the whole surface,
+        so the first window after an edit draws the whole tree once to find them, as `render` does.
+        Only a map of the cells each rendered line is made of is kept, see `CompressionMap`. Each
+        window then draws the people and connections on the lines of the uncompressed surface its
+        cells come from, and nothing else. Compression spreads these lines over a few times the
+        height of the window, so scrolling through a large tree costs about the window size.
+
+        The window is clamped to the rendered tree, negative bounds counting as 0.
+
+        :param line_start: The first line of the window.
+        :param line_end: The line after the last line of the window.
+        :param col_start: The first column of the window.
+        :param col_end: The column after the last column of the window.
+        :return: The lines of the window, joined as a string.
+        """
+        if self._mapped_revision != self.family_tree.revision:
+            self._map_compression()
+        compression_map = self._compression_map
+        assert compression_map is not None
+
+        # The rendered tree ends with an empty line, added after compression.
+        lines = np.arange(max(line_start, 0), min(max(line_end, 0), len(compression_map) + 1))
+        lengths = np.append(compression_map.lengths, 0)[lines]
+        col_start, col_end = max(col_start, 0), max(col_end, 0)
+        mapped_col_end = max(min(col_end, compression_map.width), col_start)
+        sources = compression_map.source_lines(lines[lines < len(compression_map)], col_start, mapped_col_end)
+        drawn_lines = self._draw_lines(np.unique(sources))
+
+        window_lines = []
+        for i, length in enumerate(lengths.tolist()):
+            chars: list[str | None] = []
+            for index in range(col_start, min(col_end, length)):
+                drawn_line = drawn_lines.get(int(sources[i, index - col_start]))
+                chars.append(drawn_line[index] if drawn_line is not None and index < len(drawn_line) else None)
+            window_lines.append(SurfaceLine(chars).as_str)
+        return "\n".join(window_lines)
+
+    def _draw(self) -> None:
+        """Draw the names and arrows of the family tree, and compress the resulting surface."""
         self._coords.clear()
         self._names_surface.clear()
         self._arrows_surface.clear()
         self._surface.clear()
 
-        self._draw_names_surface()
+        with profiler.stage("draw_names"):
+            self._draw_names_surface()
         self._draw_arrows_surface()
-        self._surface = self._names_surface + self._arrows_surface
-        self._surface.compress_vertically()
-        self._surface.add_line()
-        return self._surface.as_str
+        with profiler.stage("compress"):
+            self._surface = self._names_surface + self._arrows_surface
+            self._surface.compress_vertically()
+            self._surface.add_line()
+
+        if profiler.active_profiler() is not None:
+            if isinstance(self._surface, ArraySurface):
+                n_columns = self._surface.cells.shape[1]
+            else:
+                n_columns = max((len(line) for line in self._surface), default=0)
+            profiler.count("surface_lines", len(self._surface))
+            profiler.count("surface_columns", n_columns)
+
+    def _map_compression(self) -> None:
+        """Draw the whole family tree to map its compressed surface, and index what to draw on each line.
+
+        The surfaces are cleared afterwards, only the map and the positions of the people and
+        connections being kept.
+        """
+        self._coords.clear()
+        self._names_surface.clear()
+        self._arrows_surface.clear()
+
+        with profiler.stage("draw_names"):
+            self._draw_names_surface()
+        connections = self._draw_arrows_surface()
+        with profiler.stage("compress"):
+            surface = self._names_surface + self._arrows_surface
+            self._names_surface.clear()
+            self._arrows_surface.clear()
+            if not isinstance(surface, ArraySurface):
+                surface = ArraySurface(surface)
+            self._compression_map = surface.compression_map()
+
+        self._person_lines = np.array(
+            [self._coords[person.id].line for person in self.family_tree.people], dtype=np.int64
+        )
+        # Connections in drawing order, the order in which they combine on shared cells.
+        self._connections = [
+            (generation, couple_connection)
+            for generation, generation_connections in enumerate(connections)
+            for couple_connection in generation_connections.values()
+        ]
+        self._connection_lines = np.array(
+            [(couple_connection.min, couple_connection.max) for _, couple_connection in self._connections],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        self._mapped_revision = self.family_tree.revision
+
+    def _draw_lines(self, lines: np.ndarray) -> dict[int, SurfaceLine]:
+        """Draw some lines of the uncompressed surface, from the positions indexed by `_map_compression`.
+
+        Consecutive lines are drawn together, each run drawing the people on its lines and the
+        parts of the connections crossing it.
+
+        :param lines: The lines to draw, sorted and without duplicates.
+        :return: The drawn lines, by line, empty lines being left out.
+        """
+        drawn_lines: dict[int, SurfaceLine] = {}
+        for run in np.split(lines, np.flatnonzero(np.diff(lines) > 1) + 1):
+            if not len(run):
+                continue
+            line_start, line_end = int(run[0]), int(run[-1]) + 1
+            self._names_surface.clear()
+            self._arrows_surface.clear()
+
+            first, last = np.searchsorted(self._person_lines, [line_start, line_end]).tolist()
+            for person in self.family_tree.people[first:last]:
+                self._names_surface.draw(self._coords[person.id] - [line_start, 0], person.name)
+            is_crossing = (self._connection_lines[:, 0] < line_end) & (self._connection_lines[:, 1] >= line_start)
+            for i in np.flatnonzero(is_crossing).tolist():
+                generation, couple_connection = self._connections[i]
+                self._arrows_surface.draw_connection(generation, couple_connection, line_start, line_end)
+
+            for i, line in enumerate(self._names_surface + self._arrows_surface):
+                drawn_lines[line_start + i] = line
+        self._names_surface.clear()
+        self._arrows_surface.clear()
+        return drawn_lines
 
     def _draw_names_surface(self) -> None:
         """Render the surface containing the names of the people in the family tree.
@@ -74,11 +261,18 @@ class FamilyTreeRenderer:
 
             prev_person = person
 
-    def _draw_arrows_surface(self) -> None:
-        """Render the surface containing the arrows connecting the people in the family tree."""
-        connections = self._generate_connections()
-        connections = self._allocate_channels(connections)
-        self._arrows_surface.draw_connections(connections)
+    def _draw_arrows_surface(self) -> ConnectionsType:
+        """Render the surface containing the arrows connecting the people in the family tree.
+
+        :return: The connections drawn, with their allocated channels.
+        """
+        with profiler.stage("connections"):
+            connections = self._generate_connections()
+        with profiler.stage("channels"):
+            connections = self._allocate_channels(connections)
+        with profiler.stage("draw_arrows"):
+            self._arrows_surface.draw_connections(connections)
+        return connections
 
     @staticmethod
     def _allocate_channels(connections: ConnectionsType) -> ConnectionsType:
@@ -88,25 +282,36 @@ class FamilyTreeRenderer:
         the left, for each parental cluster. Several channels can run in parallel to represent
         separate clusters with children from the same generation.
 
+        Connections are swept in order of their first line, each taking the lowest channel freed by
+        the connections that ended before it, which uses the minimum number of channels.
+
         :param connections: Connection objects per generation and parental couple.
         :return: The connection objects with the allocated channels.
         """
         for generation_connections in connections:
-            channel_usages: list[list[tuple[int, int]]] = [[] for _ in generation_connections]
-            for couple_connection in generation_connections.values():
-                if couple_connection.allocated_channel is not None:
-                    continue
-
-                for potential_channel, usage_ranges in enumerate(channel_usages):
-                    for usage_range in usage_ranges:
-                        usage_min, usage_max = usage_range
-                        if not (couple_connection.max < usage_min or usage_max < couple_connection.min):
-                            break
-
-                    else:
-                        couple_connection.allocated_channel = potential_channel
-                        usage_ranges.append((couple_connection.min, couple_connection.max))
-                        break
+            unallocated_connections = sorted(
+                (
+                    couple_connection for couple_connection in generation_connections.values()
+                    if couple_connection.allocated_channel is None
+                ),
+                key=lambda c: (c.min, c.max),
+            )
+            # Channels in use, as (last used line, channel) pairs, and channels free to reuse.
+            used_channels: list[tuple[int, int]] = []
+            free_channels: list[int] = []
+            n_channels = 0
+            for couple_connection in unallocated_connections:
+                while used_channels and used_channels[0][0] < couple_connection.min:
+                    heapq.heappush(free_channels, heapq.heappop(used_channels)[1])
+
+                if free_channels:
+                    channel = heapq.heappop(free_channels)
+                else:
+                    channel = n_channels
+                    n_channels += 1
+                couple_connection.allocated_channel = channel
+                heapq.heappush(used_channels, (couple_connection.max, channel))
+            profiler.count("channels_allocated", n_channels)
         return connections
 
     def _generate_connections(self) -> ConnectionsType:
@@ -125,6 +330,6 @@ class FamilyTreeRenderer:
             generation_connections = connections[person.generation]
             couple_id = tuple(sorted([parent.id for parent in person.parents.values()]))
             couple_connection = generation_connections.setdefault(couple_id, CoupleConnection(parent_coords))
-            couple_connection.child_coords.append(child_coords)
+            couple_connection.add_child_coord(child_coords)
 
         return connections
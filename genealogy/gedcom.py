@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from genealogy.person import Person
+from genealogy.utils import Relationship
+
+
+class GedcomReader:
+    """Reads people and their relationships from GEDCOM lines in a single streaming pass.
+
+    Individuals (INDI records) become Person objects, and families (FAM records) link their HUSB
+    and WIFE to each CHIL as father and mother. Children whose FAMC pedigree (PEDI) is "adopted"
+    are linked as adoptive children instead, so a child can have both birth and adoptive parents.
+    Only the record being read, and the IDs of the members of each family, are buffered, so memory
+    use is proportional to the resulting tree rather than to the file.
+    """
+
+    def __init__(self):
+        """Initialize an empty reader."""
+        self.people: dict[str, Person] = {}
+        self._adoptions: set[tuple[str, str]] = set()
+        self._families: list[tuple[dict[Relationship, str], list[str], str]] = []
+
+        self._record_tag: str = ""
+        self._record_id: str = ""
+        self._is_named: bool = False
+        self._parents: dict[Relationship, str] = {}
+        self._children: list[str] = []
+        self._famc: str = ""
+
+    def read(self, lines: Iterable[str]) -> list[Person]:
+        """Read all the GEDCOM lines and return the people found.
+
+        :param lines: The lines of a GEDCOM file, e.g. an open text file.
+        :return: The people, with their relationships set up.
+        """
+        for line in lines:
+            parts = line.strip().split(" ", 2)
+            if len(parts) < 2:
+                continue
+            level, tag = parts[0], parts[1]
+            value = parts[2] if len(parts) > 2 else ""
+
+            if level == "0":
+                self._end_record()
+                if tag.startswith("@"):
+                    self._record_id, self._record_tag = self._strip_pointer(tag), value
+                    if self._record_tag == "INDI":
+                        self._get_person(self._record_id)
+                continue
+
+            if self._record_tag == "INDI":
+                self._read_individual_line(level, tag, value)
+            elif self._record_tag == "FAM" and level == "1":
+                self._read_family_line(tag, value)
+
+        self._end_record()
+        self._link_families()
+        return list(self.people.values())
+
+    def _read_individual_line(self, level: str, tag: str, value: str) -> None:
+        """Read a line belonging to an INDI record.
+
+        :param level: The level of the line.
+        :param tag: The tag of the line.
+        :param value: The value of the line.
+        """
+        person = self.people[self._record_id]
+        if level == "1":
+            self._famc = ""
+            if tag == "NAME" and not self._is_named:
+                person.name = self._parse_name(value) or person.id
+                self._is_named = True
+            elif tag == "FAMC":
+                self._famc = self._strip_pointer(value)
+        elif level == "2" and tag == "PEDI" and self._famc and value.strip().lower() == "adopted":
+            self._adoptions.add((self._record_id, self._famc))
+
+    def _read_family_line(self, tag: str, value: str) -> None:
+        """Read a level 1 line belonging to a FAM record.
+
+        :param tag: The tag of the line.
+        :param value: The value of the line.
+        """
+        if tag == "HUSB":
+            self._parents[Relationship.F] = self._strip_pointer(value)
+        elif tag == "WIFE":
+            self._parents[Relationship.M] = self._strip_pointer(value)
+        elif tag == "CHIL":
+            self._children.append(self._strip_pointer(value))
+
+    def _end_record(self) -> None:
+        """Finish the current record, keeping the members of the family if it was one."""
+        if self._record_tag == "FAM":
+            self._families.append((self._parents, self._children, self._record_id))
+
+        self._record_tag = ""
+        self._record_id = ""
+        self._is_named = False
+        self._parents = {}
+        self._children = []
+        self._famc = ""
+
+    def _link_families(self) -> None:
+        """Link the children of each family to their parents.
+
+        The pedigree of a child is found in their INDI record, which may come before or after the
+        family, so families are only linked once everything has been read. Children are linked to
+        the parents of an adopting family as adoptive parents, and to the others as birth parents.
+        A person only has one parent per relationship, the first family listing them wins.
+        """
+        adoptive_relationships = {Relationship.F: Relationship.AF, Relationship.M: Relationship.AM}
+        for parent_ids, child_ids, family_id in self._families:
+            parents = {relationship: self._get_person(parent_id) for relationship, parent_id in parent_ids.items()}
+            for child_id in child_ids:
+                child = self._get_person(child_id)
+                is_adopted = (child_id, family_id) in self._adoptions
+                for relationship, parent in parents.items():
+                    if is_adopted:
+                        relationship = adoptive_relationships[relationship]
+                    if relationship in child.parents:
+                        continue
+                    child.parents[relationship] = parent
+                    parent.children.append(child)
+
+    def _get_person(self, id_: str) -> Person:
+        """Get the person with the given ID, creating them if needed.
+
+        :param id_: The ID of the person.
+        :return: The person.
+        """
+        person = self.people.get(id_)
+        if person is None:
+            person = self.people[id_] = Person(id_, id_)
+        return person
+
+    @staticmethod
+    def _parse_name(value: str) -> str:
+        """Convert a GEDCOM name, with the surname between slashes, to a full name.
+
+        :param value: The GEDCOM name, e.g. "John Paul /Smith/".
+        :return: The full name, e.g. "John Paul Smith".
+        """
+        return " ".join(value.replace("/", " ").split())
+
+    @staticmethod
+    def _strip_pointer(value: str) -> str:
+        """Strip the @ signs around a GEDCOM cross-reference.
+
+        :param value: The cross-reference, e.g. "@I1@".
+        :return: The bare ID, e.g. "I1".
+        """
+        return value.strip().strip("@")
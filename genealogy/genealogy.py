@@ -1,90 +1,213 @@
 from __future__ import annotations
 
-import os
-
-from PIL import Image, ImageDraw, ImageFont
+from collections.abc import Sequence
+from contextlib import nullcontext
+import sys
 
+from genealogy import profiler
+from genealogy.batch import find_data_files, run_batch
+from genealogy.family_tree import FamilyTree
 from genealogy.family_tree_renderer import FamilyTreeRenderer
+from genealogy.image import get_glyph_atlas
+from genealogy.pipeline import main
+from genealogy.render_cache import MemoryRenderCache, RenderCache
+from genealogy.scope import Scope, UnknownRootError
+from genealogy.server import RenderServer
 
 
 def cli() -> None:
     """Command-line interface entry point for the genealogy tool."""
     import argparse
 
+    if sys.argv[1:2] == ["batch"]:
+        batch_cli(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["serve"]:
+        serve_cli(sys.argv[2:])
+        return
+
     parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Generate a family tree.")
-    parser.add_argument("data", help="Path to the input data file (a .json or .yml file).")
+    parser.add_argument("data", help="Path to the input data file (a .json, .yml or .ged file).")
     parser.add_argument("-o", "--output", help="Path to the output text file.")
-    parser.add_argument("-i", "--image", help="Path to save the output image.")
+    parser.add_argument(
+        "-i",
+        "--image",
+        help="Path to save the output image, as a vector image for a .svg extension, which scales to large trees.",
+    )
+    parser.add_argument(
+        "-l",
+        "--layout",
+        choices=FamilyTree.LAYOUTS,
+        default="relax",
+        help=(
+            "Strategy used to order the people in the tree: \"relax\" iteratively pulls relatives together, "
+            "\"solve\" computes a spectral ordering of the family graph, much faster on large trees, and "
+            "\"layered\" orders each generation to reduce crossing connections."
+        ),
+    )
+    parser.add_argument(
+        "--backend",
+        choices=FamilyTreeRenderer.BACKENDS,
+        default="list",
+        help="Surface backend used to draw the tree, \"array\" is faster on large trees.",
+    )
+    parser.add_argument("--root", help="ID of the person to center the rendered tree on.")
+    parser.add_argument(
+        "--ancestors",
+        type=int,
+        help="Number of generations of ancestors of the root person to render.",
+    )
+    parser.add_argument(
+        "--descendants",
+        type=int,
+        help="Number of generations of descendants of the root person to render.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "Write the rendered lines one by one, without joining them into one string. The whole tree is "
+            "still drawn first. Only applies without an image output, a cache or --jobs."
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help=(
+            "Lay out and render each connected family on its own, over this number of processes, 0 for the "
+            "number of CPUs. Families are stacked in a fixed order."
+        ),
+    )
+    parser.add_argument("--cache-dir", help="Directory to cache rendered outputs in, to reuse for unchanged inputs.")
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=256,
+        help="Maximum size of the cache, in megabytes.",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="Path to write a JSON report of the time spent in each stage and the work done to, \"-\" for stderr.",
+    )
     args = parser.parse_args()
 
-    main(args.data, args.output, args.image)
+    for option, value in (("--ancestors", args.ancestors), ("--descendants", args.descendants), ("--jobs", args.jobs)):
+        if value is not None and value < 0:
+            parser.error(f"{option} must not be negative.")
+
+    scope: Scope | None = None
+    if args.root is not None:
+        if args.ancestors is None and args.descendants is None:
+            scope = Scope(args.root)
+        else:
+            scope = Scope(args.root, args.ancestors or 0, args.descendants or 0)
+    elif args.ancestors is not None or args.descendants is not None:
+        parser.error("--ancestors and --descendants require --root.")
+
+    cache = RenderCache(args.cache_dir, args.cache_size * 1024 * 1024) if args.cache_dir else None
+    render_profiler = profiler.Profiler() if args.profile else None
+    try:
+        with render_profiler if render_profiler is not None else nullcontext():
+            main(args.data, args.output, args.image, args.layout, cache, scope, args.backend, args.stream, args.jobs)
+    except UnknownRootError as e:
+        parser.error(f"--root: {e}")
+
+    if render_profiler is not None:
+        if args.profile == "-":
+            print(render_profiler.to_json(), file=sys.stderr)
+        else:
+            with open(args.profile, "w", encoding="utf-8") as f:
+                f.write(render_profiler.to_json())
+
 
+def batch_cli(argv: Sequence[str]) -> None:
+    """Command-line interface of the batch mode, rendering many data files at once.
 
-def main(data_path: str, output_path: str | None = None, image_output_path: str | None = None) -> None:
-    """Generate a visualization of a family tree using ASCII art.
-    
-    :param data_path: Path to input YML or JSON file with family data.
-        See "sample_data.yaml" for an example.
-    :param output_path: Optional path to save the rendered tree to.
-    :param image_output_path: Optional path to save the rendered tree as an image.
+    :param argv: The command-line arguments following "batch".
     """
-    with open(data_path) as f:
-        data: str = f.read()
-    renderer: FamilyTreeRenderer
-    if os.path.splitext(data_path)[1].lower() == ".yml":
-        renderer = FamilyTreeRenderer.from_yaml(data)
-    elif os.path.splitext(data_path)[1].lower() == ".json":
-        renderer = FamilyTreeRenderer.from_json(data)
-    else:
-        raise ValueError("Data file must be in JSON or YAML format.")
-    rendered_tree: str = renderer.render()
-    if output_path:
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(rendered_tree)
-    if image_output_path:
-        write_to_image(rendered_tree, image_output_path)
-    if not output_path and not image_output_path:
-        print(rendered_tree)
-
-
-def write_to_image(text: str, output_path: str) -> None:
-    """Write the given text to an image file.
-
-    :param text: The text to write to the image.
-    :param output_path: The path to save the image to.
+    import argparse
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="genealogy batch",
+        description="Render many family trees over a pool of processes.",
+    )
+    parser.add_argument("pattern", help="Glob pattern of the input data files, \"**\" matching any directories.")
+    parser.add_argument("--out-dir", required=True, help="Directory to write the rendered trees to.")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Number of worker processes, 0 for the number of CPUs, the default.",
+    )
+    parser.add_argument(
+        "--image-format",
+        help="Image file extension, e.g. \"png\", to also render each tree as an image.",
+    )
+    parser.add_argument(
+        "-l",
+        "--layout",
+        choices=FamilyTree.LAYOUTS,
+        default="relax",
+        help="Strategy used to order the people in the trees.",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=FamilyTreeRenderer.BACKENDS,
+        default="list",
+        help="Surface backend used to draw the trees, \"array\" is faster on large trees.",
+    )
+    args = parser.parse_args(argv)
+    if args.jobs is not None and args.jobs < 0:
+        parser.error("--jobs must not be negative.")
+
+    data_paths = find_data_files(args.pattern)
+    if not data_paths:
+        parser.error(f"No data files match {args.pattern!r}.")
+
+    result = run_batch(data_paths, args.out_dir, args.jobs, args.layout, args.backend, args.image_format)
+    print(result.summary())
+    if result.failures:
+        sys.exit(1)
+
+
+def serve_cli(argv: Sequence[str]) -> None:
+    """Command-line interface of the serve mode, rendering family trees sent over HTTP.
+
+    :param argv: The command-line arguments following "serve".
     """
-    try:
-        font = ImageFont.truetype("DejaVuSansMono.ttf", 32)
-    except IOError:
-        font = ImageFont.load_default()
-
-    lines = text.split('\n')
-
-    # Calculate the size of the image
-    test_string = "Aj|╷╵┐└"
-    bbox = font.getbbox(test_string)
-    line_height = bbox[3] - bbox[1]
-    
-    # Calculate maximum width and total height
-    max_width = max(font.getlength(line) for line in lines)
-    total_height = len(lines) * line_height
-
-    # Add padding
-    padding = 64
-    max_width = int(max_width) + padding * 2
-    total_height = int(total_height) + padding * 2
-
-    # Create image with dark grey background
-    image = Image.new('RGB', (max_width, total_height), color=(30, 30, 30))
-    draw = ImageDraw.Draw(image)
-
-    # Draw text in white
-    y_text = padding
-    for line in lines:
-        draw.text((padding, y_text), line, font=font, fill=(255, 255, 255))
-        y_text += line_height
-
-    image.save(output_path)
+    import argparse
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="genealogy serve",
+        description=(
+            "Serve family tree renders over HTTP. POST YAML or JSON data to /render, with the format, layout, "
+            "backend, root, ancestors and descendants options in the query string. GET /stats for the cache "
+            "statistics."
+        ),
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on, 0 for any free port.")
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=64,
+        help="Maximum size of the in-memory cache of rendered trees, in megabytes.",
+    )
+    args = parser.parse_args(argv)
+    if args.cache_size < 0:
+        parser.error("--cache-size must not be negative.")
+
+    # Load the font up front, so the first image request doesn't pay for it.
+    get_glyph_atlas()
+    with RenderServer((args.host, args.port), MemoryRenderCache(args.cache_size * 1024 * 1024)) as server:
+        host, port = server.server_address[:2]
+        print(f"Serving on http://{host}:{port}/", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
 
 
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+import threading
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+
+class GlyphAtlas:
+    """Rasterizes text in a monospace font, one glyph per distinct character.
+
+    Each character is drawn once into a cell of the atlas, and text is rendered by copying the cells
+    of its characters side by side, instead of shaping and drawing every line of text. The atlas can
+    be shared between threads.
+    """
+
+    TEST_STRING: str = "Aj|╷╵┐└"
+    """Characters spanning the full height of a line, from which the cell height is measured."""
+
+    def __init__(self, font: ImageFont.FreeTypeFont | ImageFont.ImageFont):
+        """Initialize the atlas.
+
+        :param font: The font to rasterize the glyphs with, expected to be monospace.
+        """
+        self.font = font
+
+        bbox = font.getbbox(self.TEST_STRING)
+        self.top = int(bbox[1])
+        """Offset from the top of a line to the top of its cells."""
+        self.cell_height = int(bbox[3] - bbox[1])
+        self.cell_width = max(1, round(font.getlength("M")))
+
+        self._indices: dict[int, int] = {0: 0, ord(" "): 0}
+        self._cells: list[np.ndarray] = [np.zeros((self.cell_height, self.cell_width), dtype=np.uint8)]
+        self._lock = threading.Lock()
+
+    def render(self, lines: Sequence[str]) -> np.ndarray:
+        """Render lines of text as a coverage mask.
+
+        :param lines: The lines of text to render.
+        :return: A (lines * cell height, columns * cell width) array of glyph coverage, from 0 to 255.
+        """
+        n_cols = max((len(line) for line in lines), default=0)
+        codes = np.zeros((len(lines), n_cols), dtype=np.uint32)
+        for i, line in enumerate(lines):
+            codes[i, :len(line)] = np.frombuffer(line.encode("utf-32-le"), dtype=np.uint32)
+
+        distinct_codes, inverse = np.unique(codes, return_inverse=True)
+        cell_indices = np.array([self._index(int(code)) for code in distinct_codes], dtype=np.intp)
+        cells = np.stack(self._cells)[cell_indices[inverse.reshape(codes.shape)]]
+        return cells.transpose(0, 2, 1, 3).reshape(len(lines) * self.cell_height, n_cols * self.cell_width)
+
+    def _index(self, code: int) -> int:
+        """Get the index of the cell of a character, rasterizing it on first use.
+
+        :param code: The code point of the character.
+        :return: The index of its cell in the atlas.
+        """
+        index = self._indices.get(code)
+        if index is not None:
+            return index
+        with self._lock:
+            index = self._indices.get(code)
+            if index is None:
+                cell = Image.new("L", (self.cell_width, self.cell_height), 0)
+                ImageDraw.Draw(cell).text((0, -self.top), chr(code), font=self.font, fill=255)
+                index = len(self._cells)
+                self._cells.append(np.asarray(cell))
+                self._indices[code] = index
+            return index
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import functools
+from typing import BinaryIO
+
+import numpy as np
+from PIL import Image, ImageFont
+
+from genealogy import profiler
+from genealogy.glyph_atlas import GlyphAtlas
+
+
+def write_to_image(text: str, output_path: str | BinaryIO, image_format: str | None = None) -> None:
+    """Write the given text to an image file.
+
+    :param text: The text to write to the image.
+    :param output_path: The path to save the image to, or a binary file object.
+    :param image_format: The image format, e.g. "PNG", required for file objects. Defaults to the
+        format matching the extension of the path.
+    """
+    with profiler.stage("rasterize"):
+        atlas = get_glyph_atlas()
+        lines = text.split('\n')
+        coverage = atlas.render(lines)
+
+    # Add padding
+    padding = 64
+    max_width = coverage.shape[1] + padding * 2
+    total_height = len(lines) * atlas.cell_height + padding * 2
+
+    # Blend white text over a dark grey background. Every pixel is grey, so the blend is computed in
+    # greyscale and only expanded to RGB for encoding.
+    with profiler.stage("blend"):
+        background, foreground = 30, 255
+        blend = (background + (np.arange(256) * (foreground - background) + 127) // 255).astype(np.uint8)
+        pixels = np.full((total_height, max_width), background, dtype=np.uint8)
+        top = padding + atlas.top
+        pixels[top:top + coverage.shape[0], padding:padding + coverage.shape[1]] = blend[coverage]
+    profiler.count("image_width", max_width)
+    profiler.count("image_height", total_height)
+
+    with profiler.stage("encode"):
+        Image.fromarray(pixels, "L").convert("RGB").save(output_path, format=image_format)
+
+
+@functools.cache
+def get_glyph_atlas() -> GlyphAtlas:
+    """Get the glyph atlas used to write images, loading the font once per process.
+
+    :return: The shared glyph atlas.
+    """
+    try:
+        font = ImageFont.truetype("DejaVuSansMono.ttf", 32)
+    except IOError:
+        font = ImageFont.load_default()
+    return GlyphAtlas(font)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+
+from genealogy import profiler
+from genealogy.family_graph import FamilyGraph
+from genealogy.utils import Relationship
+
+
+class Kinship:
+    """Computes the coefficients of kinship and inbreeding of the people of a family graph.
+
+    The kinship of two people is the probability that alleles drawn at random from each of them are
+    identical by descent, and the inbreeding of a person is the kinship of their parents.
+
+    Coefficients follow the tabular recursion, a generation at a time: the kinship of a person with
+    someone who isn't their descendant is the average of the kinships of their parents with them.
+    Each person is computed after their parents, and as late as their children allow, to shorten
+    the time they are needed. Only the kinships of the people whose children are still to come are
+    held, as a dense matrix whose slots are reused once people are no longer needed, so the whole
+    matrix is only held for small trees, or when asked for.
+    """
+
+    def __init__(self, graph: FamilyGraph, adoptive: bool = False, batch_size: int = 1024):
+        """Schedule the computation of the people.
+
+        :param graph: The family graph, indexed in topological order, children before their parents.
+        :param adoptive: Whether adopted people descend from their adoptive parents, in place of
+            their biological parents. Otherwise, adoptive relationships are ignored.
+        :param batch_size: Maximum number of people computed at once.
+        """
+        self.graph = graph
+        self.adoptive = adoptive
+        n_people = len(graph)
+
+        # Missing parents point to an extra person.
+        fathers, mothers = [n_people] * n_people, [n_people] * n_people
+        for i, person in enumerate(graph.people):
+            father = adoptive and person.parents.get(Relationship.AF) or person.parents.get(Relationship.F)
+            mother = adoptive and person.parents.get(Relationship.AM) or person.parents.get(Relationship.M)
+            if father is not None:
+                fathers[i] = graph.index_by_id[father.id]
+            if mother is not None:
+                mothers[i] = graph.index_by_id[mother.id]
+
+        # People without children come right after their parents, parents coming after their
+        # children in topological order.
+        earliest = [0] * n_people + [-1]
+        for i in reversed(range(n_people)):
+            earliest[i] = 1 + max(earliest[fathers[i]], earliest[mothers[i]])
+        # Other people come right before their first child, children coming first.
+        latest = [n_people] * (n_people + 1)
+        for i in range(n_people):
+            if latest[i] == n_people:
+                latest[i] = earliest[i]
+            latest[fathers[i]] = min(latest[fathers[i]], latest[i] - 1)
+            latest[mothers[i]] = min(latest[mothers[i]], latest[i] - 1)
+
+        # Each generation is computed in batches, siblings together so that their parents are
+        # released sooner.
+        self._fathers = np.array(fathers, dtype=np.intp)
+        self._mothers = np.array(mothers, dtype=np.intp)
+        generations = np.array(latest[:n_people], dtype=np.intp)
+        order = np.lexsort((self._mothers, self._fathers, generations))
+        is_start = np.ones(n_people, dtype=bool)
+        is_start[1:] = np.diff(generations[order]) != 0
+        ranks = np.arange(n_people) - np.maximum.accumulate(np.where(is_start, np.arange(n_people), 0))
+        is_start |= ranks % batch_size == 0
+        batch_starts = np.flatnonzero(is_start)
+        self._batches: list[np.ndarray] = np.split(order, batch_starts[1:])
+        """People of each batch, in the order they are computed."""
+        self._batch = np.empty(n_people, dtype=np.intp)
+        """Batch of each person."""
+        self._batch[order] = np.cumsum(is_start) - 1
+        self._last_child = np.full(n_people + 1, -1, dtype=np.intp)
+        """Batch of the last child of each person, -1 without children."""
+        np.maximum.at(self._last_child, self._fathers, self._batch)
+        np.maximum.at(self._last_child, self._mothers, self._batch)
+
+        self._inbreeding: np.ndarray | None = None
+
+    @property
+    def inbreeding(self) -> np.ndarray:
+        """Get the inbreeding coefficient of each person, by graph index, computed on first use."""
+        if self._inbreeding is None:
+            self._inbreeding, _ = self._tabulate(np.zeros(0, dtype=np.intp))
+        return self._inbreeding
+
+    def matrix(self, indices: Sequence[int] | None = None) -> np.ndarray:
+        """Compute the kinship coefficients between people.
+
+        :param indices: The graph indices of the people, defaults to everyone in graph order.
+        :return: The symmetric matrix of the kinship coefficients, in the order of the indices. The
+            kinship of a person with themselves is half of one plus their inbreeding.
+        """
+        indices = np.arange(len(self.graph)) if indices is None else np.asarray(indices, dtype=np.intp)
+        self._inbreeding, kinship = self._tabulate(indices)
+        return kinship
+
+    def _tabulate(self, kept: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Run the tabular recursion through the batches.
+
+        :param kept: The graph indices of the people whose kinships are held until the end.
+        :return: The inbreeding coefficient of each person, and the kinship matrix of the kept people.
+        """
+        n_people, n_batches = len(self.graph), len(self._batches)
+        # People are held from their batch until that of their last child, or the end if kept.
+        held_until = self._last_child[:n_people].copy()
+        held_until[kept] = n_batches
+        is_held = held_until > self._batch
+        held_changes = np.zeros(n_batches + 2, dtype=np.intp)
+        np.add.at(held_changes, self._batch[is_held], 1)
+        np.add.at(held_changes, held_until[is_held] + 1, -1)
+        n_slots = int(np.cumsum(held_changes).max(initial=0))
+        profiler.count("kinship_slots", n_slots)
+
+        released = np.flatnonzero(is_held & (held_until < n_batches))
+        released = released[np.argsort(held_until[released], kind="stable")]
+        release_starts = np.searchsorted(held_until[released], np.arange(n_batches + 1))
+
+        # The last slot stands for missing parents, and stays zero.
+        kinship = np.zeros((n_slots + 1, n_slots + 1))
+        slots = np.full(n_people + 1, n_slots, dtype=np.intp)
+        free_slots = list(reversed(range(n_slots)))
+        inbreeding = np.zeros(n_people)
+        for batch, people in enumerate(self._batches):
+            father_slots, mother_slots = slots[self._fathers[people]], slots[self._mothers[people]]
+            inbreeding[people] = kinship[father_slots, mother_slots]
+
+            is_new = is_held[people]
+            if is_new.any():
+                people, father_slots, mother_slots = people[is_new], father_slots[is_new], mother_slots[is_new]
+                new_slots = np.sort(np.array([free_slots.pop() for _ in range(len(people))], dtype=np.intp))
+                slots[people] = new_slots
+                rows = 0.5 * (kinship[father_slots] + kinship[mother_slots])
+                # People of a batch are never each other's ancestors, so their kinships come from the
+                # kinships of their parents with each other.
+                rows[:, new_slots] = 0.5 * (rows[:, father_slots] + rows[:, mother_slots]).T
+                rows[np.arange(len(people)), new_slots] = 0.5 * (1.0 + inbreeding[people])
+                kinship[new_slots, :n_slots] = rows[:, :n_slots]
+                kinship[:n_slots, new_slots] = rows[:, :n_slots].T
+
+            free_slots.extend(slots[released[release_starts[batch]:release_starts[batch + 1]]].tolist())
+
+        kept_slots = slots[kept]
+        return inbreeding, kinship[np.ix_(kept_slots, kept_slots)]
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from genealogy import profiler
+
+if TYPE_CHECKING:
+    from genealogy.family_tree import FamilyTree
+
+
+class LayoutEngine(ABC):
+    """Strategy ordering the people of a family tree, for the renderer to draw them in that order.
+
+    An engine is given a family tree whose graph and generations are computed. It must sort the
+    people of the tree in the order they are drawn, and set their `relax_position` consistently, the
+    people being drawn in decreasing order of position.
+    """
+
+    @abstractmethod
+    def lay_out(self, family_tree: FamilyTree) -> None:
+        """Order the people of a family tree.
+
+        :param family_tree: The family tree to lay out.
+        """
+
+
+class RelaxLayout(LayoutEngine):
+    """Iteratively optimizes the ordering, see `FamilyTree._relax`."""
+
+    def lay_out(self, family_tree: FamilyTree) -> None:
+        family_tree._relax()
+
+
+class SolveLayout(LayoutEngine):
+    """Orders people spectrally, by the Fiedler vector of the family graph, see `FamilyTree._solve`."""
+
+    def lay_out(self, family_tree: FamilyTree) -> None:
+        family_tree._solve()
+
+
+class LayeredLayout(LayoutEngine):
+    """Orders the people of each generation to reduce the crossings of their connections.
+
+    The people start in topological order. Each generation keeps the lines it occupies, and the
+    people within it are sorted by the barycenter of the positions of their relatives. Generations
+    are swept from the oldest to the youngest, ordering each person by their parents, then back,
+    ordering each person by their children. Each sweep costs about O(E + V log V).
+    """
+
+    def __init__(self, n_iterations: int = 8):
+        """Initialize the engine.
+
+        :param n_iterations: Number of down and up sweeps through the generations.
+        """
+        self.n_iterations = n_iterations
+
+    def lay_out(self, family_tree: FamilyTree) -> None:
+        graph = family_tree.graph
+        n_people = len(graph)
+        if not n_people:
+            return
+
+        generations = np.array([person.generation for person in graph.people])
+        by_generation = np.argsort(generations, kind="stable")
+        layer_starts = np.flatnonzero(np.diff(generations[by_generation])) + 1
+        # Layers are the generations with several people, the others having nothing to sort.
+        layers = [layer for layer in np.split(by_generation, layer_starts) if len(layer) > 1]
+        # Layer of each person, and rank within it, to gather the links of a layer at once.
+        layer_of = np.full(n_people, -1, dtype=np.intp)
+        local_index = np.zeros(n_people, dtype=np.intp)
+        for i, layer in enumerate(layers):
+            layer_of[layer] = i
+            local_index[layer] = np.arange(len(layer))
+
+        edge_children, edge_parents = graph.edge_children, graph.parents_idx
+        to_parents = self._links_by_layer(len(layers), layer_of, edge_children, edge_parents)
+        to_children = self._links_by_layer(len(layers), layer_of, edge_parents, edge_children)
+
+        positions = np.arange(n_people, dtype=float)
+        profiler.count("layered_sweeps", 2 * self.n_iterations)
+        for _ in range(self.n_iterations):
+            for i in reversed(range(len(layers))):
+                self._sort_layer(layers[i], positions, local_index, *to_parents[i])
+            for i in range(len(layers)):
+                self._sort_layer(layers[i], positions, local_index, *to_children[i])
+
+        for person, position in zip(graph.people, positions.tolist()):
+            person.relax_position = -position
+        family_tree.people.sort(key=lambda p: -p.relax_position)
+
+    @staticmethod
+    def _links_by_layer(
+            n_layers: int,
+            layer_of: np.ndarray,
+            sources: np.ndarray,
+            targets: np.ndarray,
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Group links by the layer of their source.
+
+        :param n_layers: The number of layers.
+        :param layer_of: The layer of each person, -1 for people alone in their generation.
+        :param sources: The source person of each link.
+        :param targets: The target person of each link.
+        :return: The sources and targets of the links from each layer.
+        """
+        link_layers = layer_of[sources]
+        order = np.argsort(link_layers, kind="stable")
+        link_layers, sources, targets = link_layers[order], sources[order], targets[order]
+        starts = np.searchsorted(link_layers, np.arange(n_layers + 1))
+        return [(sources[starts[i]:starts[i + 1]], targets[starts[i]:starts[i + 1]]) for i in range(n_layers)]
+
+    @staticmethod
+    def _sort_layer(
+            layer: np.ndarray,
+            positions: np.ndarray,
+            local_index: np.ndarray,
+            sources: np.ndarray,
+            targets: np.ndarray,
+    ) -> None:
+        """Sort the people of a generation by the barycenter of their relatives, within their positions.
+
+        People without relatives on that side keep their position as barycenter.
+
+        :param layer: The people of the generation.
+        :param positions: The position of each person, updated in place.
+        :param local_index: The rank of each person within their generation.
+        :param sources: The people of the generation, once per link to a relative.
+        :param targets: The relative of each link.
+        """
+        layer_positions = positions[layer]
+        counts = np.bincount(local_index[sources], minlength=len(layer))
+        sums = np.bincount(local_index[sources], weights=positions[targets], minlength=len(layer))
+        barycenters = np.where(counts > 0, sums / np.maximum(counts, 1), layer_positions)
+        order = np.lexsort((layer_positions, barycenters))
+        positions[layer[order]] = np.sort(layer_positions)
+
+
+LAYOUT_ENGINES: dict[str, LayoutEngine] = {
+    "relax": RelaxLayout(),
+    "solve": SolveLayout(),
+    "layered": LayeredLayout(),
+}
+"""Available layout engines, by name."""
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator
+import sys
 
 from .utils import Relationship
 
@@ -10,6 +11,18 @@ class Person:
 
     NEE: str = " ne.e "  # Class constant for maiden name separator
 
+    __slots__ = (
+        "id",
+        "first_name",
+        "last_name",
+        "middle_name",
+        "maiden_name",
+        "parents",
+        "children",
+        "generation",
+        "relax_position",
+    )
+
     def __init__(
             self,
             id_: str,
@@ -30,7 +43,7 @@ class Person:
         :param relax_position: Vertical position in the family tree, used to optimize the layout.
             Typically calculated by FamilyTree.
         """
-        self.id: str = id_
+        self.id: str = sys.intern(id_)
         self.first_name: str = ""
         self.last_name: str = ""
         self.middle_name: str = ""
@@ -71,18 +84,20 @@ class Person:
     def name(self, value: str) -> None:
         """Set the person's name, parsing first, middle, last, and maiden names.
 
+        The name parts are interned, as they are heavily shared among family members.
+
         :param value: The full name, optionally including maiden name after 'ne.e'.
         """
         if self.NEE in value:
             name_part, maiden_name = value.split(self.NEE, 1)
-            self.maiden_name = maiden_name.strip()
+            self.maiden_name = sys.intern(maiden_name.strip())
         else:
             name_part = value
             self.maiden_name = ''
         names = name_part.strip().split()
-        self.first_name = names[0] if names else ''
-        self.last_name = names[-1] if len(names) > 1 else ''
-        self.middle_name = ' '.join(names[1:-1]) if len(names) > 2 else ''
+        self.first_name = sys.intern(names[0]) if names else ''
+        self.last_name = sys.intern(names[-1]) if len(names) > 1 else ''
+        self.middle_name = sys.intern(' '.join(names[1:-1])) if len(names) > 2 else ''
 
     def __eq__(self, other: object) -> bool:
         """Check if two Person objects are equal based on their IDs.
@@ -94,6 +109,10 @@ class Person:
             return NotImplemented
         return self.id == other.id
 
+    def __hash__(self) -> int:
+        """Hash the person based on their ID, consistently with `__eq__`."""
+        return hash(self.id)
+
     def __lt__(self, other: object) -> bool:
         """Compare two Person objects for sorting purposes.
 
@@ -109,68 +128,79 @@ class Person:
 
     def traverse_parents_depth_first(
             self,
-            visited: list[Person],
-            processing: list[Person],
+            visited: set[Person],
             pre_order_callback: Callable[[Person], None] = lambda x: None,
             post_order_callback: Callable[[Person], None] = lambda x: None,
     ) -> None:
         """Traverse the family tree depth-first through parents.
 
-        :param visited: List of already visited Person objects.
-        :param processing: List of Person objects currently being processed.
+        :param visited: Set of already visited Person objects, updated in place.
         :param pre_order_callback: Function to apply to each Person before visiting parents.
         :param post_order_callback: Function to apply to each Person after visiting parents.
         :raises ValueError: If a cycle is detected in the family tree.
         """
-        if self in processing:
-            cycle = " -> ".join([str(person) for person in processing[processing.index(self):]])
-            raise ValueError(f"Cycle detected: {cycle}")
-        processing = processing + [self]
-
-        if self in visited:
-            return
-        visited.append(self)
-
-        pre_order_callback(self)
-        for parent in self.parents.values():
-            parent.traverse_parents_depth_first(
-                visited,
-                processing,
-                pre_order_callback,
-                post_order_callback,
-            )
-        post_order_callback(self)
+        self._traverse_depth_first(
+            lambda person: person.parents.values(),
+            visited,
+            pre_order_callback,
+            post_order_callback,
+        )
 
     def traverse_children_depth_first(
             self,
-            visited: list[Person],
-            processing: list[Person],
+            visited: set[Person],
             pre_order_callback: Callable[[Person], None] = lambda x: None,
             post_order_callback: Callable[[Person], None] = lambda x: None,
     ) -> None:
         """Traverse the family tree depth-first through children.
 
-        :param visited: List of already visited Person objects.
-        :param processing: List of Person objects currently being processed.
+        :param visited: Set of already visited Person objects, updated in place.
         :param pre_order_callback: Function to apply to each Person before visiting children.
         :param post_order_callback: Function to apply to each Person after visiting children.
         :raises ValueError: If a cycle is detected in the family tree.
         """
-        if self in processing:
-            cycle = " -> ".join([str(person) for person in processing[processing.index(self):]])
-            raise ValueError(f"Cycle detected: {cycle}")
-        processing = processing + [self]
+        self._traverse_depth_first(
+            lambda person: person.children,
+            visited,
+            pre_order_callback,
+            post_order_callback,
+        )
+
+    def _traverse_depth_first(
+            self,
+            get_neighbours: Callable[[Person], Iterable[Person]],
+            visited: set[Person],
+            pre_order_callback: Callable[[Person], None],
+            post_order_callback: Callable[[Person], None],
+    ) -> None:
+        """Traverse the family tree depth-first, using an explicit stack rather than recursion.
 
+        :param get_neighbours: Function returning the people to visit next from a given Person.
+        :param visited: Set of already visited Person objects, updated in place.
+        :param pre_order_callback: Function to apply to each Person before visiting its neighbours.
+        :param post_order_callback: Function to apply to each Person after visiting its neighbours.
+        :raises ValueError: If a cycle is detected in the family tree.
+        """
         if self in visited:
             return
-        visited.append(self)
-
+        visited.add(self)
         pre_order_callback(self)
-        for child in self.children:
-            child.traverse_children_depth_first(
-                visited,
-                processing,
-                pre_order_callback,
-                post_order_callback,
-            )
-        post_order_callback(self)
+
+        # The people currently being processed, in order, mapped to their remaining neighbours.
+        processing: dict[Person, Iterator[Person]] = {self: iter(get_neighbours(self))}
+        while processing:
+            person, neighbours = next(reversed(processing.items()))
+            for neighbour in neighbours:
+                if neighbour in processing:
+                    path = list(processing)
+                    cycle = " -> ".join([str(member) for member in path[path.index(neighbour):]])
+                    raise ValueError(f"Cycle detected: {cycle}")
+                if neighbour in visited:
+                    continue
+                visited.add(neighbour)
+                pre_order_callback(neighbour)
+                processing[neighbour] = iter(get_neighbours(neighbour))
+                break
+            else:
+                del processing[person]
+                post_order_callback(person)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from contextlib import nullcontext
+import os
+import sys
+
+from genealogy.families import render_families
+from genealogy.family_tree import FamilyTree
+from genealogy.family_tree_renderer import FamilyTreeRenderer
+from genealogy.image import write_to_image
+from genealogy.render_cache import RenderCache
+from genealogy.scope import Scope
+from genealogy.svg import write_to_svg
+
+
+def main(
+        data_path: str,
+        output_path: str | None = None,
+        image_output_path: str | None = None,
+        layout: str = "relax",
+        cache: RenderCache | None = None,
+        scope: Scope | None = None,
+        backend: str = "list",
+        stream: bool = False,
+        jobs: int | None = None,
+) -> None:
+    """Generate a visualization of a family tree using ASCII art.
+    
+    :param data_path: Path to input YML, JSON or GEDCOM file with family data.
+        See "sample_data.yaml" for an example.
+    :param output_path: Optional path to save the rendered tree to.
+    :param image_output_path: Optional path to save the rendered tree as an image, written by
+        `write_to_svg` for a .svg extension, and by `write_to_image` otherwise.
+    :param layout: The layout strategy, one of `FamilyTree.LAYOUTS`.
+    :param cache: Optional cache of rendered outputs, reused when the input and options are unchanged.
+    :param scope: Optional scope restricting the rendered tree to the relatives of a root person.
+    :param backend: The surface backend, one of `FamilyTreeRenderer.BACKENDS`.
+    :param stream: Whether to write the rendered lines one by one, instead of joining them into one
+        string first. The whole tree is still drawn and compressed before the first line is
+        written, so this only saves the memory of the output string. Only applies to text outputs,
+        without an image output or a cache, which both need the whole output, and without jobs.
+    :param jobs: Optional number of processes to lay out and render each connected family on its
+        own, 0 for the number of CPUs. See `render_families`.
+    """
+    if stream and image_output_path is None and cache is None and jobs is None:
+        renderer = FamilyTreeRenderer(FamilyTree.from_file(data_path, layout, scope), backend)
+        write_lines(renderer.render_iter(), output_path)
+        return
+
+    cache_key = ""
+    if cache is not None:
+        cache_key = cache.key(data_path, layout=layout, scope=repr(scope), families=jobs is not None)
+
+    cached_tree = cache.get(cache_key, ".txt") if cache is not None else None
+    rendered_tree: str
+    if cached_tree is not None:
+        rendered_tree = cached_tree.decode("utf-8")
+    else:
+        if jobs is not None:
+            people = FamilyTree.read_people(data_path)
+            rendered_tree = render_families(scope.select(people) if scope else people, layout, backend, jobs)
+        else:
+            renderer = FamilyTreeRenderer(FamilyTree.from_file(data_path, layout, scope), backend)
+            rendered_tree = renderer.render()
+        if cache is not None:
+            cache.put(cache_key, ".txt", rendered_tree.encode("utf-8"))
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(rendered_tree)
+    if image_output_path:
+        image_suffix = os.path.splitext(image_output_path)[1].lower()
+        cached_image = cache.get(cache_key, image_suffix) if cache is not None else None
+        if cached_image is not None:
+            with open(image_output_path, "wb") as f:
+                f.write(cached_image)
+        else:
+            if image_suffix == ".svg":
+                write_to_svg(rendered_tree, image_output_path)
+            else:
+                write_to_image(rendered_tree, image_output_path)
+            if cache is not None:
+                with open(image_output_path, "rb") as f:
+                    cache.put(cache_key, image_suffix, f.read())
+    if not output_path and not image_output_path:
+        print(rendered_tree)
+
+
+def write_lines(lines: Iterable[str], output_path: str | None = None) -> None:
+    """Write lines one by one to a text file, or print them.
+
+    :param lines: The lines to write.
+    :param output_path: Optional path to the text file, the lines are printed if not given.
+    """
+    with open(output_path, "w", encoding="utf-8") if output_path else nullcontext(sys.stdout) as f:
+        for i, line in enumerate(lines):
+            if i:
+                f.write("\n")
+            f.write(line)
+        if not output_path:
+            f.write("\n")
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+import json
+import time
+
+
+class Profiler:
+    """Records the wall time of each stage of the rendering pipeline, and counters of the work done.
+
+    The pipeline reports its stages and counters to the profiler active in the current thread, set
+    by entering the profiler as a context manager. Without an active profiler, reporting is a
+    context variable lookup per stage, so it costs next to nothing.
+
+    Stage times include the time of the stages nested in them, and add up over repeated calls.
+    """
+
+    def __init__(self, on_stage: Callable[[str, float], None] | None = None):
+        """Initialize the profiler.
+
+        :param on_stage: Optional function called with the name and duration, in seconds, of each
+            stage as it ends.
+        """
+        self.on_stage = on_stage
+        self.times: dict[str, float] = {}
+        self.calls: dict[str, int] = {}
+        self.counters: dict[str, int] = {}
+        self.total: float = 0.0
+        """Time spent with the profiler active, in seconds."""
+
+        self._tokens: list = []
+        self._start: float = 0.0
+
+    def __enter__(self) -> Profiler:
+        self._tokens.append(_active_profiler.set(self))
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.total += time.perf_counter() - self._start
+        _active_profiler.reset(self._tokens.pop())
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Measure the code run within the context as a stage.
+
+        :param name: The name of the stage.
+        """
+        self.times.setdefault(name, 0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.times[name] += duration
+            self.calls[name] = self.calls.get(name, 0) + 1
+            if self.on_stage is not None:
+                self.on_stage(name, duration)
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Add to a counter.
+
+        :param name: The name of the counter.
+        :param n: The amount to add.
+        """
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self) -> dict:
+        """Get the measurements, stages in the order they first started.
+
+        :return: The total time, the time, in seconds, and number of calls per stage, and the counters.
+        """
+        return {
+            "total": self.total,
+            "stages": {
+                name: {"time": duration, "calls": self.calls.get(name, 0)} for name, duration in self.times.items()
+            },
+            "counters": dict(self.counters),
+        }
+
+    def to_json(self) -> str:
+        """Serialize the report to a JSON string.
+
+        :return: The JSON representation of the report.
+        """
+        return json.dumps(self.report(), indent=2)
+
+
+_active_profiler: ContextVar[Profiler | None] = ContextVar("active_profiler", default=None)
+"""The profiler collecting the measurements of the current thread, if any."""
+
+
+def active_profiler() -> Profiler | None:
+    """Get the profiler collecting the measurements of the current thread.
+
+    :return: The active profiler, or None if profiling is disabled.
+    """
+    return _active_profiler.get()
+
+
+def stage(name: str) -> AbstractContextManager[None]:
+    """Measure the code run within the context as a stage of the active profiler, if any.
+
+    :param name: The name of the stage.
+    :return: The context manager measuring the stage.
+    """
+    profiler = _active_profiler.get()
+    return nullcontext() if profiler is None else profiler.stage(name)
+
+
+def count(name: str, n: int = 1) -> None:
+    """Add to a counter of the active profiler, if any.
+
+    :param name: The name of the counter.
+    :param n: The amount to add.
+    """
+    profiler = _active_profiler.get()
+    if profiler is not None:
+        profiler.count(name, n)
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+from importlib import metadata
+import json
+import os
+import tempfile
+import threading
+
+
+RENDER_FORMAT_VERSION: int = 1
+"""Version of the rendered outputs, part of the cache keys. Bump it whenever a change alters the
+rendered text or images, so that entries rendered before are not served anymore."""
+
+
+class RenderCache:
+    """Content-addressed on-disk cache of rendered family trees.
+
+    Entries are keyed by the bytes of the input file, the rendering options, the package version and
+    the render format version, so any change to one of them yields a new entry. Once the total size
+    of the cache exceeds its limit, the least recently used entries are evicted.
+    """
+
+    def __init__(self, directory: str, max_size: int = 256 * 1024 * 1024):
+        """Initialize the cache, creating its directory if needed.
+
+        :param directory: The directory holding the cached entries.
+        :param max_size: Maximum total size of the cached entries, in bytes.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, data_path: str, **options: object) -> str:
+        """Compute the key of the entries rendered from an input file with the given options.
+
+        :param data_path: Path to the input file.
+        :param options: The options affecting the rendered output.
+        :return: The cache key.
+        """
+        digest = hashlib.sha256()
+        with open(data_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        digest.update(json.dumps(
+            {"options": options, "version": _package_version(), "format": RENDER_FORMAT_VERSION},
+            sort_keys=True,
+        ).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str, suffix: str) -> bytes | None:
+        """Get a cached entry, marking it as recently used.
+
+        :param key: The cache key.
+        :param suffix: The suffix of the entry, e.g. ".txt" or ".png".
+        :return: The cached content, or None if missing.
+        """
+        path = self._path(key, suffix)
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted by another process since it was read, the content read is still valid.
+            pass
+        return content
+
+    def put(self, key: str, suffix: str, content: bytes) -> None:
+        """Store an entry in the cache, then evict old entries if the cache is too large.
+
+        :param key: The cache key.
+        :param suffix: The suffix of the entry, e.g. ".txt" or ".png".
+        :param content: The content to cache.
+        """
+        # Write to a temporary file first, so concurrent readers never see a partial entry.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, self._path(key, suffix))
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries until the cache fits in its maximum size."""
+        entries: list[tuple[float, int, str]] = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+    def _path(self, key: str, suffix: str) -> str:
+        """Get the path of an entry.
+
+        :param key: The cache key.
+        :param suffix: The suffix of the entry.
+        :return: The path of the entry file.
+        """
+        return os.path.join(self.directory, f"{key}{suffix}")
+
+
+class MemoryRenderCache:
+    """In-memory cache of rendered family trees, for a long-lived process.
+
+    Entries are keyed by the bytes of the input data and the rendering options, like `RenderCache`
+    entries. Once the total size of the cache exceeds its limit, the least recently used entries are
+    evicted. The cache is safe to use from several threads, and counts its hits and misses.
+    """
+
+    def __init__(self, max_size: int = 64 * 1024 * 1024):
+        """Initialize the cache.
+
+        :param max_size: Maximum total size of the cached entries, in bytes.
+        """
+        self.max_size = max_size
+        self.size: int = 0
+        """Total size of the cached entries, in bytes."""
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._entries: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(data: bytes, **options: object) -> str:
+        """Compute the key of the entries rendered from input data with the given options.
+
+        :param data: The input data.
+        :param options: The options affecting the rendered output.
+        :return: The cache key.
+        """
+        digest = hashlib.sha256(data)
+        digest.update(json.dumps({"options": options, "format": RENDER_FORMAT_VERSION}, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str, suffix: str) -> bytes | None:
+        """Get a cached entry, marking it as recently used.
+
+        :param key: The cache key.
+        :param suffix: The suffix of the entry, e.g. ".txt" or ".png".
+        :return: The cached content, or None if missing.
+        """
+        with self._lock:
+            content = self._entries.get((key, suffix))
+            if content is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end((key, suffix))
+            return content
+
+    def put(self, key: str, suffix: str, content: bytes) -> None:
+        """Store an entry in the cache, then evict old entries if the cache is too large.
+
+        An entry larger than the whole cache is not stored.
+
+        :param key: The cache key.
+        :param suffix: The suffix of the entry, e.g. ".txt" or ".png".
+        :param content: The content to cache.
+        """
+        if len(content) > self.max_size:
+            return
+        with self._lock:
+            previous = self._entries.pop((key, suffix), None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key, suffix] = content
+            self.size += len(content)
+            while self.size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def stats(self) -> dict:
+        """Get the statistics of the cache.
+
+        :return: The number of entries, their total size, the hits, misses and hit rate of the cache.
+        """
+        with self._lock:
+            n_lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size": self.size,
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / n_lookups if n_lookups else 0.0,
+            }
+
+
+def _package_version() -> str:
+    """Get the installed version of the package, so upgrades invalidate cached entries."""
+    try:
+        return metadata.version("genealogy")
+    except metadata.PackageNotFoundError:
+        return "unknown"
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+
+from genealogy.person import Person
+
+
+class Scope:
+    """Restricts a family tree to the ancestors and descendants of a root person."""
+
+    def __init__(self, root_id: str, n_ancestors: int | None = None, n_descendants: int | None = None):
+        """Initialize the scope.
+
+        :param root_id: The ID of the person the scope is centered on.
+        :param n_ancestors: Number of generations of ancestors to include, None for all of them.
+        :param n_descendants: Number of generations of descendants to include, None for all of them.
+        :raises ValueError: If a number of generations is negative.
+        """
+        if (n_ancestors is not None and n_ancestors < 0) or (n_descendants is not None and n_descendants < 0):
+            raise ValueError("Numbers of generations must not be negative.")
+
+        self.root_id = root_id
+        self.n_ancestors = n_ancestors
+        self.n_descendants = n_descendants
+
+    def __repr__(self) -> str:
+        return f"Scope({self.root_id!r}, n_ancestors={self.n_ancestors!r}, n_descendants={self.n_descendants!r})"
+
+    def select(self, people: Iterable[Person]) -> list[Person]:
+        """Select the people in scope, as copies only linked to each other.
+
+        The people outside the scope are left untouched, and never traversed.
+
+        :param people: The people to select from.
+        :return: Copies of the root person and of their relatives in scope.
+        :raises UnknownRootError: If the root person is not among the people.
+        """
+        root = next((person for person in people if person.id == self.root_id), None)
+        if root is None:
+            raise UnknownRootError(f"Unknown root person {self.root_id!r}.")
+
+        selected: dict[Person, None] = {root: None}
+        selected.update(dict.fromkeys(self._collect(
+            root,
+            self.n_ancestors,
+            lambda person: person.parents.values(),
+            Person.traverse_parents_depth_first,
+        )))
+        selected.update(dict.fromkeys(self._collect(
+            root,
+            self.n_descendants,
+            lambda person: person.children,
+            Person.traverse_children_depth_first,
+        )))
+
+        copies: dict[str, Person] = {person.id: Person(person.id, person.name) for person in selected}
+        for person in selected:
+            child = copies[person.id]
+            for relationship, parent in person.parents.items():
+                parent_copy = copies.get(parent.id)
+                if parent_copy is None:
+                    continue
+                child.parents[relationship] = parent_copy
+                parent_copy.children.append(child)
+        return list(copies.values())
+
+    @staticmethod
+    def _collect(
+            root: Person,
+            n_generations: int | None,
+            get_neighbours: Callable[[Person], Iterable[Person]],
+            traverse: Callable[..., None],
+    ) -> list[Person]:
+        """Collect the relatives of the root person in one direction.
+
+        Without a generation limit, the whole lineage is walked depth-first. With one, the walk goes
+        breadth-first, one generation at a time: with pedigree collapse, a depth-first walk could
+        reach someone through a longer path first and wrongly leave them out.
+
+        :param root: The root person.
+        :param n_generations: Number of generations to collect, None for all of them.
+        :param get_neighbours: Function returning the next relatives of a person in that direction.
+        :param traverse: Depth-first traversal in that direction.
+        :return: The relatives found, including the root person.
+        """
+        if n_generations is None:
+            relatives: list[Person] = []
+            traverse(root, set(), pre_order_callback=relatives.append)
+            return relatives
+
+        visited: dict[Person, None] = {root: None}
+        layer = [root]
+        for _ in range(n_generations):
+            next_layer: list[Person] = []
+            for person in layer:
+                for neighbour in get_neighbours(person):
+                    if neighbour not in visited:
+                        visited[neighbour] = None
+                        next_layer.append(neighbour)
+            if not next_layer:
+                break
+            layer = next_layer
+        return list(visited)
+
+
+class UnknownRootError(ValueError):
+    """Exception raised when the root person of a scope is not in the family tree."""
+    pass
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import io
+import json
+from urllib.parse import parse_qs, urlsplit
+
+import yaml
+
+from genealogy.family_tree import FamilyTree
+from genealogy.family_tree_renderer import FamilyTreeRenderer
+from genealogy.image import write_to_image
+from genealogy.render_cache import MemoryRenderCache
+from genealogy.scope import Scope
+
+
+class RenderServer(ThreadingHTTPServer):
+    """Long-lived HTTP server rendering family trees, one thread per request.
+
+    Rendered trees are kept in an in-memory cache shared by all the requests, and the font used to
+    write images is loaded once, so repeated and small renders skip the start-up of a new process.
+
+    Endpoints:
+
+    - `POST /render`: Render the YAML or JSON family tree data in the request body, as text or as a
+      PNG image. The body is read as JSON with a "application/json" content type, and as YAML
+      otherwise. Options are passed in the query string: `format` ("text" or "png"), `layout`,
+      `backend`, `root`, `ancestors` and `descendants`, like the command-line options.
+    - `GET /stats`: Statistics of the cache, including its hit rate, as JSON.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], cache: MemoryRenderCache):
+        """Initialize the server, binding it to its address.
+
+        :param address: The host and port to listen on, port 0 picking any free port.
+        :param cache: The cache of rendered trees.
+        """
+        super().__init__(address, RenderRequestHandler)
+        self.cache = cache
+
+    def render(self, data: bytes, is_json: bool, query: dict[str, str]) -> tuple[bytes, str]:
+        """Render family tree data, reusing the cached output if any.
+
+        :param data: The YAML or JSON family tree data.
+        :param is_json: Whether the data is JSON, otherwise YAML.
+        :param query: The rendering options.
+        :return: The rendered tree and its content type.
+        :raises ValueError: If an option is invalid, or the data can't be parsed or rendered.
+        """
+        output_format = query.get("format", "text")
+        if output_format not in ("text", "png"):
+            raise ValueError(f"Unknown format {output_format!r}, expected 'text' or 'png'.")
+        layout = query.get("layout", "relax")
+        backend = query.get("backend", "list")
+        if backend not in FamilyTreeRenderer.BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {FamilyTreeRenderer.BACKENDS}.")
+        scope = self._parse_scope(query)
+
+        # The backend doesn't change the output, so it isn't part of the key.
+        key = self.cache.key(data, is_json=is_json, layout=layout, scope=repr(scope))
+        text = self.cache.get(key, ".txt")
+        if text is None:
+            # Malformed data raises a ValueError, UnicodeDecodeError and JSONDecodeError included.
+            try:
+                if is_json:
+                    family_tree = FamilyTree.from_json(data.decode("utf-8"), layout, scope)
+                else:
+                    family_tree = FamilyTree.from_yaml(data.decode("utf-8"), layout, scope)
+            except (ValueError, yaml.YAMLError) as e:
+                raise ValueError(f"Invalid family tree data: {e}") from e
+            if not family_tree.people:
+                raise ValueError("Invalid family tree data: no people to render.")
+            text = FamilyTreeRenderer(family_tree, backend).render().encode("utf-8")
+            self.cache.put(key, ".txt", text)
+
+        if output_format == "text":
+            return text, "text/plain; charset=utf-8"
+
+        image = self.cache.get(key, ".png")
+        if image is None:
+            with io.BytesIO() as f:
+                write_to_image(text.decode("utf-8"), f, "PNG")
+                image = f.getvalue()
+            self.cache.put(key, ".png", image)
+        return image, "image/png"
+
+    @staticmethod
+    def _parse_scope(query: dict[str, str]) -> Scope | None:
+        """Parse the scope options of a request.
+
+        :param query: The rendering options.
+        :return: The scope, or None if the whole tree is rendered.
+        :raises ValueError: If the numbers of generations are invalid, or given without a root.
+        """
+        root = query.get("root")
+        ancestors, descendants = query.get("ancestors"), query.get("descendants")
+        if root is None:
+            if ancestors is not None or descendants is not None:
+                raise ValueError("ancestors and descendants require root.")
+            return None
+        if ancestors is None and descendants is None:
+            return Scope(root)
+        try:
+            return Scope(root, int(ancestors or 0), int(descendants or 0))
+        except ValueError as e:
+            raise ValueError(f"Invalid numbers of generations: {e}") from e
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """Handles the requests of a `RenderServer`."""
+
+    server: RenderServer
+
+    def do_GET(self) -> None:
+        if urlsplit(self.path).path != "/stats":
+            self._send(HTTPStatus.NOT_FOUND, b"Not found.", "text/plain; charset=utf-8")
+            return
+        self._send(HTTPStatus.OK, json.dumps(self.server.cache.stats()).encode(), "application/json")
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        if url.path != "/render":
+            self._send(HTTPStatus.NOT_FOUND, b"Not found.", "text/plain; charset=utf-8")
+            return
+
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        is_json = self.headers.get_content_type() == "application/json"
+        try:
+            content_length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            content_length = -1
+        if content_length < 0:
+            self._send(HTTPStatus.BAD_REQUEST, b"Invalid Content-Length.", "text/plain; charset=utf-8")
+            return
+        try:
+            content, content_type = self.server.render(self.rfile.read(content_length), is_json, query)
+        except ValueError as e:
+            self._send(HTTPStatus.BAD_REQUEST, str(e).encode("utf-8"), "text/plain; charset=utf-8")
+            return
+        self._send(HTTPStatus.OK, content, content_type)
+
+    def log_message(self, format: str, *args: object) -> None:
+        """Silence the log of each request, which would flood the output of a busy server."""
+        pass
+
+    def _send(self, status: HTTPStatus, content: bytes, content_type: str) -> None:
+        """Send a complete response.
+
+        :param status: The status of the response.
+        :param content: The body of the response.
+        :param content_type: The content type of the body.
+        """
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
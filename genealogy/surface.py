@@ -2,8 +2,9 @@ from __future__ import annotations
 
 from collections.abc import Iterator, Sequence
 from itertools import zip_longest
-from typing import Literal, overload, SupportsIndex
+from typing import Any, Literal, overload, SupportsIndex
 
+from genealogy import profiler
 from genealogy.utils import ARROWS, ARROWS_ARITHMETIC
 
 
@@ -21,40 +22,54 @@ class Surface(list["SurfaceLine"]):
         """Compress the surface vertically without affecting the connections.
 
         Works by finding clear paths from left to right that can be safely removed without affecting
-        the structure of the rendered family tree.
+        the structure of the rendered family tree. Each path crosses one cell per column, so
+        removing it shifts the rest of each column up by one.
         """
         self.pad_as_needed()
 
         debug_chars = "/*+.0#"
-        paths_surface = Surface()
+        width = len(self[0])
+        removed_lines: list[set[int]] = [set() for _ in range(width)]
         visited: set[tuple[int, int]] = set()
         for i, line in enumerate(self):
-            paths_surface.add_line()
-            if line and line[0] is not None:
+            if not width or line[0] is not None:
                 continue
 
-            new_path_surface = Surface()
-            is_success = self._find_clear_path(SurfacePosition([i, 0]), new_path_surface, visited)
-            if is_success:
+            path = find_clear_path(self, i, visited)
+            for path_line, index in path:
                 if DEBUG:
-                    new_path_surface.replace_chars(debug_chars[i % len(debug_chars)])
-                paths_surface += new_path_surface
-
-        self[:] = paths_surface + self
+                    self[path_line][index] = debug_chars[i % len(debug_chars)]
+                removed_lines[index].add(path_line)
+        profiler.count("clear_path_cells_visited", len(visited))
 
         if not DEBUG:
-            self._compress_from_clear_paths()
+            self._compress_from_clear_paths(removed_lines)
 
         self.strip()
 
-    def _compress_from_clear_paths(self) -> None:
-        """Compress the surface in place by removing the clear paths marked for removal.
+    def _compress_from_clear_paths(self, removed_lines: list[set[int]]) -> None:
+        """Compress the surface in place by removing the clear paths, column by column.
+
+        Characters marked for removal are removed as well.
 
-        Transpose the surface, remove the marked characters, and transpose back.
+        :param removed_lines: The lines to remove from each column.
         """
-        self.transpose()
-        self._remove_char(ARROWS["to_remove"])
-        self.transpose()
+        lines: list[SurfaceLine] = list(self)
+        kept_lines: list[list[int]] = [
+            [
+                i for i in range(len(lines))
+                if i not in column_removed_lines and lines[i][index] != ARROWS["to_remove"]
+            ]
+            for index, column_removed_lines in enumerate(removed_lines)
+        ]
+        height = max((len(column_kept_lines) for column_kept_lines in kept_lines), default=0)
+        self[:] = [
+            SurfaceLine([
+                lines[column_kept_lines[i]][index] if i < len(column_kept_lines) else None
+                for index, column_kept_lines in enumerate(kept_lines)
+            ])
+            for i in range(height)
+        ]
 
     def transpose(self) -> None:
         """Transpose the surface, swapping rows and columns."""
@@ -94,71 +109,6 @@ class Surface(list["SurfaceLine"]):
                 new_surface.append(line)
         self[:] = new_surface
 
-    def _remove_char(self, char_to_remove: str) -> None:
-        """Remove all occurrences of a specific character from the surface.
-
-        :param char_to_remove: The character to remove from the surface.
-        """
-        for line in self:
-            line[:] = [char for char in line if char != char_to_remove]
-
-    def _find_clear_path(
-            self,
-            pos: SurfacePosition,
-            path_surface: Surface,
-            visited: set[tuple[int, int]],
-    ) -> bool:
-        """Find a clear horizontal path through the surface starting from the given position.
-
-        :param pos: The starting position of the path.
-        :param path_surface: The surface to draw the path on.
-        :param visited: Set of positions already visited.
-        :return: True if a path to the end was found, False otherwise.
-        """
-        if pos.as_tuple() in visited:
-            return False
-        visited.add(pos.as_tuple())
-
-        try:
-            char_self = self[pos]
-        except IndexError:
-            char_self = None
-
-        if char_self not in (None, ARROWS["middle"]):
-            return False
-
-        path_surface.draw(pos, ARROWS["to_remove"])
-
-        if pos.index >= len(self[pos.line]) - 1:
-            return True
-
-        # Move up
-        if pos.line > 0 and char_self is None:
-            # N.B., we don't want to move up on anything but empty space
-            new_pos = SurfacePosition([pos.line - 1, pos.index])
-            if self._find_clear_path(new_pos, path_surface, visited):
-                path_surface.draw(pos, (None,))
-                visited.remove(pos.as_tuple())
-                return True
-
-        # Move right
-        new_pos = SurfacePosition([pos.line, pos.index + 1])
-        if self._find_clear_path(new_pos, path_surface, visited):
-            return True
-
-        # Move down
-        if pos.line + 1 < len(self) and char_self is None:
-            # N.B., we don't want to move down on anything but empty space
-            new_pos = SurfacePosition([pos.line + 1, pos.index])
-            if self._find_clear_path(new_pos, path_surface, visited):
-                path_surface.draw(pos, (None,))
-                visited.remove(pos.as_tuple())
-                return True
-
-        # Backtrack
-        path_surface.draw(pos, (None,))
-        return False
-
     def draw(
             self,
             pos: SurfacePosition,
@@ -180,6 +130,18 @@ class Surface(list["SurfaceLine"]):
         has_overwritten = self[pos.line].draw(pos.index, iterable, up_to=up_to)
         return has_overwritten
 
+    def draw_vertically(self, pos: SurfacePosition, iterable: Sequence[str | None]) -> bool:
+        """Draw a sequence of characters downwards, starting at the specified position.
+
+        :param pos: The position to start drawing at.
+        :param iterable: The characters to draw, one per line.
+        :return: True if drawing has overwritten existing characters.
+        """
+        has_overwritten = False
+        for i, char in enumerate(iterable):
+            has_overwritten |= self.draw(pos + [i, 0], (char,))
+        return has_overwritten
+
     def add_line(self) -> None:
         """Add an empty line to the surface."""
         self.append(SurfaceLine())
@@ -237,10 +199,35 @@ class Surface(list["SurfaceLine"]):
 
         return super().__getitem__(item)
 
+    def iter_str(
+            self,
+            line_start: int = 0,
+            line_end: int | None = None,
+            col_start: int = 0,
+            col_end: int | None = None,
+    ) -> Iterator[str]:
+        """Iterate over the lines of the surface as strings, replacing None with spaces.
+
+        Bounds are positions on the surface, clamped to it: negative ones count as 0, rather than
+        from the end as with slices.
+
+        :param line_start: The first line to iterate over.
+        :param line_end: The line after the last line to iterate over, the end of the surface if None.
+        :param col_start: The first column of each line.
+        :param col_end: The column after the last column of each line, the end of the line if None.
+        """
+        line_end = None if line_end is None else max(line_end, 0)
+        col_end = None if col_end is None else max(col_end, 0)
+        for line in list.__getitem__(self, slice(max(line_start, 0), line_end)):
+            if col_start <= 0 and col_end is None:
+                yield line.as_str
+            else:
+                yield SurfaceLine(line[max(col_start, 0):col_end]).as_str
+
     @property
     def as_str(self) -> str:
         """Get the surface as a string, replacing None with spaces."""
-        return "\n".join([line.as_str for line in self])
+        return "\n".join(self.iter_str())
 
 
 class SurfaceLine(list[str | None]):
@@ -328,8 +315,15 @@ class SurfaceLine(list[str | None]):
         return "".join([char if char is not None else " " for char in self])
 
 
-class ArrowsSurface(Surface):
-    """Specialized surface for drawing connection arrows between family members."""
+class ArrowsDrawing:
+    """Methods to draw connection arrows between family members, for any surface backend.
+
+    Relies on the `draw` method and on character lookups by position of the surface it is mixed in.
+    """
+
+    draw: Any
+    draw_vertically: Any
+    __getitem__: Any
 
     def draw_connections(self, connections: ConnectionsType) -> None:
         """Draw all family connections using box-drawing characters.
@@ -338,17 +332,38 @@ class ArrowsSurface(Surface):
         """
         for generation, generation_connections in enumerate(connections):
             for couple_connection in generation_connections.values():
-                assert couple_connection.allocated_channel is not None
-                self._draw_channel(
-                    generation,
-                    couple_connection.allocated_channel,
-                    couple_connection.min,
-                    couple_connection.max
-                )
-                for child_coord in couple_connection.child_coords:
-                    self._draw_child_connection(child_coord, couple_connection.allocated_channel)
-                for parent_coord in couple_connection.parent_coords:
-                    self._draw_parent_connection(parent_coord, generation, couple_connection.allocated_channel)
+                self.draw_connection(generation, couple_connection)
+
+    def draw_connection(
+            self,
+            generation: int,
+            couple_connection: CoupleConnection,
+            line_start: int = 0,
+            line_end: int | None = None,
+    ) -> None:
+        """Draw the connection of a parental couple, or the part of it within a range of lines.
+
+        Each cell gets the same characters as when drawing the whole connection, as long as the
+        connections crossing the range are drawn in the same order.
+
+        :param generation: The generation of the children.
+        :param couple_connection: The connection, with its allocated channel.
+        :param line_start: The first line to draw, drawn on the first line of the surface.
+        :param line_end: The line after the last line to draw, the end of the connection if None.
+        """
+        assert couple_connection.allocated_channel is not None
+        channel = couple_connection.allocated_channel
+        if line_end is None:
+            line_end = couple_connection.max + 1
+        if couple_connection.min < line_end and couple_connection.max >= line_start:
+            self._draw_channel(generation, channel, couple_connection.min, couple_connection.max, line_start, line_end)
+        shift = [line_start, 0]
+        for child_coord in couple_connection.child_coords:
+            if line_start <= child_coord.line < line_end:
+                self._draw_child_connection(child_coord - shift, channel)
+        for parent_coord in couple_connection.parent_coords:
+            if line_start <= parent_coord.line < line_end:
+                self._draw_parent_connection(parent_coord - shift, generation, channel)
 
     def _draw_channel(
             self,
@@ -356,25 +371,26 @@ class ArrowsSurface(Surface):
             channel: int,
             start: int,
             end: int,
+            line_start: int = 0,
+            line_end: int | None = None,
     ) -> None:
-        """Draw a vertical channel for a parental connection.
+        """Draw a vertical channel for a parental connection, or the part of it within a range of lines.
 
         :param generation: The generation number.
         :param channel: The channel index.
         :param start: The starting line index.
         :param end: The ending line index.
+        :param line_start: The first line to draw, drawn on the first line of the surface.
+        :param line_end: The line after the last line to draw, the end of the channel if None.
         """
-        for line in range(start, end + 1):
-            pos = SurfacePosition.from_generation(line, generation).connection_right(channel)
-            if line == start:
-                if line == end:
-                    self.draw(pos, ARROWS["connection"])
-                    continue
-                self.draw(pos, ARROWS["start"])
-            elif line == end:
-                self.draw(pos, ARROWS["end"])
-            else:
-                self.draw(pos, ARROWS["middle"])
+        pos = SurfacePosition.from_generation(start, generation).connection_right(channel)
+        if start == end:
+            self.draw(pos - [line_start, 0], ARROWS["connection"])
+            return
+        chars = ARROWS["start"] + ARROWS["middle"] * (end - start - 1) + ARROWS["end"]
+        first = max(start, line_start)
+        last = end + 1 if line_end is None else min(end + 1, line_end)
+        self.draw_vertically(pos + [first - start - line_start, 0], chars[first - start:last - start])
 
     def _draw_child_connection(
             self,
@@ -429,10 +445,7 @@ class ArrowsSurface(Surface):
         :param connection_arrow: The proposed arrow character.
         :return: The arrow character to use.
         """
-        try:
-            prev_arrow = self[pos.line][pos.index]
-        except IndexError:
-            prev_arrow = None
+        prev_arrow = self[pos]
 
         if prev_arrow is None:
             return connection_arrow
@@ -440,6 +453,10 @@ class ArrowsSurface(Surface):
         return ARROWS_ARITHMETIC[(prev_arrow, connection_arrow)]
 
 
+class ArrowsSurface(ArrowsDrawing, Surface):
+    """Specialized surface for drawing connection arrows between family members."""
+
+
 class SurfacePosition(Sequence[int]):
     """Represents a position in the 2D surface with line and index coordinates.
 
@@ -572,13 +589,30 @@ class CoupleConnection:
         self.child_coords = child_coords if child_coords is not None else []
         self.allocated_channel = allocated_channel
 
+        used_lines = [pos.line for pos in self.parent_coords + self.child_coords]
+        self._min: int | None = min(used_lines, default=None)
+        self._max: int | None = max(used_lines, default=None)
+
+    def add_child_coord(self, child_coord: SurfacePosition) -> None:
+        """Add the position of a child, keeping the line bounds of the connection up to date.
+
+        :param child_coord: The position of the child on the surface.
+        """
+        self.child_coords.append(child_coord)
+        if self._min is None or child_coord.line < self._min:
+            self._min = child_coord.line
+        if self._max is None or child_coord.line > self._max:
+            self._max = child_coord.line
+
     @property
     def min(self) -> int:
         """Get the minimum line index used by this connection.
 
         :return: The minimum line index.
         """
-        return min(self.used_lines)
+        if self._min is None:
+            raise ValueError("The connection has no coordinates.")
+        return self._min
 
     @property
     def max(self) -> int:
@@ -586,7 +620,9 @@ class CoupleConnection:
 
         :return: The maximum line index.
         """
-        return max(self.used_lines)
+        if self._max is None:
+            raise ValueError("The connection has no coordinates.")
+        return self._max
 
     @property
     def used_lines(self) -> tuple[int, ...]:
@@ -603,3 +639,75 @@ ConnectionsType = list[dict[tuple[str, ...], CoupleConnection]]
 class DrawError(Exception):
     """Exception raised when drawing operations encounter an error."""
     pass
+
+
+def find_clear_path(
+        cells: Sequence[Sequence[Any]],
+        line: int,
+        visited: set[tuple[int, int]],
+        empty: Any = None,
+        middle: Any = ARROWS["middle"],
+) -> list[tuple[int, int]]:
+    """Find a clear path from left to right through padded surface cells, starting from a line.
+
+    The path may only cross empty space and vertical channels, and may only move up or down on
+    empty space. It is searched depth-first, trying to move up, then right, then down, with an
+    explicit stack rather than recursion.
+
+    :param cells: The cells of the surface, line by line, all lines having the same length.
+    :param line: The line to start from, on the first column.
+    :param visited: Set of positions already visited, shared between searches.
+    :param empty: The value of empty cells.
+    :param middle: The value of vertical channel cells.
+    :return: The positions of the path, one per column, or an empty list if there is none.
+    """
+    up, right, down = 0, 1, 2
+    lines: list[Sequence[Any]] = list(cells)
+    last_index = len(lines[0]) - 1
+    path: dict[tuple[int, int], None] = {}
+    # Each frame holds a position on the path and the last move tried from it.
+    stack: list[list[int]] = []
+
+    def enter(pos: tuple[int, int]) -> bool | None:
+        """Enter a position, returning whether the path is complete, or None if undecided."""
+        if pos in visited:
+            return False
+        visited.add(pos)
+        if lines[pos[0]][pos[1]] not in (empty, middle):
+            return False
+        path[pos] = None
+        if pos[1] >= last_index:
+            return True
+        stack.append([pos[0], pos[1], -1])
+        return None
+
+    result = enter((line, 0))
+    while stack:
+        frame = stack[-1]
+        pos = frame[0], frame[1]
+        if result:
+            stack.pop()
+            if frame[2] != right:
+                # Only keep one position per column, the one the path leaves from to the right.
+                del path[pos]
+                visited.remove(pos)
+            continue
+
+        # N.B., we don't want to move up or down on anything but empty space
+        is_empty = lines[pos[0]][pos[1]] == empty
+        result = False
+        while result is False and frame[2] < down:
+            frame[2] += 1
+            if frame[2] == up and pos[0] > 0 and is_empty:
+                result = enter((pos[0] - 1, pos[1]))
+            elif frame[2] == right:
+                result = enter((pos[0], pos[1] + 1))
+            elif frame[2] == down and pos[0] + 1 < len(lines) and is_empty:
+                result = enter((pos[0] + 1, pos[1]))
+
+        if result is False:
+            # Backtrack
+            stack.pop()
+            del path[pos]
+
+    return list(path) if result else []
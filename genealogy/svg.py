@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from xml.sax.saxutils import escape
+
+
+BOX_ARMS: dict[str, dict[str, str]] = {
+    "═": {"left": "double", "right": "double"},
+    "║": {"up": "double", "down": "double"},
+    "╘": {"up": "single", "right": "double"},
+    "╞": {"up": "single", "down": "single", "right": "double"},
+    "╡": {"up": "single", "down": "single", "left": "double"},
+    "╥": {"left": "single", "right": "single", "down": "double"},
+    "╨": {"left": "single", "right": "single", "up": "double"},
+    "╗": {"left": "double", "down": "double"},
+    "╝": {"left": "double", "up": "double"},
+    "╣": {"left": "double", "up": "double", "down": "double"},
+    "╔": {"right": "double", "down": "double"},
+    "╚": {"right": "double", "up": "double"},
+    "╠": {"right": "double", "up": "double", "down": "double"},
+    "╦": {"left": "double", "right": "double", "down": "double"},
+    "╩": {"left": "double", "right": "double", "up": "double"},
+    "╬": {"left": "double", "right": "double", "up": "double", "down": "double"},
+}
+"""Arms of the box-drawing characters of the arrows, from the center of their cell to its edges, by style."""
+
+CELL_WIDTH: int = 10
+"""Width of a character cell, in SVG user units."""
+CELL_HEIGHT: int = 20
+"""Height of a character cell, in SVG user units."""
+PADDING: int = 20
+"""Margin around the rendered tree, in SVG user units."""
+
+
+def write_to_svg(text: str, output_path: str) -> None:
+    """Write the given text to an SVG file, as vector names and arrows.
+
+    Names are written as text elements, and the box-drawing characters of the arrows as stroked
+    paths, single and double lines having different widths. The elements are written line by line,
+    so the size of the file follows the content of the text, rather than its area.
+
+    :param text: The text to write to the SVG file, as rendered by `FamilyTreeRenderer`.
+    :param output_path: The path to save the SVG file to.
+    """
+    lines = text.split("\n")
+    width = max((len(line) for line in lines), default=0) * CELL_WIDTH + 2 * PADDING
+    height = len(lines) * CELL_HEIGHT + 2 * PADDING
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}">\n'
+            "<style>"
+            "text{font-family:monospace;font-size:16px;fill:#fff;dominant-baseline:central;white-space:pre}"
+            "path{fill:none;stroke:#fff}"
+            ".single{stroke-width:1}"
+            ".double{stroke-width:3}"
+            "</style>\n"
+            '<rect width="100%" height="100%" fill="#1e1e1e"/>\n'
+        )
+        for i, line in enumerate(lines):
+            f.writelines(_line_elements(line, PADDING + i * CELL_HEIGHT + CELL_HEIGHT // 2))
+        f.write("</svg>\n")
+
+
+def _line_elements(line: str, y: int) -> list[str]:
+    """Convert a line of rendered text to SVG elements.
+
+    :param line: The line of text.
+    :param y: The vertical position of the middle of the line.
+    :return: A text element per run of characters between arrows, and a path per line style.
+    """
+    elements: list[str] = []
+    # Horizontal arms of touching cells are merged into long segments.
+    horizontal_segments: dict[str, list[list[int]]] = {"single": [], "double": []}
+    vertical_paths: dict[str, list[str]] = {"single": [], "double": []}
+    half_width, half_height = CELL_WIDTH // 2, CELL_HEIGHT // 2
+    run_start = 0
+    for col, char in enumerate(f"{line}\n"):
+        arms = BOX_ARMS.get(char)
+        if arms is None and char != "\n":
+            continue
+
+        run = line[run_start:col]
+        if run.strip():
+            first_col = run_start + len(run) - len(run.lstrip())
+            run = run.strip()
+            elements.append(
+                f'<text x="{PADDING + first_col * CELL_WIDTH}" y="{y}" textLength="{len(run) * CELL_WIDTH}" '
+                f'lengthAdjust="spacingAndGlyphs">{escape(run)}</text>\n'
+            )
+        run_start = col + 1
+
+        if arms is not None:
+            x = PADDING + col * CELL_WIDTH + half_width
+            for direction, style in arms.items():
+                if direction == "left":
+                    _extend_segment(horizontal_segments[style], x - half_width, x)
+                elif direction == "right":
+                    _extend_segment(horizontal_segments[style], x, x + half_width)
+                elif direction == "up":
+                    vertical_paths[style].append(f"M{x} {y}v{-half_height}")
+                else:
+                    vertical_paths[style].append(f"M{x} {y}v{half_height}")
+
+    for style, segments in horizontal_segments.items():
+        path = "".join([f"M{start} {y}H{end}" for start, end in segments]) + "".join(vertical_paths[style])
+        if path:
+            elements.append(f'<path class="{style}" d="{path}"/>\n')
+    return elements
+
+
+def _extend_segment(segments: list[list[int]], start: int, end: int) -> None:
+    """Add a horizontal segment, merging it into the last one if they touch.
+
+    :param segments: The segments of a line, from left to right, updated in place.
+    :param start: The left end of the segment.
+    :param end: The right end of the segment.
+    """
+    if segments and segments[-1][1] >= start:
+        segments[-1][1] = max(segments[-1][1], end)
+    else:
+        segments.append([start, end])
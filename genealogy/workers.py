@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+
+def map_in_processes(function: Callable, tasks: Sequence, jobs: int | None = None) -> list:
+    """Apply a function to tasks over a pool of processes, in chunks of tasks.
+
+    Several tasks per chunk amortize the inter-process communication, while keeping enough chunks
+    per worker to balance uneven tasks.
+
+    :param function: The function to apply, which must be picklable, e.g. defined at module level.
+    :param tasks: The tasks, which must be picklable.
+    :param jobs: Number of worker processes, None or 0 for the number of CPUs. With 1, or a single
+        task, the tasks are run in the current process.
+    :return: The results, in the order of the tasks.
+    :raises ValueError: If the number of processes is negative.
+    """
+    if jobs is not None and jobs < 0:
+        raise ValueError(f"The number of processes must not be negative, got {jobs}.")
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(tasks) <= 1:
+        return [function(task) for task in tasks]
+    chunksize = max(1, len(tasks) // (jobs * 4))
+    with ProcessPoolExecutor(min(jobs, len(tasks))) as executor:
+        return list(executor.map(function, tasks, chunksize=chunksize))
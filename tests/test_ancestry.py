@@ -0,0 +1,68 @@
+import pytest
+
+from benchmarks.generator import FamilyGenerator
+from genealogy.ancestry import AncestorIndex
+from genealogy.family_tree import FamilyTree
+from genealogy.utils import Relationship
+
+
+class TestAncestry:
+    def test_sample(self):
+        family_tree = FamilyTree.from_file("sample_data.yml")
+
+        assert family_tree.is_ancestor("Robert", "John")
+        assert not family_tree.is_ancestor("John", "Robert")
+        assert not family_tree.is_ancestor("John", "John")
+        assert not family_tree.is_ancestor("James", "Michael")
+
+        assert {person.id for person in family_tree.common_ancestors("Michael", "Sarah")} == {"Robert", "Helen"}
+        assert [person.id for person in family_tree.common_ancestors("Emily", "John")] == ["Emily"]
+        assert family_tree.common_ancestors("James", "Robert") == []
+
+        assert family_tree.relationship_degree("Michael", "Sarah") == 2
+        assert family_tree.relationship_degree("John", "Michael") == 3
+        assert family_tree.relationship_degree("John", "Robert") == 2
+        assert family_tree.relationship_degree("John", "John") == 0
+        assert family_tree.relationship_degree("James", "Robert") is None
+
+    def test_pedigree_collapse(self):
+        # First cousins C1 and C2 have a child K, whose shortest path to G goes through either parent.
+        data = {
+            "people": {id_: f"{id_} Doe" for id_ in ("G", "A", "B", "C1", "C2", "K")},
+            "relationships": {
+                "A": {"F": "G"}, "B": {"F": "G"},
+                "C1": {"F": "A"}, "C2": {"M": "B"},
+                "K": {"F": "C1", "M": "C2"},
+            },
+        }
+        family_tree = FamilyTree.deserialize_data(data)
+
+        assert family_tree.is_ancestor("G", "K")
+        assert [person.id for person in family_tree.common_ancestors("C1", "C2")] == ["G"]
+        assert [person.id for person in family_tree.common_ancestors("K", "A")] == ["A"]
+        assert family_tree.relationship_degree("C1", "C2") == 4
+        assert family_tree.relationship_degree("K", "G") == 3
+
+    def test_after_edit(self):
+        family_tree = FamilyTree.from_file("sample_data.yml")
+        assert family_tree.relationship_degree("Michael", "Sarah") == 2
+
+        family_tree.remove_relationship("Michael", Relationship.F)
+        family_tree.remove_relationship("Michael", Relationship.M)
+        assert not family_tree.is_ancestor("Robert", "Michael")
+        assert family_tree.relationship_degree("Michael", "Sarah") is None
+
+    @pytest.mark.parametrize("shape", ["mixed", "collapse"])
+    def test_approximate_labels(self, shape):
+        # A single interval per person makes most labels approximate, the queries must still be exact.
+        family_tree = FamilyTree.deserialize_data(FamilyGenerator(0).generate(150, shape))
+        exact = AncestorIndex(family_tree.graph, max_intervals=len(family_tree.graph))
+        approximate = AncestorIndex(family_tree.graph, max_intervals=1)
+        assert approximate.n_intervals() < exact.n_intervals()
+
+        n_people = len(family_tree.graph)
+        for first in range(n_people):
+            for second in range(0, n_people, 7):
+                assert approximate.is_ancestor(first, second) == exact.is_ancestor(first, second)
+                assert approximate.common_ancestors(first, second) == exact.common_ancestors(first, second)
+                assert approximate.relationship_degree(first, second) == exact.relationship_degree(first, second)
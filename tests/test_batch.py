@@ -0,0 +1,36 @@
+import shutil
+
+import pytest
+
+from genealogy.batch import find_data_files, run_batch
+from genealogy.family_tree import FamilyTree
+from genealogy.family_tree_renderer import FamilyTreeRenderer
+
+
+class TestBatch:
+    @pytest.mark.parametrize("jobs", [0, 1, 2])
+    def test_run_batch(self, tmp_path, jobs):
+        for directory in ("first", "second"):
+            (tmp_path / "in" / directory).mkdir(parents=True)
+            shutil.copy("sample_data.yml", tmp_path / "in" / directory / "family.yml")
+        (tmp_path / "in" / "second" / "broken.yml").write_text("people: [")
+
+        data_paths = find_data_files(str(tmp_path / "in" / "**" / "*.yml"))
+        assert len(data_paths) == 3
+
+        result = run_batch(data_paths, str(tmp_path / "out"), jobs=jobs)
+        assert result.n_files == 3
+        assert list(result.failures) == [str(tmp_path / "in" / "second" / "broken.yml")]
+        assert "Rendered 2/3 files" in result.summary()
+
+        expected = FamilyTreeRenderer.from_file("sample_data.yml").render()
+        for directory in ("first", "second"):
+            assert (tmp_path / "out" / directory / "family.yml.txt").read_text(encoding="utf-8") == expected
+
+    def test_same_stem(self, tmp_path):
+        shutil.copy("sample_data.yml", tmp_path / "family.yml")
+        (tmp_path / "family.json").write_text(FamilyTree.from_file("sample_data.yml").to_json(), encoding="utf-8")
+
+        result = run_batch(find_data_files(str(tmp_path / "family.*")), str(tmp_path / "out"), jobs=2)
+        assert not result.failures
+        assert sorted(path.name for path in (tmp_path / "out").iterdir()) == ["family.json.txt", "family.yml.txt"]
@@ -0,0 +1,49 @@
+import pytest
+
+from benchmarks.generator import FamilyGenerator
+from benchmarks.run import STAGES, StageRecorder, run_benchmark
+from genealogy.family_graph import FamilyGraph
+from genealogy.family_tree import FamilyTree
+
+
+class TestFamilyGenerator:
+    @pytest.mark.parametrize("shape", FamilyGenerator.SHAPES)
+    def test_generate(self, shape):
+        data = FamilyGenerator(seed=1).generate(200, shape)
+        assert len(data["people"]) == 200
+        assert data == FamilyGenerator(seed=1).generate(200, shape)
+
+        family_tree = FamilyTree.deserialize_data(data)
+        assert len(family_tree.people) == 200
+        n_components = len(set(FamilyGraph(family_tree.people).label_components().tolist()))
+        assert (n_components > 1) == (shape == "forest")
+
+    def test_adoptive(self):
+        data = FamilyGenerator().generate(200, "adoptive")
+        relationships = {relationship for parents in data["relationships"].values() for relationship in parents}
+        assert relationships == {"F", "M", "AF", "AM"}
+
+    def test_collapse(self):
+        data = FamilyGenerator().generate(200, "collapse")
+        parents = [parent for parents in data["relationships"].values() for parent in parents.values()]
+        assert len(set(parents)) < len(parents)
+
+    def test_unknown_shape(self):
+        with pytest.raises(ValueError):
+            FamilyGenerator().generate(10, "unknown")
+
+
+class TestRunBenchmark:
+    def test_run_benchmark(self):
+        result = run_benchmark(20, "mixed", backend="array")
+        assert set(result["times"]) == set(STAGES)
+        assert set(result["peaks"]) == set(STAGES)
+
+    def test_nested_stages(self):
+        recorder = StageRecorder(trace_memory=False)
+        with recorder.instrument(FamilyTree, "deserialize_data"), \
+                recorder.instrument(FamilyTree, "_compute_generations"):
+            FamilyTree.deserialize_data(FamilyGenerator().generate(100))
+        assert set(recorder.times) == {"deserialize_data", "_compute_generations"}
+        assert "__wrapped__" not in vars(FamilyTree._compute_generations)
+        assert isinstance(vars(FamilyTree)["deserialize_data"], classmethod)
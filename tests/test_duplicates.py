@@ -0,0 +1,94 @@
+import pytest
+
+from benchmarks.generator import FamilyGenerator
+from genealogy.duplicates import find_duplicates, name_similarity, soundex
+from genealogy.family_tree import FamilyTree
+
+
+class TestDuplicates:
+    def test_names(self):
+        assert soundex("Robert") == soundex("Rupert") == "R163"
+        assert soundex("Ashcraft") == "A261"
+        assert soundex("Tymczak") == "T522"
+        assert soundex("") == ""
+
+        assert name_similarity("Élodie", "elodie") == 1
+        assert name_similarity("J.", "John") == 0.8
+        assert 0.5 < name_similarity("Jonathan", "Johnathan") < 1
+        assert name_similarity("John", "Mary") == 0
+        assert name_similarity("", "") == 0
+
+    def test_merged_files(self):
+        # The second file spells names differently, with an accent for Helen, and lists Emily under her maiden name.
+        data = {
+            "people": {
+                "Robert": "Robert Johnson", "Helen": "Helen Johnson ne.e Brown", "Emily": "Emily Smith ne.e Johnson",
+                "Michael": "Michael Johnson", "James": "James Smith", "John": "John Smith",
+                "I1": "Robert Jonson", "I2": "Hélène Johnson", "I3": "Emily Johnson", "I4": "Michael Jonson",
+                "I5": "Edward Smith",
+            },
+            "relationships": {
+                "Emily": {"F": "Robert", "M": "Helen"}, "Michael": {"F": "Robert", "M": "Helen"},
+                "John": {"F": "James", "M": "Emily"},
+                "I3": {"F": "I1", "M": "I2"}, "I4": {"F": "I1", "M": "I2"},
+            },
+        }
+        family_tree = FamilyTree.deserialize_data(data)
+
+        suggestions = family_tree.find_duplicates()
+        pairs = {frozenset((first.id, second.id)) for first, second, _ in suggestions}
+        expected = (("Robert", "I1"), ("Helen", "I2"), ("Emily", "I3"), ("Michael", "I4"))
+        assert pairs == {frozenset(pair) for pair in expected}
+        scores = [score for _, _, score in suggestions]
+        assert scores == sorted(scores, reverse=True)
+        assert all(0.8 <= score <= 1 for score in scores)
+
+    def test_parent_and_child(self):
+        data = {"people": {"Sr": "John Smith", "Jr": "John Smith"}, "relationships": {"Jr": {"F": "Sr"}}}
+        assert FamilyTree.deserialize_data(data).find_duplicates() == []
+
+    @pytest.mark.parametrize("shape", ["mixed", "collapse"])
+    def test_generated(self, shape):
+        # A copy of a generated file, under other IDs and with typos in some first names.
+        data = FamilyGenerator(0).generate(300, shape)
+        people = {"B" + id_: name for id_, name in data["people"].items()}
+        for id_ in list(people)[::5]:
+            first_name, *others = people[id_].split(" ")
+            people[id_] = " ".join([first_name[:-1], *others])
+        relationships = {
+            "B" + id_: {relationship: "B" + parent_id for relationship, parent_id in parents.items()}
+            for id_, parents in data["relationships"].items()
+        }
+        people_list = FamilyTree._deserialize_people({
+            "people": data["people"] | people,
+            "relationships": data["relationships"] | relationships,
+        })
+
+        suggestions = find_duplicates(people_list)
+        pairs = {(first.id, second.id) for first, second, _ in suggestions}
+        found = sum((id_, "B" + id_) in pairs or ("B" + id_, id_) in pairs for id_ in data["people"])
+        assert found > 0.9 * len(data["people"])
+        for first, second, _ in suggestions:
+            assert first not in second.children and second not in first.children
+
+        # Splitting the blocks of common keys only leaves out pairs that are less likely duplicates.
+        assert len(find_duplicates(people_list, max_block_size=len(people_list))) >= len(suggestions)
+
+    def test_common_name(self):
+        # Two records of John Quincy Smith, among many other John Smiths, all in one oversize block.
+        people = {f"P{i}": f"John Middle{i} Smith" for i in range(200)}
+        people |= {"Q1": "John Quincy Smith", "Q2": "John Quincy Smith"}
+        people_list = FamilyTree._deserialize_people({"people": people, "relationships": {}})
+        pairs = {frozenset((first.id, second.id)) for first, second, _ in find_duplicates(people_list)}
+        assert frozenset(("Q1", "Q2")) in pairs
+
+        # People that no secondary key tells apart are compared with their neighbours only.
+        people = {f"P{i}": "John Smith" for i in range(100)}
+        people_list = FamilyTree._deserialize_people({"people": people, "relationships": {}})
+        suggestions = find_duplicates(people_list, max_block_size=10)
+        assert 0 < len(suggestions) <= 100 * 9
+
+    def test_no_surname(self):
+        data = {"people": {"A": "Plato", "B": "Plato", "C": "Homer"}, "relationships": {}}
+        suggestions = FamilyTree.deserialize_data(data).find_duplicates()
+        assert [{first.id, second.id} for first, second, _ in suggestions] == [{"A", "B"}]
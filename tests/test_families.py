@@ -0,0 +1,31 @@
+from benchmarks.generator import FamilyGenerator
+from genealogy.families import render_families, split_families
+from genealogy.family_tree import FamilyTree
+from genealogy.family_tree_renderer import FamilyTreeRenderer
+
+
+class TestFamilies:
+    def test_split_families(self):
+        data = {
+            "people": {"A": "A Doe", "B": "B Roe", "C": "C Doe", "D": "D Abe"},
+            "relationships": {"C": {"F": "A"}},
+        }
+        families = split_families(FamilyTree._deserialize_people(data))
+        assert [[person.id for person in family] for family in families] == [["D"], ["A", "C"], ["B"]]
+
+    def test_render_families(self):
+        data = FamilyGenerator(2).generate(80, "forest")
+        families = split_families(FamilyTree._deserialize_people(data))
+        assert len(families) > 1
+
+        rendered = render_families(FamilyTree._deserialize_people(data), jobs=1)
+        assert render_families(FamilyTree._deserialize_people(data), backend="array", jobs=2) == rendered
+        expected = [
+            FamilyTreeRenderer(FamilyTree.deserialize_data(FamilyTree.serialize_people(family))).render()
+            for family in families
+        ]
+        assert rendered == "\n".join(expected)
+
+    def test_render_one_family(self):
+        rendered = render_families(FamilyTree.read_people("sample_data.yml"), jobs=2)
+        assert rendered == FamilyTreeRenderer.from_file("sample_data.yml").render()
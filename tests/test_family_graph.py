@@ -0,0 +1,61 @@
+from genealogy.family_graph import FamilyGraph
+from genealogy.person import Person
+from genealogy.utils import Relationship
+
+
+class TestFamilyGraph:
+    def test_adjacency(self):
+        father, mother, child = Person("F", "Father Doe"), Person("M", "Mother Doe"), Person("C", "Child Doe")
+        child.parents = {Relationship.F: father, Relationship.M: mother, Relationship.AM: mother}
+        father.children.append(child)
+        mother.children.extend([child, child])
+
+        graph = FamilyGraph([father, mother, child])
+        assert graph.parents_ptr.tolist() == [0, 0, 0, 2]
+        assert graph.parents_idx.tolist() == [0, 1]
+        assert graph.children_ptr.tolist() == [0, 1, 2, 2]
+        assert graph.children_idx.tolist() == [2, 2]
+        assert graph.edge_children.tolist() == [2, 2]
+        assert graph.label_components().tolist() == [0, 0, 0]
+
+    def test_components(self):
+        a, b, c = Person("A", "A Doe"), Person("B", "B Doe"), Person("C", "C Doe")
+        c.parents = {Relationship.AF: a}
+        a.children.append(c)
+
+        assert FamilyGraph([a, b, c]).label_components().tolist() == [0, 1, 0]
+
+    def test_edit(self):
+        a, b, c, d = Person("A", "A Doe"), Person("B", "B Doe"), Person("C", "C Doe"), Person("D", "D Doe")
+        c.parents = {Relationship.F: a}
+        a.children.append(c)
+        graph = FamilyGraph([c, a, b])
+
+        # B becomes a child of C: B moves before C and A, and the edits match a graph built from scratch.
+        graph.move([b, c, a])
+        assert graph.people == [b, c, a]
+        b.parents[Relationship.F] = c
+        c.children.append(b)
+        graph.add_link(graph.index_by_id["B"], graph.index_by_id["C"])
+        graph.add_person(d)
+        d.parents = {Relationship.M: c, Relationship.AM: c}
+        c.children.append(d)
+        graph.add_link(graph.index_by_id["D"], graph.index_by_id["C"])
+        graph.add_link(graph.index_by_id["D"], graph.index_by_id["C"])
+        self._assert_rebuilt(graph)
+
+        # D is still linked to C by adoption.
+        del d.parents[Relationship.M]
+        graph.remove_link(graph.index_by_id["D"], graph.index_by_id["C"])
+        self._assert_rebuilt(graph)
+        del d.parents[Relationship.AM]
+        c.children.remove(d)
+        graph.remove_link(graph.index_by_id["D"], graph.index_by_id["C"])
+        self._assert_rebuilt(graph)
+
+    @staticmethod
+    def _assert_rebuilt(graph):
+        rebuilt = FamilyGraph(graph.people)
+        assert graph.index_by_id == rebuilt.index_by_id
+        for name in ("parents_ptr", "parents_idx", "children_ptr", "children_idx"):
+            assert getattr(graph, name).tolist() == getattr(rebuilt, name).tolist()
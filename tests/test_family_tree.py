@@ -0,0 +1,179 @@
+import random
+import time
+
+import pytest
+
+from benchmarks.generator import FamilyGenerator
+from genealogy.family_tree import FamilyTree
+from genealogy.family_tree_renderer import FamilyTreeRenderer
+from genealogy.layout import LayeredLayout
+from genealogy.person import Person
+from genealogy.utils import Relationship
+
+
+class TestFamilyTree:
+    def test_solve_layout(self):
+        # A line of descent, listed in a shuffled order.
+        ids = [f"P{i}" for i in range(30)]
+        random.Random(0).shuffle(ids)
+        data = {
+            "people": {id_: f"{id_} Doe" for id_ in ids},
+            "relationships": {f"P{i}": {"F": f"P{i + 1}"} for i in range(29)},
+        }
+
+        family_tree = FamilyTree.deserialize_data(data, layout="solve")
+        ranks = {person.id: rank for rank, person in enumerate(family_tree.people)}
+        assert all(abs(ranks[f"P{i}"] - ranks[f"P{i + 1}"]) == 1 for i in range(29))
+
+    @pytest.mark.parametrize("shape", ["mixed", "forest", "collapse"])
+    def test_solve_layout_properties(self, shape):
+        data = FamilyGenerator(2).generate(300, shape)
+        family_tree = FamilyTree.deserialize_data(data, layout="solve")
+
+        # Connected families occupy contiguous ranges of the ordering.
+        labels = family_tree.graph.label_components()
+        families = [labels[family_tree.graph.index_by_id[person.id]] for person in family_tree.people]
+        assert sum(family != next_family for family, next_family in zip(families, families[1:])) == labels.max()
+
+        # The ordering minimizes the squared distances between relatives, well below the other layouts.
+        def squared_distances(tree):
+            ranks = {person.id: rank for rank, person in enumerate(tree.people)}
+            return sum(
+                (ranks[person.id] - ranks[parent.id]) ** 2
+                for person in tree.people for parent in set(person.parents.values())
+            )
+
+        for other_layout in ("relax", LayeredLayout(n_iterations=0)):
+            other_tree = FamilyTree.deserialize_data(data, other_layout)
+            assert 2 * squared_distances(family_tree) < squared_distances(other_tree)
+
+    def test_solve_layout_keeps_families_together(self):
+        data = {
+            "people": {"A": "A A", "B": "B B", "C": "C C", "D": "D D", "E": "E E", "F": "F F"},
+            "relationships": {"C": {"F": "A", "M": "B"}, "F": {"F": "D", "M": "E"}},
+        }
+
+        family_tree = FamilyTree.deserialize_data(data, layout="solve")
+        ids = [person.id for person in family_tree.people]
+        assert {frozenset(ids[:3]), frozenset(ids[3:])} == {frozenset("ABC"), frozenset("DEF")}
+
+    def test_unknown_layout(self):
+        with pytest.raises(ValueError):
+            FamilyTree([], layout="unknown")
+
+    def test_deep_pedigree(self):
+        n_generations = 2000
+        data = {
+            "people": {f"P{i}": f"Person {i}" for i in range(n_generations)},
+            "relationships": {f"P{i}": {"F": f"P{i + 1}"} for i in range(n_generations - 1)},
+        }
+
+        family_tree = FamilyTree.deserialize_data(data)
+        generations = {person.id: person.generation for person in family_tree.people}
+        assert generations["P0"] == 0
+        assert generations[f"P{n_generations - 1}"] == n_generations - 1
+
+    def test_cycle(self):
+        data = {
+            "people": {"A": "A A", "B": "B B"},
+            "relationships": {"A": {"F": "B"}, "B": {"F": "A"}},
+        }
+
+        with pytest.raises(ValueError, match="Cycle detected"):
+            FamilyTree.deserialize_data(data)
+
+    @pytest.mark.parametrize("data", [
+        ["people", "relationships"],
+        {"people": {"A": "A A"}},
+        {"people": ["A", "B"], "relationships": {}},
+        {"people": {1: "A A"}, "relationships": {}},
+        {"people": {"A": "A A"}, "relationships": {"A": ["B"]}},
+        {"people": {"A": "A A"}, "relationships": {"A": {"X": "B"}}},
+        {"people": {"A": "A A"}, "relationships": {"A": {"F": ["B"]}}},
+    ])
+    def test_invalid_data(self, data):
+        with pytest.raises(ValueError):
+            FamilyTree.deserialize_data(data)
+
+    def test_from_file(self, tmp_path):
+        family_tree = FamilyTree.from_file("sample_data.yml")
+        json_path = tmp_path / "sample_data.json"
+        json_path.write_text(family_tree.to_json(), encoding="utf-8")
+
+        assert repr(FamilyTree.from_file(str(json_path))) == repr(family_tree)
+
+    def test_from_file_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            FamilyTree.from_file(str(tmp_path / "sample_data.txt"))
+
+    def test_edit(self):
+        data = FamilyGenerator(3).generate(60, "mixed")
+        family_tree = FamilyTree.deserialize_data({"people": data["people"], "relationships": {}})
+        for child_id, parents in data["relationships"].items():
+            for relationship, parent_id in parents.items():
+                family_tree.add_relationship(child_id, Relationship[relationship], parent_id)
+        family_tree.add_person(Person("new", "New Person"))
+        family_tree.add_relationship("new", Relationship.F, next(iter(data["people"])))
+
+        expected = FamilyTree.deserialize_data(family_tree._serialize_data())
+        generations = {person.id: person.generation for person in family_tree.people}
+        assert generations == {person.id: person.generation for person in expected.people}
+        order = {person.id: i for i, person in enumerate(family_tree.graph.people)}
+        for person in family_tree.people:
+            assert all(order[person.id] < order[parent.id] for parent in person.parents.values())
+
+        family_tree.remove_relationship("new", Relationship.F)
+        assert family_tree._get_person("new").generation == 0
+        assert "new" not in [child.id for child in family_tree._get_person(next(iter(data["people"]))).children]
+
+    def test_edit_cost(self):
+        # Edits within a family of four take about the same time in trees of 1,000 and 32,000 people.
+        def edit_time(n_families):
+            people = []
+            for i in range(n_families):
+                father, mother = Person(f"F{i}", "Father Doe"), Person(f"M{i}", "Mother Doe")
+                children = [Person(f"C{i}-{k}", "Child Doe") for k in range(2)]
+                for child in children:
+                    child.parents = {Relationship.F: father, Relationship.M: mother}
+                father.children, mother.children = list(children), list(children)
+                people += [father, mother, *children]
+            family_tree = FamilyTree(people, "solve")
+
+            times = []
+            for _ in range(5):
+                start = time.perf_counter()
+                for i in range(20):
+                    family_tree.remove_relationship(f"C{i}-0", Relationship.F)
+                    family_tree.add_relationship(f"C{i}-0", Relationship.F, f"F{i}")
+                times.append(time.perf_counter() - start)
+            assert all(person.generation == (0 if person.parents else 1) for person in family_tree.people)
+            return min(times)
+
+        assert edit_time(8000) < 5 * edit_time(250)
+
+    def test_edit_errors(self):
+        family_tree = FamilyTree([Person("A", "A A"), Person("B", "B B")])
+        family_tree.add_relationship("A", Relationship.F, "B")
+
+        with pytest.raises(ValueError, match="Cycle detected"):
+            family_tree.add_relationship("B", Relationship.F, "A")
+        with pytest.raises(ValueError, match="Cycle detected"):
+            family_tree.add_relationship("A", Relationship.M, "A")
+        with pytest.raises(ValueError, match="already has a father"):
+            family_tree.add_relationship("A", Relationship.F, "B")
+        with pytest.raises(ValueError, match="Unknown person"):
+            family_tree.add_relationship("A", Relationship.M, "C")
+        with pytest.raises(ValueError, match="has no mother"):
+            family_tree.remove_relationship("A", Relationship.M)
+        with pytest.raises(ValueError, match="Duplicate person ID"):
+            family_tree.add_person(Person("A", "A A"))
+        assert [person.generation for person in family_tree.graph.people] == [0, 1]
+
+    def test_edit_redraws(self):
+        family_tree = FamilyTree([Person("A", "A A"), Person("B", "B B")])
+        renderer = FamilyTreeRenderer(family_tree)
+        assert "╘" not in renderer.render_window(0, 10, 0, 40)
+
+        family_tree.add_relationship("A", Relationship.F, "B")
+        assert renderer.render_window(0, 10, 0, 40) == FamilyTreeRenderer(family_tree).render()
+        assert "╘" in renderer.render_window(0, 10, 0, 40)
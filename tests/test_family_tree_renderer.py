@@ -1,4 +1,12 @@
+import random
+
+import numpy as np
+import pytest
+
+from benchmarks.generator import FamilyGenerator
+from genealogy.family_tree import FamilyTree
 from genealogy.family_tree_renderer import FamilyTreeRenderer
+from genealogy.surface import CoupleConnection, SurfacePosition
 
 
 class TestFamilyTree:
@@ -10,3 +18,83 @@ class TestFamilyTree:
 
         renderer = FamilyTreeRenderer.from_yaml(data)
         assert renderer.render() == expected
+
+    def test_render_channels(self):
+        # Channels are allocated sweeping connections by their first line, which places them
+        # differently than the first-fit allocation used before.
+        with open("tests/expected_family_tree_renderer_channels_output.txt", encoding="utf-8") as f:
+            expected = f.read()
+
+        for backend in FamilyTreeRenderer.BACKENDS:
+            renderer = FamilyTreeRenderer(FamilyTree.from_file("tests/channels_data.yml"), backend)
+            assert renderer.render() == expected
+
+    def test_render_array_backend(self):
+        with open("tests/expected_family_tree_renderer_render_output.txt", encoding="utf-8") as f:
+            expected = f.read()
+
+        renderer = FamilyTreeRenderer(FamilyTree.from_file("sample_data.yml"), backend="array")
+        assert renderer.render() == expected
+
+    def test_allocate_channels(self):
+        ranges = {"A": (0, 1), "B": (4, 5), "C": (2, 6), "D": (0, 3)}
+        connections = [{
+            (couple_id,): CoupleConnection([SurfacePosition([start, 0]), SurfacePosition([end, 0])])
+            for couple_id, (start, end) in ranges.items()
+        }]
+
+        FamilyTreeRenderer._allocate_channels(connections)
+        channels = {couple_id[0]: connection.allocated_channel for couple_id, connection in connections[0].items()}
+        assert channels == {"A": 0, "B": 1, "C": 0, "D": 1}
+
+    def test_render_iter(self):
+        with open("tests/expected_family_tree_renderer_render_output.txt", encoding="utf-8") as f:
+            expected = f.read()
+
+        renderer = FamilyTreeRenderer(FamilyTree.from_file("sample_data.yml"))
+        assert list(renderer.render_iter()) == expected.split("\n")
+
+    def test_render_window(self):
+        with open("tests/expected_family_tree_renderer_render_output.txt", encoding="utf-8") as f:
+            expected_lines = f.read().split("\n")
+
+        for backend in FamilyTreeRenderer.BACKENDS:
+            renderer = FamilyTreeRenderer(FamilyTree.from_file("sample_data.yml"), backend)
+            window = renderer.render_window(2, 5, 4, 30)
+            assert window.split("\n") == [line[4:30] for line in expected_lines[2:5]]
+            assert renderer.render_window(100, 200, 0, 10) == ""
+            assert renderer.render_window(0, -2, 0, 20) == ""
+            assert renderer.render_window(-3, 2, -5, 10).split("\n") == [line[:10] for line in expected_lines[:2]]
+            assert renderer.render_window(0, 2, 0, -1).split("\n") == ["", ""]
+
+    @pytest.mark.parametrize("backend", FamilyTreeRenderer.BACKENDS)
+    @pytest.mark.parametrize("shape", ["mixed", "pedigree", "collapse"])
+    def test_render_window_generated(self, backend, shape):
+        renderer = FamilyTreeRenderer(FamilyTree.deserialize_data(FamilyGenerator(0).generate(300, shape)), backend)
+        expected_lines = renderer.render().split("\n")
+        height, width = len(expected_lines), max(map(len, expected_lines))
+
+        rng = random.Random(0)
+        for _ in range(20):
+            line_start, col_start = rng.randrange(height), rng.randrange(width)
+            line_end, col_end = line_start + rng.randrange(60), col_start + rng.randrange(120)
+            expected = [line[col_start:col_end] for line in expected_lines[line_start:line_end]]
+            assert renderer.render_window(line_start, line_end, col_start, col_end) == "\n".join(expected)
+        assert renderer.render_window(0, height, 0, width) == "\n".join(expected_lines)
+
+    def test_render_window_draws_window(self):
+        family_tree = FamilyTree.deserialize_data(FamilyGenerator(0).generate(1000, "mixed"))
+        renderer = FamilyTreeRenderer(family_tree, "array")
+        renderer.render_window(0, 1, 0, 1)
+
+        drawn_names = []
+        draw = renderer._names_surface.draw
+        renderer._names_surface.draw = lambda position, text: drawn_names.append(text) or draw(position, text)
+        renderer.render_window(0, 40, 0, 200)
+
+        # The people on the lines of the uncompressed surface that the window isn't made of are never drawn.
+        last_source = renderer._compression_map.source_lines(np.arange(40), 0, 200).max()
+        near_names = {person.name for person in family_tree.people if renderer._coords[person.id].line <= last_source}
+        far_names = {person.name for person in family_tree.people} - near_names
+        assert far_names and not far_names & set(drawn_names)
+        assert len(drawn_names) < len(family_tree.people) // 4
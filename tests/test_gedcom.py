@@ -0,0 +1,62 @@
+from genealogy.gedcom import GedcomReader
+from genealogy.utils import Relationship
+
+
+GEDCOM_LINES = """\
+0 HEAD
+1 CHAR UTF-8
+0 @I1@ INDI
+1 NAME Robert /Johnson/
+0 @I2@ INDI
+1 NAME Helen /Johnson/
+0 @F1@ FAM
+1 CHIL @I3@
+1 CHIL @I4@
+1 HUSB @I1@
+1 WIFE @I2@
+0 @I3@ INDI
+1 NAME Emily /Johnson/
+1 FAMC @F1@
+0 @I4@ INDI
+1 NAME Michael Paul /Johnson/
+1 NAME Mike /Johnson/
+1 FAMC @F1@
+2 PEDI adopted
+0 TRLR
+""".splitlines(keepends=True)
+
+
+class TestGedcomReader:
+    def test_read(self):
+        people = {person.id: person for person in GedcomReader().read(GEDCOM_LINES)}
+
+        assert sorted(people) == ["I1", "I2", "I3", "I4"]
+        assert people["I4"].name == "Michael Paul Johnson"
+        assert {rel: parent.id for rel, parent in people["I3"].parents.items()} == {
+            Relationship.F: "I1",
+            Relationship.M: "I2",
+        }
+        assert {rel: parent.id for rel, parent in people["I4"].parents.items()} == {
+            Relationship.AF: "I1",
+            Relationship.AM: "I2",
+        }
+        assert [child.id for child in people["I1"].children] == ["I3", "I4"]
+
+    def test_read_birth_and_adoptive_families(self):
+        families = {
+            "F1": ["0 @F1@ FAM", "1 HUSB @B1@", "1 WIFE @B2@", "1 CHIL @C@"],
+            "F2": ["0 @F2@ FAM", "1 HUSB @A1@", "1 WIFE @A2@", "1 CHIL @C@"],
+        }
+        child = ["0 @C@ INDI", "1 NAME Anna /Smith/", "1 FAMC @F1@", "1 FAMC @F2@", "2 PEDI adopted"]
+        for family_order in (["F1", "F2"], ["F2", "F1"]):
+            lines = [line for family_id in family_order for line in families[family_id]] + child
+            people = {person.id: person for person in GedcomReader().read(lines)}
+
+            assert {rel: parent.id for rel, parent in people["C"].parents.items()} == {
+                Relationship.F: "B1",
+                Relationship.M: "B2",
+                Relationship.AF: "A1",
+                Relationship.AM: "A2",
+            }
+            assert [child.id for child in people["A1"].children] == ["C"]
+            assert [child.id for child in people["B2"].children] == ["C"]
@@ -0,0 +1,24 @@
+import numpy as np
+from PIL import Image, ImageFont
+
+from genealogy.glyph_atlas import GlyphAtlas
+from genealogy.image import write_to_image
+
+
+class TestGlyphAtlas:
+    def test_render(self):
+        atlas = GlyphAtlas(ImageFont.load_default())
+        height, width = atlas.cell_height, atlas.cell_width
+
+        coverage = atlas.render(["ab", "║", "ba"])
+        assert coverage.shape == (3 * height, 2 * width)
+        assert not coverage[height:2 * height, width:].any()
+        np.testing.assert_array_equal(coverage[:height, :width], coverage[2 * height:, width:])
+        np.testing.assert_array_equal(coverage[:height, width:], coverage[2 * height:, :width])
+        assert coverage[height:2 * height, :width].any()
+
+    def test_write_to_image(self, tmp_path):
+        write_to_image("ab\n║", str(tmp_path / "tree.png"))
+        with Image.open(tmp_path / "tree.png") as image:
+            assert image.mode == "RGB"
+            assert image.getextrema() == ((30, 255),) * 3
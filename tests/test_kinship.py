@@ -0,0 +1,83 @@
+import functools
+
+import numpy as np
+import pytest
+
+from benchmarks.generator import FamilyGenerator
+from genealogy.family_tree import FamilyTree
+from genealogy.kinship import Kinship
+from genealogy.person import Person
+from genealogy.utils import Relationship
+
+
+class TestKinship:
+    def test_known_coefficients(self):
+        # Siblings A and B have a child C, half-siblings C and D have a child E, and A adopted X.
+        data = {
+            "people": {id_: f"{id_} Doe" for id_ in ("G", "H", "A", "B", "C", "D", "E", "X")},
+            "relationships": {
+                "A": {"F": "G", "M": "H"}, "B": {"F": "G", "M": "H"},
+                "C": {"F": "A", "M": "B"},
+                "D": {"M": "A"},
+                "E": {"F": "C", "M": "D"},
+                "X": {"AF": "A"},
+            },
+        }
+        family_tree = FamilyTree.deserialize_data(data)
+
+        inbreeding = family_tree.inbreeding_coefficients()
+        assert inbreeding["A"] == 0
+        assert inbreeding["C"] == 0.25
+        # The kinship of C and D is half that of C and A, the kinship of A with themselves and B averaged.
+        assert inbreeding["E"] == (0.5 + 0.25) / 4
+
+        kinship = family_tree.kinship_matrix(["A", "B", "G", "C", "X"])
+        assert kinship[0, 0] == 0.5
+        assert kinship[0, 1] == kinship[1, 0] == 0.25
+        assert kinship[0, 2] == 0.25
+        assert kinship[3, 3] == 0.625
+        assert kinship[0, 4] == 0
+
+        adoptive_kinship = family_tree.kinship_matrix(["A", "X"], adoptive=True)
+        assert adoptive_kinship[0, 1] == 0.25
+
+    @pytest.mark.parametrize("shape", ["mixed", "collapse", "adoptive"])
+    def test_recursion(self, shape):
+        family_tree = FamilyTree.deserialize_data(FamilyGenerator(0).generate(200, shape))
+        graph = family_tree.graph
+
+        def parent(i, relationship):
+            person = graph.people[i].parents.get(relationship)
+            return None if person is None else graph.index_by_id[person.id]
+
+        @functools.lru_cache(maxsize=None)
+        def kinship(i, j):
+            if i is None or j is None:
+                return 0.0
+            if i == j:
+                return 0.5 * (1.0 + kinship(parent(i, Relationship.F), parent(i, Relationship.M)))
+            # The person with the lowest index can't be an ancestor of the other.
+            i, j = min(i, j), max(i, j)
+            return 0.5 * (kinship(parent(i, Relationship.F), j) + kinship(parent(i, Relationship.M), j))
+
+        expected = np.array([[kinship(i, j) for j in range(len(graph))] for i in range(len(graph))])
+        # Small batches exercise the reuse of the slots of people who are no longer needed.
+        computation = Kinship(graph, batch_size=3)
+        assert np.allclose(computation.matrix(), expected)
+        assert np.allclose(
+            computation.inbreeding,
+            [expected[i, i] * 2 - 1 for i in range(len(graph))],
+        )
+
+        indices = [graph.index_by_id[person.id] for person in family_tree.people]
+        assert np.allclose(family_tree.kinship_matrix(), expected[np.ix_(indices, indices)])
+
+    def test_after_edit(self):
+        family_tree = FamilyTree.from_file("sample_data.yml")
+        assert family_tree.kinship_matrix(["Michael", "Sarah"])[0, 1] == 0.25
+
+        # A child of the siblings Michael and Sarah.
+        family_tree.add_person(Person("Kid", "Kid Johnson"))
+        family_tree.add_relationship("Kid", Relationship.F, "Michael")
+        family_tree.add_relationship("Kid", Relationship.M, "Sarah")
+        assert family_tree.inbreeding_coefficients()["Kid"] == 0.25
@@ -0,0 +1,56 @@
+import pytest
+
+from benchmarks.generator import FamilyGenerator
+from genealogy.family_tree import FamilyTree
+from genealogy.family_tree_renderer import FamilyTreeRenderer
+from genealogy.layout import LAYOUT_ENGINES, LayeredLayout, LayoutEngine
+
+
+def count_crossings(family_tree):
+    ranks = {person: rank for rank, person in enumerate(family_tree.people)}
+    links = [(ranks[child], ranks[parent]) for child in family_tree.people for parent in set(child.parents.values())]
+    return sum(
+        (child - other_child) * (parent - other_parent) < 0
+        for i, (child, parent) in enumerate(links)
+        for other_child, other_parent in links[i + 1:]
+    )
+
+
+class TestLayout:
+    def test_layouts(self):
+        assert FamilyTree.LAYOUTS == tuple(LAYOUT_ENGINES) == ("relax", "solve", "layered")
+
+    @pytest.mark.parametrize("shape", ["mixed", "sibships"])
+    def test_layered(self, shape):
+        data = FamilyGenerator(1).generate(150, shape)
+        family_tree = FamilyTree.deserialize_data(data, layout="layered")
+        topological_tree = FamilyTree.deserialize_data(data, layout=LayeredLayout(n_iterations=0))
+        assert topological_tree.people == topological_tree.graph.people
+
+        assert count_crossings(family_tree) < count_crossings(topological_tree)
+        # Each generation keeps the lines it occupies in topological order.
+        for tree in (family_tree, topological_tree):
+            assert sorted(person.id for person in tree.people) == sorted(data["people"])
+        assert (
+            [person.generation for person in family_tree.people]
+            == [person.generation for person in topological_tree.people]
+        )
+
+    def test_layered_render(self):
+        family_tree = FamilyTree.from_file("sample_data.yml", layout="layered")
+        rendered = FamilyTreeRenderer(family_tree).render()
+        assert all(person.name in rendered for person in family_tree.people)
+
+    def test_custom_engine(self):
+        class ReversedLayout(LayoutEngine):
+            def lay_out(self, family_tree):
+                for rank, person in enumerate(family_tree.graph.people):
+                    person.relax_position = float(rank)
+                family_tree.people.sort(key=lambda p: -p.relax_position)
+
+        family_tree = FamilyTree.from_file("sample_data.yml", layout=ReversedLayout())
+        assert family_tree.people == family_tree.graph.people[::-1]
+
+        # Engines must implement lay_out.
+        with pytest.raises(TypeError):
+            LayoutEngine()
@@ -0,0 +1,34 @@
+import json
+
+from genealogy.family_tree_renderer import FamilyTreeRenderer
+from genealogy.image import write_to_image
+from genealogy.profiler import active_profiler, Profiler
+
+
+class TestProfiler:
+    def test_profile_render(self, tmp_path):
+        ended_stages = []
+        with Profiler(on_stage=lambda name, duration: ended_stages.append(name)) as profiler:
+            assert active_profiler() is profiler
+            text = FamilyTreeRenderer.from_file("sample_data.yml").render()
+            write_to_image(text, str(tmp_path / "tree.png"))
+        assert active_profiler() is None
+
+        report = json.loads(profiler.to_json())
+        assert list(report["stages"]) == [
+            "parse", "deserialize", "sort", "graph", "generations", "layout",
+            "draw_names", "connections", "channels", "draw_arrows", "compress",
+            "rasterize", "blend", "encode",
+        ]
+        assert ended_stages == list(report["stages"])
+        assert report["total"] >= sum(stage["time"] for stage in report["stages"].values())
+        assert report["counters"]["people"] == 7
+        assert report["counters"]["relax_iterations"] == 128
+        assert report["counters"]["channels_allocated"] == 2
+        assert report["counters"]["surface_lines"] == len(text.split("\n"))
+        assert report["counters"]["clear_path_cells_visited"] > 0
+
+    def test_disabled(self):
+        profiler = Profiler()
+        FamilyTreeRenderer.from_file("sample_data.yml").render()
+        assert profiler.report() == {"total": 0.0, "stages": {}, "counters": {}}
@@ -0,0 +1,70 @@
+import os
+
+from genealogy import render_cache
+from genealogy.render_cache import MemoryRenderCache, RenderCache
+
+
+class TestRenderCache:
+    def test_get_put(self, tmp_path):
+        cache = RenderCache(str(tmp_path / "cache"))
+        key = cache.key("sample_data.yml", layout="relax")
+
+        assert cache.get(key, ".txt") is None
+        cache.put(key, ".txt", b"rendered")
+        assert cache.get(key, ".txt") == b"rendered"
+        assert cache.key("sample_data.yml", layout="solve") != key
+
+    def test_format_version(self, tmp_path, monkeypatch):
+        cache = RenderCache(str(tmp_path / "cache"))
+        key = cache.key("sample_data.yml", layout="relax")
+        memory_key = MemoryRenderCache.key(b"people: {}", layout="relax")
+
+        monkeypatch.setattr(render_cache, "RENDER_FORMAT_VERSION", render_cache.RENDER_FORMAT_VERSION + 1)
+        assert cache.key("sample_data.yml", layout="relax") != key
+        assert MemoryRenderCache.key(b"people: {}", layout="relax") != memory_key
+
+    def test_eviction(self, tmp_path):
+        cache = RenderCache(str(tmp_path / "cache"), max_size=10)
+        cache.put("old", ".txt", b"12345")
+        os.utime(cache._path("old", ".txt"), (0, 0))
+        cache.put("used", ".txt", b"12345")
+        os.utime(cache._path("used", ".txt"), (1, 1))
+        assert cache.get("used", ".txt") == b"12345"
+
+        cache.put("new", ".txt", b"12345")
+        assert cache.get("old", ".txt") is None
+        assert cache.get("used", ".txt") == b"12345"
+        assert cache.get("new", ".txt") == b"12345"
+
+    def test_get_evicted_concurrently(self, tmp_path, monkeypatch):
+        cache = RenderCache(str(tmp_path / "cache"))
+        cache.put("key", ".txt", b"rendered")
+
+        def evict_then_utime(path, *args):
+            os.remove(path)
+            raise FileNotFoundError(path)
+
+        monkeypatch.setattr(os, "utime", evict_then_utime)
+        assert cache.get("key", ".txt") == b"rendered"
+
+
+class TestMemoryRenderCache:
+    def test_get_put(self):
+        cache = MemoryRenderCache(max_size=10)
+        key = cache.key(b"people: {}", layout="relax")
+        assert cache.key(b"people: {}", layout="solve") != key
+
+        assert cache.get(key, ".txt") is None
+        cache.put(key, ".txt", b"12345")
+        cache.put("used", ".txt", b"12345")
+        assert cache.get(key, ".txt") == b"12345"
+
+        cache.put("new", ".txt", b"12345")
+        assert cache.get("used", ".txt") is None
+        assert cache.get(key, ".txt") == b"12345"
+        cache.put("too large", ".txt", b"12345678901")
+        assert cache.get("too large", ".txt") is None
+
+        assert cache.stats() == {
+            "entries": 2, "size": 10, "max_size": 10, "hits": 2, "misses": 3, "hit_rate": 0.4,
+        }
@@ -0,0 +1,32 @@
+import pytest
+
+from genealogy.family_tree import FamilyTree
+from genealogy.scope import Scope, UnknownRootError
+
+
+class TestScope:
+    def test_ancestors(self):
+        family_tree = FamilyTree.from_file("sample_data.yml", scope=Scope("John", n_ancestors=1))
+        assert sorted(person.id for person in family_tree.people) == ["Emily", "James", "John"]
+
+    def test_descendants(self):
+        family_tree = FamilyTree.from_file("sample_data.yml", scope=Scope("Helen", n_descendants=None))
+        assert sorted(person.id for person in family_tree.people) == ["Emily", "Helen", "John", "Michael", "Sarah"]
+        emily = next(person for person in family_tree.people if person.id == "Emily")
+        assert [parent.id for parent in emily.parents.values()] == ["Helen"]
+
+    def test_pedigree_collapse(self):
+        # "A" is both a grandparent and a great-grandparent of "D".
+        data = {
+            "people": {id_: f"{id_} {id_}" for id_ in "ABCD"},
+            "relationships": {"D": {"F": "C", "M": "A"}, "C": {"F": "B"}, "B": {"F": "A"}},
+        }
+
+        family_tree = FamilyTree.deserialize_data(data, scope=Scope("D", n_ancestors=1))
+        assert sorted(person.id for person in family_tree.people) == ["A", "C", "D"]
+
+    def test_invalid(self):
+        with pytest.raises(UnknownRootError):
+            FamilyTree.from_file("sample_data.yml", scope=Scope("Nobody"))
+        with pytest.raises(ValueError):
+            Scope("John", n_ancestors=-3)
@@ -0,0 +1,81 @@
+import json
+import socket
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from genealogy.family_tree_renderer import FamilyTreeRenderer
+from genealogy.render_cache import MemoryRenderCache
+from genealogy.server import RenderServer
+
+
+@pytest.fixture(scope="class")
+def server():
+    server = RenderServer(("127.0.0.1", 0), MemoryRenderCache())
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+def request(server, path, data=None, content_type="application/yaml"):
+    host, port = server.server_address[:2]
+    headers = {"Content-Type": content_type} if data is not None else {}
+    with urllib.request.urlopen(urllib.request.Request(f"http://{host}:{port}{path}", data, headers)) as response:
+        return response.headers.get_content_type(), response.read()
+
+
+class TestRenderServer:
+    def test_render(self, server):
+        with open("sample_data.yml", "rb") as f:
+            data = f.read()
+        expected = FamilyTreeRenderer.from_file("sample_data.yml").render()
+
+        assert request(server, "/render", data) == ("text/plain", expected.encode("utf-8"))
+        assert request(server, "/render?backend=array", data) == ("text/plain", expected.encode("utf-8"))
+        content_type, image = request(server, "/render?format=png", data)
+        assert content_type == "image/png" and image.startswith(b"\x89PNG")
+
+        json_data = json.dumps({"people": {"C": "Child"}, "relationships": {"C": {"F": "P"}}}).encode()
+        assert request(server, "/render?root=C&ancestors=0", json_data, "application/json")[1].strip() == b"Child"
+
+        _, stats = request(server, "/stats")
+        assert json.loads(stats)["hits"] == 2
+
+    @pytest.mark.parametrize("path", [
+        "/render?format=svg", "/render?layout=unknown", "/render?root=X", "/render?ancestors=1",
+    ])
+    def test_bad_request(self, server, path):
+        with pytest.raises(urllib.error.HTTPError) as exc_info:
+            request(server, path, b"people: {A: Anna}\nrelationships: {}")
+        assert exc_info.value.code == 400
+
+    @pytest.mark.parametrize("data", [
+        b"people: [",
+        b"people: {}",
+        b"people: [a, b]\nrelationships: {}",
+        b"[people, relationships]",
+        b"people: {A: [Anna]}\nrelationships: {}",
+        b"people: {A: Anna}\nrelationships: {A: {X: B}}",
+        b"people: {}\nrelationships: {}",
+        b"\xff",
+    ])
+    def test_bad_data(self, server, data):
+        with pytest.raises(urllib.error.HTTPError) as exc_info:
+            request(server, "/render", data)
+        assert exc_info.value.code == 400
+        assert exc_info.value.read().startswith(b"Invalid family tree data")
+
+    @pytest.mark.parametrize("content_length", ["-1", "many"])
+    def test_bad_content_length(self, server, content_length):
+        host, port = server.server_address[:2]
+        with socket.create_connection((host, port)) as connection:
+            connection.sendall(
+                f"POST /render HTTP/1.1\r\nHost: {host}\r\nContent-Length: {content_length}\r\n\r\n".encode()
+            )
+            response = connection.makefile("rb").readline()
+        assert response.startswith(b"HTTP/1.0 400")
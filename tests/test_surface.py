@@ -0,0 +1,23 @@
+from genealogy.surface import Surface, SurfaceLine
+
+
+class TestSurface:
+    def test_compress_vertically(self):
+        surface = Surface(SurfaceLine(line) for line in [
+            ["a", None, None],
+            [None, None, None],
+            [None, "║", "b"],
+            [None, "║", None],
+        ])
+
+        surface.compress_vertically()
+        assert surface.as_str == "a\n ║b"
+
+    def test_compress_vertically_deep_path(self):
+        # The only clear path runs down the first column, past the old recursion limit.
+        height = 5000
+        surface = Surface(SurfaceLine([None, "x", "x"]) for _ in range(height))
+        surface.append(SurfaceLine([None, None, None]))
+
+        surface.compress_vertically()
+        assert surface.as_str == "\n".join([" xx"] * height)
@@ -0,0 +1,34 @@
+import xml.etree.ElementTree as ElementTree
+
+from genealogy.family_tree import FamilyTree
+from genealogy.family_tree_renderer import FamilyTreeRenderer
+from genealogy.pipeline import main
+from genealogy.svg import CELL_HEIGHT, CELL_WIDTH, PADDING, write_to_svg
+
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+class TestSvg:
+    def test_write_to_svg(self, tmp_path):
+        write_to_svg("A & B ╘═╗\n      ═╝  C", str(tmp_path / "tree.svg"))
+        root = ElementTree.parse(tmp_path / "tree.svg").getroot()
+
+        assert root.get("width") == str(11 * CELL_WIDTH + 2 * PADDING)
+        assert root.get("height") == str(2 * CELL_HEIGHT + 2 * PADDING)
+        texts = [(text.get("x"), text.text) for text in root.iter(f"{SVG}text")]
+        assert texts == [(str(PADDING), "A & B"), (str(PADDING + 10 * CELL_WIDTH), "C")]
+
+        paths = {(path.get("class"), path.get("d")) for path in root.iter(f"{SVG}path")}
+        y, x = PADDING + CELL_HEIGHT // 2, PADDING + 6 * CELL_WIDTH + CELL_WIDTH // 2
+        assert ("single", f"M{x} {y}v{-CELL_HEIGHT // 2}") in paths
+        assert ("double", f"M{x} {y}H{x + 2 * CELL_WIDTH}M{x + 2 * CELL_WIDTH} {y}v{CELL_HEIGHT // 2}") in paths
+
+    def test_main(self, tmp_path):
+        main("sample_data.yml", image_output_path=str(tmp_path / "tree.svg"))
+        root = ElementTree.parse(tmp_path / "tree.svg").getroot()
+
+        names = {text.text for text in root.iter(f"{SVG}text")}
+        assert names == {person.name for person in FamilyTree.from_file("sample_data.yml").people}
+        n_lines = len(FamilyTreeRenderer.from_file("sample_data.yml").render().split("\n"))
+        assert root.get("height") == str(n_lines * CELL_HEIGHT + 2 * PADDING)
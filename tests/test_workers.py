@@ -0,0 +1,14 @@
+import pytest
+
+from genealogy.workers import map_in_processes
+
+
+class TestWorkers:
+    @pytest.mark.parametrize("jobs", [None, 0, 1, 3])
+    def test_map_in_processes(self, jobs):
+        assert map_in_processes(abs, range(-20, 0), jobs) == list(range(20, 0, -1))
+        assert map_in_processes(abs, [], jobs) == []
+
+    def test_negative_jobs(self):
+        with pytest.raises(ValueError):
+            map_in_processes(abs, [1, 2], -1)